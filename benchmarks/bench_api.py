@@ -0,0 +1,68 @@
+"""Throughput benchmark for the in-process ``convert`` API.
+
+Converts every file in ``db_queries/`` repeatedly, first on one thread and
+then on a thread pool, checks that every concurrent result matches the
+sequential one, and prints conversions per minute. Run from the repository root:
+
+    python benchmarks/bench_api.py
+    python benchmarks/bench_api.py --rounds 200 --threads 16
+"""
+import os
+import sys
+import glob
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from liquibase_mongo import convert  # noqa: E402
+
+
+def load_sources():
+    sources = []
+    for path in sorted(glob.glob(os.path.join(ROOT, "db_queries", "*.js"))):
+        with open(path, "r", encoding="utf-8") as file:
+            sources.append((os.path.basename(path)[:-3], file.read()))
+    return sources
+
+
+def run(job):
+    version, source = job
+    result = convert(source, version=version, author="bench")
+    return version, result.xml, tuple(result.errors), tuple(result.warnings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure convert() throughput and thread safety.")
+    parser.add_argument("--rounds", type=int, default=50, help="Times to convert the whole corpus.")
+    parser.add_argument("--threads", type=int, default=8, help="Thread pool size for the concurrent run.")
+    args = parser.parse_args()
+
+    jobs = load_sources() * args.rounds
+
+    start = time.perf_counter()
+    expected = {}
+    for job in jobs:
+        version, *result = run(job)
+        expected[version] = result
+    sequential = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        results = list(pool.map(run, jobs))
+    concurrent = time.perf_counter() - start
+
+    mismatches = [version for version, *result in results if result != expected[version]]
+    print(f"{len(jobs)} conversions")
+    print(f"  sequential: {len(jobs) / sequential * 60:,.0f} per minute")
+    print(f"  {args.threads} threads:  {len(jobs) / concurrent * 60:,.0f} per minute")
+    if mismatches:
+        print(f"❌ {len(mismatches)} concurrent results differ from the sequential run")
+        sys.exit(1)
+    print("✅ Concurrent results identical to sequential results.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Correctness and throughput check for chunked deleteMany/updateMany jobs.
+
+Writes an NDJSON snapshot of ``--documents`` users (with number, string and
+ObjectId ``_id`` values), then runs a chunked updateMany and deleteMany
+through the simulator target in batches of ``--batch-size``. Each job is
+interrupted after a few batches and resumed from the checkpoint the target
+keeps, the way a rerun of ``liquibase-mongo chunked run`` picks up from
+``DATABASECHANGELOGCHUNKS``. A final run must skip every job as done. Fails when the collection ends up different from applying the same
+operations in one go, or when a batch averages more than ``--max-batch-ms``.
+Run from the repository root:
+
+    python benchmarks/bench_chunked.py
+    python benchmarks/bench_chunked.py --documents 200000 --batch-size 5000
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from liquibase_mongo.chunked import SimulatorTarget, id_sort_key, run_jobs  # noqa: E402
+from liquibase_mongo.simulator import DocumentStore, apply_operation  # noqa: E402
+
+OPERATIONS = [
+    {"type": "updateMany", "collection": "users", "filter": '{ status: "pending" }',
+     "update": '{ $set: { status: "active" }, $inc: { tier: 1 } }'},
+    {"type": "deleteMany", "collection": "users", "filter": '{ status: "closed", tier: { $gte: 3 } }'},
+]
+
+
+def write_snapshot(directory, count):
+    with open(os.path.join(directory, "users.ndjson"), "w", encoding="utf-8") as file:
+        for i in range(count):
+            # Mixed _id types: batches span numbers, strings and ObjectIds
+            _id = i if i % 10 == 0 else f"u{i}" if i % 10 == 5 else {"$oid": f"{i + 1:024x}"}
+            file.write(json.dumps({"_id": _id, "email": f"user{i}@example.com",
+                                   "status": ("active", "pending", "closed")[i % 3], "tier": i % 7}) + "\n")
+
+
+def job(number, operation, batch_size):
+    return dict(operation, id=f"bench.chunk{number}", update=operation.get("update"),
+                options=None, batch_size=batch_size, pause_ms=0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Assert chunked jobs resume correctly and stay fast.")
+    parser.add_argument("--documents", type=int, default=30000, help="Snapshot size (default: 30000).")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Documents per batch (default: 1000).")
+    parser.add_argument("--interrupt-after", type=int, default=3, help="Batches before each interruption (default: 3).")
+    parser.add_argument("--max-batch-ms", type=float, default=250.0, help="Allowed average per batch (default: 250).")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="bench_chunked_")
+    failures = []
+    try:
+        write_snapshot(directory, args.documents)
+        expected = DocumentStore(directory)
+        for operation in OPERATIONS:
+            apply_operation(expected, operation)
+
+        store = DocumentStore(directory)
+        target = SimulatorTarget(store)
+        jobs = [job(number, operation, args.batch_size) for number, operation in enumerate(OPERATIONS, 1)]
+        runs = 0
+        start = time.perf_counter()
+        while True:
+            runs += 1
+            finished = run_jobs(target, "bench", jobs, sleep=lambda seconds: None,
+                                max_batches=args.interrupt_after, log=lambda message: None)[1]
+            if finished or runs > args.documents:
+                break
+        elapsed = time.perf_counter() - start
+
+        checkpoints = target.checkpoints
+        batches = sum(checkpoint.get("batches", 0) for checkpoint in checkpoints.values())
+        per_batch = elapsed * 1000 / max(batches, 1)
+        print(f"📦 {batches} batch(es) over {runs} run(s): {per_batch:.1f} ms each")
+        if not finished:
+            failures.append("jobs did not finish")
+        if not all(checkpoint.get("done") for checkpoint in checkpoints.values()):
+            failures.append("checkpoints are not all marked done")
+        rerun = []
+        run_jobs(target, "bench", jobs, sleep=lambda seconds: None, log=rerun.append)
+        if len(rerun) != len(jobs) or not all("already done" in message for message in rerun):
+            failures.append("a rerun did not skip every finished job")
+        if per_batch > args.max_batch_ms:
+            failures.append(f"batches took {per_batch:.1f} ms each (limit {args.max_batch_ms} ms)")
+
+        chunked = sorted(store.get("users").documents.values(), key=lambda document: id_sort_key(document["_id"]))
+        direct = sorted(expected.get("users").documents.values(), key=lambda document: id_sort_key(document["_id"]))
+        print(f"🔁 {len(chunked):,} documents left after the chunked jobs, {len(direct):,} after applying them directly")
+        if chunked != direct:
+            failures.append("chunked jobs left the collection different from applying the operations directly")
+    finally:
+        shutil.rmtree(directory)
+
+    if failures:
+        for failure in failures:
+            print(f"💥 {failure}")
+        sys.exit(1)
+    print("✅ Chunked jobs match the direct operations.")
+
+
+if __name__ == "__main__":
+    main()
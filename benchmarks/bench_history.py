@@ -0,0 +1,108 @@
+"""Load-time benchmark for the changelog history reader.
+
+Generates a synthetic corpus of changelogs with the generator, then times a
+cold ``load_history`` (every file parsed), a warm reload (every file a cache
+hit), a reload from the persisted JSON cache, and a reload after touching every
+file (mtime changed, content not: hashed but not reparsed). Fails when the cold
+load takes longer than ``--max-seconds`` or when the loaded operations differ
+from reading each file on its own. Run from the repository root:
+
+    python benchmarks/bench_history.py
+    python benchmarks/bench_history.py --files 50000 --workers 8
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from liquibase_mongo.generator import generate_liquibase_xml_robust  # noqa: E402
+from liquibase_mongo.history import HistoryCache, load_history, read_changelog  # noqa: E402
+
+
+def synthetic_operations(i):
+    collection = f"bench_{i % 50}"
+    return [
+        {'type': 'insertMany', 'collection': collection, 'line_number': 1,
+         'documents': f'[{{ name: "user_{i}", tier: {i % 7}, createdAt: ISODate("2024-01-01T00:00:00Z") }}, {{ name: "user_{i}_b" }}]'},
+        {'type': 'updateMany', 'collection': collection, 'line_number': 2,
+         'filter': f'{{ "status": "pending_{i}" }}', 'update': '{ $set: { "status": "active" } }'},
+        {'type': 'deleteOne', 'collection': collection, 'line_number': 3,
+         'filter': f'{{ "name": "user_{i}_b" }}'},
+        {'type': 'createIndex', 'collection': collection, 'line_number': 4,
+         'index_key': '{ name: 1, tier: -1 }', 'options': f'{{ name: "idx_{i}" }}'},
+    ]
+
+
+def write_corpus(directory, count):
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, f"version_{i}.xml")
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(generate_liquibase_xml_robust(f"version_{i}", synthetic_operations(i), "bench", "liquibase_test", [], []))
+        paths.append(path)
+    return paths
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Assert a large changelog corpus loads within budget.")
+    parser.add_argument("--files", type=int, default=10000, help="Number of changelog files (default: 10000).")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count).")
+    parser.add_argument("--max-seconds", type=float, default=5.0, help="Allowed cold load time (default: 5.0).")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="bench_history_")
+    try:
+        paths = write_corpus(directory, args.files)
+        size_mb = sum(os.path.getsize(path) for path in paths) / (1024 * 1024)
+        print(f"📚 {len(paths)} changelogs, {size_mb:.1f} MB, workers={args.workers or os.cpu_count()}")
+
+        cache_path = os.path.join(directory, "history-cache.json")
+        cache = HistoryCache(cache_path)
+        (operations, problems), cold = timed(load_history, paths, cache, args.workers)
+        cache.save()
+        print(f"🧊 cold load:   {cold:.2f} s ({len(operations)} operations, {cache.stats['parsed']} files parsed)")
+
+        _, warm = timed(load_history, paths, cache, args.workers)
+        print(f"🔥 warm reload: {warm:.2f} s ({cache.stats['hits']} cache hits)")
+
+        persisted, start = None, time.perf_counter()
+        persisted = HistoryCache(cache_path)
+        (reloaded, _), _ = timed(load_history, paths, persisted, args.workers)
+        print(f"💾 from cache file: {time.perf_counter() - start:.2f} s")
+
+        for path in paths:
+            os.utime(path)
+        _, touched = timed(load_history, paths, cache, args.workers)
+        print(f"👆 after touch: {touched:.2f} s ({cache.stats['rehashed']} rehashed, none reparsed)")
+
+        failures = []
+        expected = [operation for path in paths[::max(1, len(paths) // 200)] for operation in read_changelog(path)[0]]
+        sampled = [operation for operation in operations if operation['source'] in set(paths[::max(1, len(paths) // 200)])]
+        if problems or expected != sampled or reloaded != operations or len(operations) != 4 * len(paths):
+            failures.append("loaded operations differ from reading each file on its own")
+        if cold > args.max_seconds:
+            failures.append(f"cold load took {cold:.2f} s (limit {args.max_seconds} s)")
+        if cache.stats['parsed'] != len(paths):
+            failures.append("touched files were reparsed instead of matched by hash")
+    finally:
+        shutil.rmtree(directory)
+
+    if failures:
+        for failure in failures:
+            print(f"💥 {failure}")
+        sys.exit(1)
+    print("✅ History loading within budget.")
+
+
+if __name__ == "__main__":
+    main()
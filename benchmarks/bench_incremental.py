@@ -0,0 +1,106 @@
+"""Edit-latency benchmark for the incremental parser.
+
+Builds synthetic query files of increasing size, applies single-character edits at
+random offsets and fails when the median edit on the largest file is more than
+``--max-growth`` times the median on the smallest, i.e. when edit latency starts to
+follow file size. Every file is also checked against a full
+``extract_mongodb_operations_robust`` run after the edits. Run from the repository root:
+
+    python benchmarks/bench_incremental.py
+    python benchmarks/bench_incremental.py --statements 1000,100000 --edits 500
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from liquibase_mongo.incremental import IncrementalParser  # noqa: E402
+from liquibase_mongo.parser import extract_mongodb_operations_robust  # noqa: E402
+
+HEADER = """// @context: liquibase_test
+// @author: bench
+// @description: Synthetic incremental parse benchmark input
+// @version: 1.0
+"""
+
+STATEMENTS = [
+    """db.getCollection("bench_users").insertOne({{"name": "user_{i}", "email": "user_{i}@example.com"}});
+""",
+    """db.getCollection("bench_users").updateMany({{"status": "pending_{i}"}}, {{"$set": {{"status": "active", "tier": {i}}}}});
+""",
+    """// comment line {i}
+db.getCollection("bench_users").deleteMany({{"status": "inactive_{i}"}});
+""",
+]
+
+
+def synthetic_source(count):
+    return HEADER + "".join(STATEMENTS[i % len(STATEMENTS)].format(i=i) for i in range(count))
+
+
+def edit_latencies(parser, edits, rnd):
+    """Type one character at a random offset and delete it again; return seconds per edit."""
+    latencies = []
+    for _ in range(edits):
+        offset = rnd.randrange(len(HEADER), parser.length)
+        start = time.perf_counter()
+        parser.apply_edit(offset, offset, "x")
+        latencies.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        parser.apply_edit(offset, offset + 1, "")
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Assert incremental edit latency does not grow with file size.")
+    parser.add_argument("--statements", default="1000,20000", help="Comma-separated statement counts.")
+    parser.add_argument("--edits", type=int, default=300, help="Edits per file (each is an insert plus a delete).")
+    parser.add_argument("--max-growth", type=float, default=3.0, help="Allowed ratio of largest to smallest median edit latency.")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rnd = random.Random(args.seed)
+    medians = []
+    failures = []
+    for count in [int(s) for s in args.statements.split(",") if s.strip()]:
+        source = synthetic_source(count)
+
+        start = time.perf_counter()
+        full = extract_mongodb_operations_robust(source)
+        full_ms = (time.perf_counter() - start) * 1000
+
+        incremental = IncrementalParser(source)
+        latencies = sorted(edit_latencies(incremental, args.edits, rnd))
+        median_ms = statistics.median(latencies) * 1000
+        p99_ms = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+        medians.append(median_ms)
+
+        start = time.perf_counter()
+        result = incremental.result()
+        result_ms = (time.perf_counter() - start) * 1000
+
+        status = "✅" if result == full else "❌"
+        print(f"{status} {count} statements ({len(source) // 1024} KB): edit median {median_ms:.3f} ms, "
+              f"p99 {p99_ms:.3f} ms; result() {result_ms:.1f} ms; full reparse {full_ms:.1f} ms")
+        if result != full:
+            failures.append(f"{count} statements: incremental result differs from a full parse")
+
+    growth = medians[-1] / medians[0] if medians[0] else 0.0
+    print(f"📏 median edit latency grew {growth:.2f}x from smallest to largest file (limit {args.max_growth}x)")
+    if growth > args.max_growth:
+        failures.append("edit latency grows with file size")
+
+    if failures:
+        for failure in failures:
+            print(f"💥 {failure}")
+        sys.exit(1)
+    print("✅ Incremental parsing within budget.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Wall-clock budget check for the pre-commit lint entry point.
+
+Runs ``python -m liquibase_mongo.lint`` as a fresh interpreter, the way pre-commit does, and
+fails when the best of N runs exceeds the budget. Run from the repository root:
+
+    python benchmarks/bench_lint.py
+    python benchmarks/bench_lint.py --budget-ms 50 db_queries/version_41.js
+"""
+import os
+import sys
+import time
+import argparse
+import subprocess
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+LINT = ["-m", "liquibase_mongo.lint"]
+
+
+def best_wall_time_ms(cmd, runs):
+    """Return the fastest of ``runs`` executions of ``cmd`` in milliseconds."""
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(cmd, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Assert the linter runs within the pre-commit time budget.")
+    parser.add_argument("js_files", nargs="*", default=[os.path.join(ROOT, "db_queries", "version_41.js")])
+    parser.add_argument("--budget-ms", type=float, default=50.0, help="Allowed wall time per run.")
+    parser.add_argument("--runs", type=int, default=20, help="Number of runs; the fastest one is compared.")
+    args = parser.parse_args()
+    args.js_files = [os.path.abspath(path) for path in args.js_files]
+
+    # Warm the bytecode cache first so the measurement matches repeated hook runs
+    subprocess.run([sys.executable] + LINT + args.js_files, cwd=ROOT, stdout=subprocess.DEVNULL)
+
+    baseline = best_wall_time_ms([sys.executable, "-c", "pass"], args.runs)
+    lint = best_wall_time_ms([sys.executable] + LINT + ["--fail-fast"] + args.js_files, args.runs)
+
+    status = "✅" if lint <= args.budget_ms else "❌"
+    print(f"{status} lint: {lint:.1f} ms (interpreter alone: {baseline:.1f} ms, budget {args.budget_ms:.0f} ms)")
+    if lint > args.budget_ms:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
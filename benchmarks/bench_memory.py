@@ -0,0 +1,108 @@
+"""Peak-memory regression benchmark for the MongoDB to Liquibase converter.
+
+Generates synthetic query files of fixed sizes, runs every conversion phase
+in-process under tracemalloc and fails when the peak exceeds a fixed multiple
+of the input size. Run from the repository root:
+
+    python benchmarks/bench_memory.py                 # 10 MB, 100 MB, 1 GB
+    python benchmarks/bench_memory.py --sizes 10,100  # skip the 1 GB case
+
+The 1 GB case needs roughly 10 GB of RAM and runs for tens of minutes
+under tracemalloc; run it before merging changes to the extractor or emitter.
+"""
+import os
+import sys
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from liquibase_mongo import parser, generator, memprofile  # noqa: E402
+
+MB = 1024 * 1024
+
+HEADER = """// @context: liquibase_test
+// @author: bench
+// @description: Synthetic memory benchmark input
+// @version: 1.0
+"""
+
+STATEMENTS = [
+    """db.getCollection("bench_users").insertOne({{"name": "user_{i}", "email": "user_{i}@example.com", "createdAt": new Date("2023-01-01")}});
+""",
+    """db.getCollection("bench_users").updateMany({{"status": "pending_{i}"}}, {{"$set": {{"status": "active", "tier": {i}}}}});
+""",
+    """db.getCollection("bench_users").deleteMany({{"status": "inactive_{i}"}});
+""",
+    """// comment line {i} that the extractor strips before matching
+""",
+]
+
+
+def write_synthetic_file(path, size):
+    """Write a synthetic query file of roughly ``size`` bytes."""
+    written = 0
+    i = 0
+    with open(path, "w", encoding="utf-8") as file:
+        written += file.write(HEADER)
+        while written < size:
+            chunk = "".join(STATEMENTS[j % len(STATEMENTS)].format(i=i + j) for j in range(1000))
+            written += file.write(chunk)
+            i += 1000
+    return written
+
+
+def measure(path, version="bench_1"):
+    """Run every conversion phase on ``path`` and return the memory profile."""
+    profile = memprofile.start_memory_profile()
+    try:
+        with memprofile.memory_phase(profile, "read"):
+            content = parser.parse_js_file(path)
+        with memprofile.memory_phase(profile, "context"):
+            context = parser.extract_context_from_content(content)
+        with memprofile.memory_phase(profile, "extract"):
+            operations, errors, warnings = parser.extract_mongodb_operations_robust(content)
+        with memprofile.memory_phase(profile, "generate+write"):
+            xml_lines = generator.iter_liquibase_xml_robust(version, operations, "bench", context, errors, warnings)
+            generator.write_lines_to_file(xml_lines, path + ".xml")
+        input_size = len(content)
+        del content, operations
+    finally:
+        peak = memprofile.stop_memory_profile(profile)
+    return profile, input_size, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Assert converter peak memory stays under a multiple of input size.")
+    parser.add_argument("--sizes", default="10,100,1024", help="Comma-separated input sizes in MB.")
+    parser.add_argument("--max-ratio", type=float, default=10.0, help="Allowed peak memory as a multiple of input size.")
+    parser.add_argument("--top", type=int, default=5, help="Allocation sites to show per phase.")
+    parser.add_argument("--workdir", default=None, help="Directory for synthetic inputs (default: system temp).")
+    args = parser.parse_args()
+
+    failures = []
+    with tempfile.TemporaryDirectory(dir=args.workdir) as tmpdir:
+        for size_mb in [int(s) for s in args.sizes.split(",") if s.strip()]:
+            path = os.path.join(tmpdir, f"bench_{size_mb}mb.js")
+            write_synthetic_file(path, size_mb * MB)
+
+            profile, input_size, peak = measure(path)
+            ratio = peak / input_size
+            status = "✅" if ratio <= args.max_ratio else "❌"
+            print(f"{status} {size_mb} MB input: peak {memprofile.format_size(peak)} = {ratio:.2f}x (limit {args.max_ratio}x)")
+            if ratio > args.max_ratio:
+                print(memprofile.generate_memory_report(profile, input_size, args.top))
+                failures.append(size_mb)
+
+            for leftover in (path, path + ".xml"):
+                if os.path.exists(leftover):
+                    os.remove(leftover)
+
+    if failures:
+        print(f"💥 Peak memory regression for: {', '.join(f'{s} MB' for s in failures)}")
+        sys.exit(1)
+    print("✅ All memory benchmarks within budget.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Throughput benchmark for the dry-run simulator.
+
+Writes an NDJSON snapshot of ``--documents`` users, loads it into the
+simulator's store, then applies ``--lookups`` updateOne operations by a
+unique key plus an updateMany and a deleteMany by equality. Fails when the
+keyed updates average more than ``--max-lookup-ms`` (they should be served by
+the per-field hash index, not a scan) or when any operation's counts differ
+from a plain scan of the snapshot with the matcher. Run from the repository root:
+
+    python benchmarks/bench_simulator.py
+    python benchmarks/bench_simulator.py --documents 2000000
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from liquibase_mongo.matcher import matches  # noqa: E402
+from liquibase_mongo.simulator import DocumentStore, SimulationError, apply_operation  # noqa: E402
+
+
+def write_snapshot(directory, count):
+    with open(os.path.join(directory, "users.ndjson"), "w", encoding="utf-8") as file:
+        for i in range(count):
+            file.write(json.dumps({"_id": {"$oid": f"{i + 1:024x}"}, "email": f"user{i}@example.com",
+                                   "status": ("active", "pending", "closed")[i % 3], "tier": i % 7,
+                                   "tags": ["a", "b"] if i % 2 else []}) + "\n")
+
+
+def update(filter_text, update_text, op_type="updateOne"):
+    return {"type": op_type, "collection": "users", "filter": filter_text, "update": update_text}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Assert the simulator stays fast on large snapshots.")
+    parser.add_argument("--documents", type=int, default=300000, help="Snapshot size (default: 300000).")
+    parser.add_argument("--lookups", type=int, default=2000, help="Keyed updateOne operations (default: 2000).")
+    parser.add_argument("--max-lookup-ms", type=float, default=1.0, help="Allowed average per keyed update (default: 1.0).")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="bench_simulator_")
+    failures = []
+    try:
+        write_snapshot(directory, args.documents)
+        store = DocumentStore(directory)
+        start = time.perf_counter()
+        users = store.get("users")
+        print(f"📥 loaded {len(users):,} documents in {time.perf_counter() - start:.2f} s")
+
+        start = time.perf_counter()
+        users.create_index("email_1", [["email", 1]], {"unique": True})
+        print(f"🔑 unique index built in {time.perf_counter() - start:.2f} s")
+
+        start = time.perf_counter()
+        step = max(1, args.documents // args.lookups)
+        modified = sum(apply_operation(store, update(f'{{ email: "user{i}@example.com" }}', '{ $inc: { tier: 1 } }'))["modified"]
+                       for i in range(0, args.documents, step)[:args.lookups])
+        per_lookup = (time.perf_counter() - start) * 1000 / args.lookups
+        print(f"🎯 {args.lookups} keyed updates: {per_lookup:.3f} ms each")
+        if modified != min(args.lookups, len(range(0, args.documents, step))):
+            failures.append(f"keyed updates modified {modified} documents")
+        if per_lookup > args.max_lookup_ms:
+            failures.append(f"keyed updates took {per_lookup:.3f} ms each (limit {args.max_lookup_ms} ms)")
+
+        try:
+            apply_operation(store, update('{ email: "user0@example.com" }', '{ $set: { email: "user1@example.com" } }'))
+            failures.append("duplicate key on the unique index was not detected")
+        except SimulationError:
+            pass
+
+        bulk = [
+            (update('{ status: "pending", tier: { $gte: 3 } }', '{ $set: { flagged: true } }', "updateMany"),
+             {"status": "pending", "tier": {"$gte": 3}}, "modified"),
+            ({"type": "deleteMany", "collection": "users", "filter": '{ status: { $in: ["closed"] }, tags: "a" }'},
+             {"status": {"$in": ["closed"]}, "tags": "a"}, "deleted"),
+        ]
+        for operation, query, counted in bulk:
+            expected = sum(1 for document in users.documents.values() if matches(document, query))
+            start = time.perf_counter()
+            counts = apply_operation(store, operation)
+            print(f"📦 {operation['type']}: {counts[counted]:,} documents in {time.perf_counter() - start:.2f} s")
+            if counts[counted] != expected:
+                failures.append(f"{operation['type']} touched {counts[counted]} documents, a scan finds {expected}")
+    finally:
+        shutil.rmtree(directory)
+
+    if failures:
+        for failure in failures:
+            print(f"💥 {failure}")
+        sys.exit(1)
+    print("✅ Simulator within budget.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Import-time benchmark for the ``--skip-pr`` conversion path.
+
+Runs a full ``liquibase-mongo --skip-pr`` conversion under
+``python -S -X importtime`` and fails if anything outside the standard library
+(other than ``liquibase_mongo`` itself) is imported, e.g. PyGithub and its
+requests/cryptography/jwt stack. ``-S`` keeps site-packages off the path, so
+a stray third-party import also fails the conversion outright, and leaves
+interpreter customisation hooks out of the numbers. Run from the repository root:
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --top 15 db_queries/version_41.js
+"""
+import os
+import sys
+import argparse
+import sysconfig
+import tempfile
+import subprocess
+import importlib.util
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+
+def run_importtime(js_file, workdir):
+    """Run one skip-pr conversion and return [(module, depth, self_us, cumulative_us)] for every import."""
+    cmd = [
+        sys.executable, "-S", "-X", "importtime", "-m", "liquibase_mongo",
+        "--js_file", js_file, "--version", "startup_bench", "--author", "bench", "--skip-pr",
+    ]
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    proc = subprocess.run(cmd, cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"conversion failed with exit code {proc.returncode}:\n{proc.stderr[-2000:]}")
+
+    imports = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        imports.append((name.strip(), depth, int(self_us), int(cumulative_us)))
+    return imports
+
+
+def is_stdlib(name):
+    """Whether a top-level module belongs to the standard library."""
+    if hasattr(sys, "stdlib_module_names"):
+        return name in sys.stdlib_module_names
+    # Python 3.9 has no sys.stdlib_module_names: look where the module would be loaded from instead
+    if name in sys.builtin_module_names:
+        return True
+    spec = importlib.util.find_spec(name)
+    if spec is None or not spec.origin:
+        return False
+    if spec.origin in ("built-in", "frozen"):
+        return True
+    origin = os.path.realpath(spec.origin)
+    stdlib = {os.path.realpath(sysconfig.get_paths()[key]) for key in ("stdlib", "platstdlib")}
+    return "site-packages" not in origin and any(origin.startswith(path + os.sep) for path in stdlib)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Assert the skip-pr path imports only the standard library.")
+    parser.add_argument("js_file", nargs="?", default=os.path.join(ROOT, "db_queries", "version_41.js"))
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports to list.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        imports = run_importtime(os.path.abspath(args.js_file), workdir)
+
+    top_level = {name.split(".")[0] for name, _, _, _ in imports} - {"liquibase_mongo"}
+    third_party = sorted(name for name in top_level if not is_stdlib(name))
+    total_ms = sum(cumulative for _, depth, _, cumulative in imports if depth == 0) / 1000
+
+    print(f"Total import time: {total_ms:.1f} ms across {len(imports)} modules")
+    for name, _, self_us, cumulative_us in sorted(imports, key=lambda entry: entry[2], reverse=True)[:args.top]:
+        print(f"  {self_us / 1000:7.2f} ms self  {cumulative_us / 1000:7.2f} ms cumulative  {name}")
+
+    if third_party:
+        print(f"❌ Non-stdlib modules imported on the skip-pr path: {', '.join(third_party)}")
+        sys.exit(1)
+    print("✅ skip-pr path imports only the standard library.")
+
+
+if __name__ == "__main__":
+    main()
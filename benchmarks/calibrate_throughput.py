@@ -0,0 +1,111 @@
+"""Measure write throughput for the apply-time cost model.
+
+Runs a small workload against a MongoDB deployment (use one sized like the
+target, e.g. staging) in a scratch database that is dropped afterwards, and
+writes the measured rates to ``benchmarks/throughput_profile.json``, the
+profile ``--estimate-apply-time`` reads. Needs pymongo. Run from the
+repository root:
+
+    python benchmarks/calibrate_throughput.py --uri mongodb://staging:27017
+    python benchmarks/calibrate_throughput.py --uri "$MONGO_URI" --documents 200000 --dry-run
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from liquibase_mongo.costmodel import DEFAULT_PROFILE_PATH, save_profile  # noqa: E402
+
+SCRATCH_DATABASE = "liquibase_mongo_calibration"
+
+
+def documents(count, offset=0):
+    return [{"n": offset + i, "email": f"user{offset + i}@example.com", "status": ("active", "pending")[i % 2],
+             "profile": {"tier": i % 7, "tags": ["a", "b", "c"], "bio": "x" * 200}} for i in range(count)]
+
+
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    function(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def bson_encode(document):
+    import bson
+    return bson.encode(document)
+
+
+def calibrate(database, count, batch):
+    collection = database["throughput"]
+    collection.drop()
+    payload = documents(count)
+    size = sum(len(bson_encode(document)) for document in payload)
+
+    insert_seconds = sum(timed(collection.insert_many, payload[i:i + batch], ordered=True) for i in range(0, count, batch))
+    scan_seconds = timed(lambda: list(collection.find({"missing_field": 1})))
+    index_seconds = timed(collection.create_index, [("email", 1)])
+    collection.create_index([("status", 1), ("n", 1)])
+    collection.create_index([("profile.tier", 1)])
+    update_seconds = timed(collection.update_many, {}, {"$set": {"status": "archived"}})
+    delete_seconds = timed(collection.delete_many, {})
+
+    # The same insert with three secondary indexes shows what each one adds to a write
+    indexed_seconds = sum(timed(collection.insert_many, documents(batch, count + i), ordered=True) for i in range(0, count, batch))
+
+    changelog = database["databasechangelog_calibration"]
+    rounds = 50
+    changeset_seconds = sum(timed(lambda i=i: (changelog.find_one({"id": f"calibration.{i}"}),
+                                               changelog.insert_one({"id": f"calibration.{i}", "author": "calibration"})))
+                            for i in range(rounds)) / rounds
+
+    per_document = insert_seconds / count
+    byte_share = 0.5
+    return {
+        'changeset_seconds': round(changeset_seconds, 4),
+        # Half the insert time is attributed to document count, half to payload size
+        'insert_docs_per_second': round(count / (insert_seconds * (1 - byte_share))),
+        'insert_bytes_per_second': round(size / (insert_seconds * byte_share)),
+        'update_docs_per_second': round(count / update_seconds),
+        'delete_docs_per_second': round(count / delete_seconds),
+        'scan_docs_per_second': round(count / scan_seconds),
+        'index_build_docs_per_second': round(count / index_seconds),
+        'index_write_overhead': round(max(0.0, (indexed_seconds / count / per_document - 1) / 3), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibrate the apply-time throughput profile against a MongoDB deployment.")
+    parser.add_argument("--uri", required=True, help="MongoDB connection string.")
+    parser.add_argument("--documents", type=int, default=100000, help="Documents per phase (default: 100000).")
+    parser.add_argument("--batch", type=int, default=1000, help="insert_many batch size (default: 1000).")
+    parser.add_argument("--output", default=DEFAULT_PROFILE_PATH, help=f"Profile to write (default: {DEFAULT_PROFILE_PATH}).")
+    parser.add_argument("--dry-run", action="store_true", help="Print the rates without writing the profile.")
+    args = parser.parse_args()
+
+    try:
+        from pymongo import MongoClient
+    except ImportError:
+        print("💥 Calibration needs pymongo: pip install pymongo")
+        sys.exit(1)
+
+    client = MongoClient(args.uri)
+    try:
+        rates = calibrate(client[SCRATCH_DATABASE], args.documents, args.batch)
+        version = client.server_info().get("version", "unknown")
+    finally:
+        client.drop_database(SCRATCH_DATABASE)
+        client.close()
+
+    for name, value in rates.items():
+        print(f"   {name}: {value:,}")
+    if args.dry_run:
+        return
+    source = f"calibrated {time.strftime('%Y-%m-%d')} against MongoDB {version}, {args.documents:,} documents"
+    save_profile(rates, source, args.output)
+    print(f"💾 Throughput profile written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""Load test for the HTTP conversion service.
+
+Starts ``python -m liquibase_mongo serve`` on a free localhost port (or targets
+``--url``), sends concurrent /convert and /lint requests built from the files in
+db_queries/, and fails on any non-200 response or when client-side p99 latency
+exceeds the budget. Run from the repository root:
+
+    python benchmarks/load_test.py
+    python benchmarks/load_test.py --requests 5000 --concurrency 32 --unique 0.5
+    python benchmarks/load_test.py --url http://127.0.0.1:8765
+"""
+import os
+import sys
+import glob
+import json
+import time
+import socket
+import argparse
+import subprocess
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def request(url, body=None):
+    """Return (status, decoded JSON, seconds) for one request."""
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=30) as response:
+            status, payload = response.status, response.read()
+    except urllib.error.HTTPError as e:
+        status, payload = e.code, e.read()
+    return status, json.loads(payload or b"{}"), time.perf_counter() - start
+
+
+def wait_until_ready(url, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            request(url + "/metrics")
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"Server at {url} did not start within {timeout}s")
+
+
+def build_requests(count, unique_ratio):
+    """Mix repeated db_queries/ files (cache hits) with uniquely-suffixed copies (misses)."""
+    sources = []
+    for path in sorted(glob.glob(os.path.join(ROOT, "db_queries", "*.js"))):
+        with open(path, "r", encoding="utf-8") as file:
+            sources.append(file.read())
+
+    bodies = []
+    unique_every = max(1, round(1 / unique_ratio)) if unique_ratio > 0 else 0
+    for i in range(count):
+        source = sources[i % len(sources)]
+        if unique_every and i % unique_every == 0:
+            source += f"\n// load test request {i}\n"
+        if i % 2:
+            bodies.append(("/lint", {"source": source}))
+        else:
+            bodies.append(("/convert", {"source": source, "version": f"load_{i % len(sources)}", "author": "load-test"}))
+    return bodies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive the conversion server and check latency.")
+    parser.add_argument("--url", default=None, help="Existing server to target (default: start one).")
+    parser.add_argument("--requests", type=int, default=2000, help="Total requests to send.")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent client threads.")
+    parser.add_argument("--unique", type=float, default=0.25, help="Fraction of requests with unique bodies (cache misses).")
+    parser.add_argument("--workers", type=int, default=4, help="Worker processes for a server started here.")
+    parser.add_argument("--max-p99-ms", type=float, default=250.0, help="Client-side p99 budget.")
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if url is None:
+        port = free_port()
+        url = f"http://127.0.0.1:{port}"
+        cmd = [sys.executable, "-m", "liquibase_mongo", "serve", "--port", str(port),
+               "--workers", str(args.workers), "--queue-size", str(args.concurrency)]
+        server = subprocess.Popen(cmd, cwd=ROOT, stdout=subprocess.DEVNULL)
+
+    try:
+        wait_until_ready(url)
+        bodies = build_requests(args.requests, args.unique)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            results = list(pool.map(lambda item: request(url + item[0], item[1]), bodies))
+        elapsed = time.perf_counter() - start
+
+        _, metrics, _ = request(url + "/metrics")
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    latencies = sorted(seconds * 1000 for _, _, seconds in results)
+    failures = [status for status, _, _ in results if status != 200]
+    p50 = latencies[len(latencies) // 2]
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+
+    print(f"📈 {len(results)} requests in {elapsed:.2f}s = {len(results) / elapsed:.0f} req/s "
+          f"(concurrency {args.concurrency})")
+    print(f"⏱️ client p50 {p50:.2f} ms, p99 {p99:.2f} ms (budget {args.max_p99_ms:.0f} ms)")
+    print(f"🗄️ server: {metrics['cache_hits']} cache hits of {metrics['requests']} requests, "
+          f"{metrics['rejected']} rejected")
+    for path, stats in metrics["endpoints"].items():
+        print(f"   {path}: p50 {stats['p50_ms']} ms, p99 {stats['p99_ms']} ms over {stats['samples']} samples")
+
+    if failures:
+        print(f"❌ {len(failures)} non-200 responses: {sorted(set(failures))}")
+        sys.exit(1)
+    if p99 > args.max_p99_ms:
+        print("❌ p99 latency over budget.")
+        sys.exit(1)
+    print("✅ Load test passed.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,16 @@
+"""MongoDB shell queries to Liquibase MongoDB changelog converter.
+
+Submodules are imported on demand; importing the package itself loads only
+the standard library.
+"""
+__version__ = "0.5.0"
+
+__all__ = ['convert', 'ConversionResult']
+
+
+def __getattr__(name):
+    # Keep "import liquibase_mongo" cheap; the API module loads on first use
+    if name in __all__:
+        from . import api
+        return getattr(api, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,127 @@
+"""In-process conversion API for embedding the converter in other services.
+
+``convert`` takes source text and returns everything the CLI would have
+printed or written. It does no I/O, keeps no state between calls and shares
+only read-only module data (compiled regexes, the rule registry), so it is
+safe to call from many threads at once.
+"""
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from .parser import DEFAULT_CONTEXT, extract_context_from_content, extract_mongodb_operations_robust
+from .rules import build_rule_config, DEFAULT_RULE_CONFIG
+from .generator import generate_liquibase_xml_robust
+from .changeset_ids import assign_changeset_ids
+
+
+@dataclass(frozen=True)
+class ConversionResult:
+    """Outcome of one conversion. ``xml`` is None when errors blocked generation."""
+
+    operations: List[dict]
+    xml: Optional[str]
+    errors: List[str]
+    warnings: List[str]
+    context: str
+    timings: Dict[str, float] = field(default_factory=dict)
+    rule_timings: Dict[str, dict] = field(default_factory=dict)
+    id_map: Optional[dict] = None
+    notes: List[str] = field(default_factory=list)
+
+    @property
+    def ok(self):
+        return not self.errors
+
+
+def convert(source: str, *, version: str, author: str, context: Optional[str] = None,
+            default_context: str = DEFAULT_CONTEXT, disabled_rules=None, rule_severities=None,
+            rule_config=None, fail_on_warnings: bool = False, collect_rule_timings: bool = False,
+            id_scheme: str = 'position', id_map: Optional[dict] = None,
+            duplicate_index=None, source_name: Optional[str] = None,
+            samples=None, max_affected: Optional[int] = None,
+            throughput_profile: Optional[dict] = None, apply_budget: Optional[float] = None,
+            reorder: bool = False) -> ConversionResult:
+    """Convert MongoDB shell source to Liquibase XML without touching the filesystem.
+
+    ``context`` overrides the context declared in the source; otherwise the
+    header is searched and ``default_context`` is the fallback. Pass a
+    prebuilt ``rule_config`` (from ``rules.build_rule_config``) to avoid
+    rebuilding it per call; ``disabled_rules``/``rule_severities`` are a
+    convenience for one-off calls. Timings are wall-clock seconds per phase.
+
+    ``id_scheme`` selects the changeset ID scheme (see ``changeset_ids``); pass
+    the previous ``id_map`` for ``anchor`` and store ``result.id_map`` yourself.
+    With a ``duplicates.DuplicateIndex``, operations already present in another
+    indexed file (other than ``source_name``) are reported as warnings.
+    With a ``selectivity.SampleSet``, each update/delete gets an estimate of
+    the documents it touches in ``result.notes`` (and in the XML report);
+    estimates above ``max_affected`` are warnings. With a ``throughput_profile``
+    (from ``costmodel.load_profile``) the estimated apply time per changeSet
+    is added to the notes; a total above ``apply_budget`` seconds is an error.
+    ``reorder`` emits the operations in file order with indexes on new
+    collections moved after their bulk inserts (see ``reorder``).
+    """
+    if rule_config is None:
+        if disabled_rules or rule_severities:
+            rule_config = build_rule_config(disabled_rules, rule_severities)
+        else:
+            rule_config = DEFAULT_RULE_CONFIG
+
+    timings = {}
+    rule_timings = {} if collect_rule_timings else None
+    start = time.perf_counter()
+
+    if context is None:
+        context = extract_context_from_content(source, default_context)
+    timings['context'] = time.perf_counter() - start
+
+    phase_start = time.perf_counter()
+    operations, errors, warnings = extract_mongodb_operations_robust(source, rule_config, rule_timings)
+    if duplicate_index is not None:
+        warnings.extend(duplicate_index.check(source_name, operations))
+    timings['extract'] = time.perf_counter() - phase_start
+
+    notes = []
+    if reorder:
+        from .reorder import reorder_operations, reorder_notes
+        operations, moves = reorder_operations(operations, throughput_profile['rates'] if throughput_profile else None)
+        notes.extend(reorder_notes(moves))
+
+    estimates = None
+    if samples is not None:
+        from .selectivity import estimate_notes, estimate_operations
+        phase_start = time.perf_counter()
+        estimates = estimate_operations(operations, samples)
+        sample_notes, sample_warnings = estimate_notes(operations, estimates, max_affected)
+        notes.extend(sample_notes)
+        warnings.extend(sample_warnings)
+        timings['estimate'] = time.perf_counter() - phase_start
+    if throughput_profile is not None:
+        from .costmodel import apply_time_notes
+        cost_notes, cost_errors = apply_time_notes(operations, throughput_profile, estimates,
+                                                   samples.counts if samples is not None else None,
+                                                   rule_config.get('index_catalog'), apply_budget)
+        notes.extend(cost_notes)
+        errors.extend(cost_errors)
+
+    xml = None
+    new_id_map = None
+    if not errors and not (fail_on_warnings and warnings):
+        phase_start = time.perf_counter()
+        changeset_ids, new_id_map = assign_changeset_ids(version, operations, id_scheme, id_map)
+        xml = generate_liquibase_xml_robust(version, operations, author, context, errors, warnings, changeset_ids, notes)
+        timings['generate'] = time.perf_counter() - phase_start
+
+    timings['total'] = time.perf_counter() - start
+    return ConversionResult(
+        operations=operations,
+        xml=xml,
+        errors=errors,
+        warnings=warnings,
+        context=context,
+        timings=timings,
+        rule_timings=rule_timings or {},
+        id_map=new_id_map,
+        notes=notes,
+    )
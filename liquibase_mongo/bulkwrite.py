@@ -0,0 +1,86 @@
+"""Expand ``bulkWrite`` requests and group them into native write commands.
+
+``db.getCollection(x).bulkWrite([...], options)`` is kept as one operation
+whose ``requests`` hold the array text. ``bulk_requests`` turns each request
+(``{insertOne: {document}}``, ``{updateOne: {filter, update, ...}}``,
+``{replaceOne: {filter, replacement, ...}}``, ``{deleteMany: {filter}}``, ...)
+into the same operation dict the parser builds for the standalone call, so
+the simulator and the cost model handle them like any other operation.
+``group_requests`` then collects runs of consecutive requests of the same
+kind, each of which the generator writes as one ``insert``, ``update`` or
+``delete`` command. Runs keep the request order, so an ordered bulkWrite
+applies the same way in a handful of round trips.
+"""
+from .shell_literal import split_literal
+
+# Fields each request type takes; the first ones are required
+REQUEST_FIELDS = {
+    'insertOne': (('document',), ()),
+    'updateOne': (('filter', 'update'), ('upsert', 'arrayFilters', 'hint', 'collation')),
+    'updateMany': (('filter', 'update'), ('upsert', 'arrayFilters', 'hint', 'collation')),
+    'replaceOne': (('filter', 'replacement'), ('upsert', 'hint', 'collation')),
+    'deleteOne': (('filter',), ('hint', 'collation')),
+    'deleteMany': (('filter',), ('hint', 'collation')),
+}
+REQUEST_KINDS = {'insertOne': 'insert', 'updateOne': 'update', 'updateMany': 'update', 'replaceOne': 'update',
+                 'deleteOne': 'delete', 'deleteMany': 'delete'}
+
+# bulkWrite options and the commands they are passed to
+BULK_OPTIONS = {
+    'ordered': ('insert', 'update', 'delete'),
+    'writeConcern': ('insert', 'update', 'delete'),
+    'comment': ('insert', 'update', 'delete'),
+    'bypassDocumentValidation': ('insert', 'update'),
+    'let': ('update', 'delete'),
+}
+
+def _options_text(options):
+    return '{ ' + ', '.join(f"{key}: {value}" for key, value in options) + ' }' if options else None
+
+def bulk_requests(operation):
+    """Operation dicts for each request of a bulkWrite, in order; raises ValueError for malformed requests."""
+    operations = []
+    for number, request_text in enumerate(split_literal(operation['requests']), 1):
+        members = split_literal(request_text) if request_text.strip().startswith('{') else None
+        if not members or len(members) != 1 or not isinstance(members[0], tuple):
+            raise ValueError(f"bulkWrite request {number} must be an object with exactly one operation")
+        request_type, body_text = members[0]
+        if request_type not in REQUEST_FIELDS:
+            raise ValueError(f"bulkWrite request {number} uses {request_type}; "
+                             f"known operations: {', '.join(REQUEST_FIELDS)}")
+        body_members = split_literal(body_text) if body_text.strip().startswith('{') else None
+        if not body_members or not isinstance(body_members[0], tuple):
+            raise ValueError(f"bulkWrite request {number} ({request_type}) needs an object argument")
+        body = dict(body_members)
+        required, optional = REQUEST_FIELDS[request_type]
+        missing = [field for field in required if field not in body]
+        if missing:
+            raise ValueError(f"bulkWrite request {number} ({request_type}) is missing {', '.join(missing)}")
+        unknown = [field for field in body if field not in required + optional]
+        if unknown:
+            raise ValueError(f"bulkWrite request {number} ({request_type}) has unknown field '{unknown[0]}'")
+
+        sub_operation = {'type': request_type, 'collection': operation['collection'],
+                         'line_number': operation.get('line_number'), 'request': number}
+        if request_type == 'insertOne':
+            sub_operation['documents'] = body['document']
+        else:
+            sub_operation['filter'] = body['filter']
+            sub_operation['options'] = _options_text([(key, value) for key, value in body_members if key in optional])
+        if request_type in ('updateOne', 'updateMany'):
+            sub_operation['update'] = body['update']
+        elif request_type == 'replaceOne':
+            sub_operation['update'] = body['replacement']
+        operations.append(sub_operation)
+    return operations
+
+def group_requests(requests):
+    """(kind, requests) for each run of consecutive requests that one insert/update/delete command can carry."""
+    groups = []
+    for request in requests:
+        kind = REQUEST_KINDS[request['type']]
+        if groups and groups[-1][0] == kind:
+            groups[-1][1].append(request)
+        else:
+            groups.append((kind, [request]))
+    return groups
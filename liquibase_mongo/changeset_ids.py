@@ -0,0 +1,84 @@
+"""Changeset ID schemes that survive edits to a query file.
+
+``position`` is the original ``{version}.{n}`` numbering. ``hash`` derives each
+ID from the operation's content. ``anchor`` keeps whatever ID an operation was
+given the first time it was generated, recorded in an ID map file next to the
+changelog, and numbers new operations after the highest ID ever issued. Its
+first run reproduces the positional IDs, so files that are already deployed
+can switch to it without changing a checksum.
+"""
+import os
+import json
+import hashlib
+
+from .generator import extract_version_number
+
+ID_SCHEMES = ['position', 'hash', 'anchor']
+
+# Fields that define what an operation does; raw_match and line_number only say where it was
+FINGERPRINT_FIELDS = ('type', 'collection', 'documents', 'filter', 'update', 'pipeline', 'requests', 'options', 'index_key', 'index_spec')
+
+def operation_fingerprint(operation):
+    """Short content hash of an operation, insensitive to whitespace."""
+    canonical = {
+        field: ' '.join(operation[field].split()) if isinstance(operation[field], str) else operation[field]
+        for field in FINGERPRINT_FIELDS if field in operation
+    }
+    return hashlib.sha256(json.dumps(canonical, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+
+def operation_keys(operations):
+    """Fingerprint each operation, numbering repeats so identical operations stay distinct."""
+    seen = {}
+    keys = []
+    for operation in operations:
+        fingerprint = operation_fingerprint(operation)
+        occurrence = seen.get(fingerprint, 0)
+        seen[fingerprint] = occurrence + 1
+        keys.append(fingerprint if occurrence == 0 else f"{fingerprint}#{occurrence + 1}")
+    return keys
+
+def assign_changeset_ids(version, operations, scheme='position', id_map=None):
+    """Return (ids, new_id_map); ids is None for the positional scheme."""
+    if scheme not in ID_SCHEMES:
+        raise ValueError(f"Unknown changeset ID scheme: '{scheme}'. Use one of: {', '.join(ID_SCHEMES)}")
+    if scheme == 'position':
+        return None, None
+
+    base = extract_version_number(version)
+    keys = operation_keys(operations)
+
+    if scheme == 'hash':
+        ids = [f"{base}.{key.replace('#', '-')}" for key in keys]
+        return ids, {'version': version, 'scheme': scheme, 'ids': dict(zip(keys, ids))}
+
+    if not id_map or id_map.get('scheme') != 'anchor':
+        ids = [base] if len(keys) == 1 else [f"{base}.{i+1}" for i in range(len(keys))]
+        next_id = len(keys) + 1
+    else:
+        previous = id_map.get('ids', {})
+        next_id = id_map.get('next', len(previous) + 1)
+        ids = []
+        for key in keys:
+            if key in previous:
+                ids.append(previous[key])
+            else:
+                ids.append(f"{base}.{next_id}")
+                next_id += 1
+
+    return ids, {'version': version, 'scheme': scheme, 'next': next_id, 'ids': dict(zip(keys, ids))}
+
+def default_id_map_path(version, output_dir='json_changesets'):
+    return os.path.join(output_dir, f"{version}.ids.json")
+
+def load_id_map(path):
+    """Read an ID map, or return None when the file does not exist yet."""
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+def save_id_map(id_map, path):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(id_map, file, indent=2)
+        file.write('\n')
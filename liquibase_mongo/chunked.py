@@ -0,0 +1,337 @@
+"""Throttled, resumable deleteMany/updateMany in _id batches (``liquibase-mongo chunked``).
+
+One ``deleteMany`` over millions of documents holds its resources until it
+finishes and floods the oplog, so secondaries fall behind. With
+``--chunked-writes`` the converter leaves such operations out of the
+changelog and writes them as jobs to ``json_changesets/{version}.chunked.json``.
+``liquibase-mongo chunked run`` applies each job batch by batch:
+
+1. read the next ``batch_size`` matching ``_id`` values after the last one done
+   (in ``_id`` order, served by the ``_id`` index);
+2. apply the write to those ``_id`` values only (``$in``);
+3. record the last ``_id`` and the counts in the ``DATABASECHANGELOGCHUNKS``
+   collection of the database, keyed by job id;
+4. pause ``pause_ms`` before the next batch.
+
+Like the changelog, a job file is not tied to one database:
+``scripts/liquibase_runner.sh update`` runs every job on each database right
+after applying the changelog to it. Progress lives in the database itself,
+as ``DATABASECHANGELOG`` does for changeSets, so a later ``update`` from a
+fresh CI workspace skips finished jobs and resumes interrupted ones. The
+write and its checkpoint are two separate writes: a crash between them
+repeats that one batch on resume, which matters only for updates that are
+not idempotent (``$inc``, ``$push``). ``--snapshot DIR`` runs the jobs on the
+simulator's in-memory store instead of MongoDB, to try them out.
+"""
+import sys
+import json
+import time
+import heapq
+import argparse
+from decimal import Decimal
+from datetime import datetime, timezone
+
+from .matcher import ObjectId, UnsupportedQuery, compile_filter, from_shell_value, value_key
+from .shell_literal import ShellRegex, parse_shell_literal
+
+JOB_FORMAT = 1
+# Per-database record of each job's progress, next to Liquibase's DATABASECHANGELOG
+CHECKPOINT_COLLECTION = 'DATABASECHANGELOGCHUNKS'
+CHUNKED_TYPES = ('deleteMany', 'remove', 'updateMany')
+# Options a batch can carry; upsert (and anything unknown) keeps the operation in the changelog
+CHUNKABLE_OPTIONS = ('hint', 'collation', 'writeConcern', 'arrayFilters', 'comment', 'let')
+
+def default_jobs_path(version):
+    return f"json_changesets/{version}.chunked.json"
+
+def _option_names(operation):
+    try:
+        options = parse_shell_literal(operation['options']) if operation.get('options') else {}
+    except ValueError:
+        return None
+    return list(options) if isinstance(options, dict) else None
+
+def _position(operation):
+    return operation['offset'] if 'offset' in operation else operation.get('line_number') or 0
+
+def chunk_operations(operations, estimates, batch_size, pause_ms, version):
+    """Move large deleteMany/updateMany operations into jobs; returns (operations, estimates, jobs, notes, warnings).
+
+    Without estimates every deleteMany/updateMany is moved; with them only
+    those estimated to touch more than one batch (or an unknown number).
+    Jobs follow the order of the file.
+    """
+    kept, kept_estimates, moved, notes, warnings = [], [], [], [], []
+    for number, operation in enumerate(operations, 1):
+        estimate = estimates[number - 1] if estimates else None
+        if operation['type'] not in CHUNKED_TYPES:
+            kept.append(operation)
+            kept_estimates.append(estimate)
+            continue
+        names = _option_names(operation)
+        unsupported = sorted(set(names) - set(CHUNKABLE_OPTIONS)) if names is not None else None
+        if unsupported:
+            warnings.append(f"Operation {number} (line {operation.get('line_number')}): {operation['type']} with "
+                            f"{', '.join(unsupported)} cannot be chunked; it stays in the changelog")
+        small = estimate is not None and estimate.get('estimated') is not None and estimate['estimated'] <= batch_size
+        if names is None or unsupported or small:
+            kept.append(operation)
+            kept_estimates.append(estimate)
+        else:
+            moved.append((number, operation))
+
+    path = default_jobs_path(version)
+    jobs = []
+    for number, operation in sorted(moved, key=lambda pair: _position(pair[1])):
+        prefix = f"Operation {number} (line {operation.get('line_number')})"
+        job = {'id': f"{version}.chunk{len(jobs) + 1}", 'collection': operation['collection'],
+               'type': operation['type'], 'filter': operation['filter'], 'update': operation.get('update'),
+               'options': operation.get('options'), 'line_number': operation.get('line_number'),
+               'batch_size': batch_size, 'pause_ms': pause_ms}
+        jobs.append(job)
+        notes.append(f"{prefix}: {operation['type']} on '{operation['collection']}' moved to job {job['id']} in {path}; "
+                     f"scripts/liquibase_runner.sh update runs it on each database after this changelog "
+                     f"(batches of {batch_size:,}, {pause_ms} ms pause)")
+        later = [other for other in kept
+                 if other['collection'] == operation['collection'] and _position(other) > _position(operation)]
+        if later:
+            warnings.append(f"{prefix}: {len(later)} later operation(s) on '{operation['collection']}' now run "
+                            f"before the chunked {operation['type']} (it runs after the changelog)")
+    return kept, kept_estimates if estimates else estimates, jobs, notes, warnings
+
+def write_jobs(jobs, version, path):
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump({'format': JOB_FORMAT, 'version': version, 'jobs': jobs}, file, indent=2)
+        file.write('\n')
+
+def load_jobs(path):
+    with open(path, 'r', encoding='utf-8') as file:
+        data = json.load(file)
+    if data.get('format') != JOB_FORMAT:
+        raise ValueError(f"{path} is not a chunked job file (format {JOB_FORMAT})")
+    return data['jobs']
+
+# BSON comparison order of the types an _id can have, for sorting ids outside MongoDB (bool before int: it is one)
+ID_TYPE_ORDER = ((type(None), 1), (bool, 8), ((int, float, Decimal), 2), (str, 3), (dict, 4), (list, 5),
+                 (bytes, 6), (ObjectId, 7), (datetime, 9))
+# $type names of each rank, so a query can reach _ids of the types sorting after a given one
+RANK_TYPES = {1: ['null'], 2: ['number'], 3: ['string', 'symbol'], 4: ['object'], 6: ['binData'],
+              7: ['objectId'], 8: ['bool'], 9: ['date'], 10: ['timestamp', 'regex', 'maxKey']}
+
+def id_sort_key(value):
+    rank = next((rank for types, rank in ID_TYPE_ORDER if isinstance(value, types)), 10)
+    return (rank, json.dumps(value, sort_keys=True, default=str) if rank in (4, 5) else value)
+
+class SimulatorTarget:
+    """Applies batches to a simulator DocumentStore (one snapshot stands for every database).
+
+    Checkpoints are kept in memory per (database, job id), for as long as the target lives.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.checkpoints = {}
+
+    def load_checkpoint(self, database, job):
+        return dict(self.checkpoints.get((database, job['id']), {}))
+
+    def save_checkpoint(self, database, job, checkpoint):
+        self.checkpoints[(database, job['id'])] = dict(checkpoint)
+
+    def next_ids(self, database, job, query, after, limit):
+        collection = self.store.get(job['collection'])
+        ids = [collection.documents[number]['_id'] for number in collection.find(query)]
+        if after is not None:
+            ids = [value for value in ids if id_sort_key(value) > id_sort_key(after)]
+        return heapq.nsmallest(limit, ids, key=id_sort_key)
+
+    def apply(self, database, job, query, ids, update):
+        from .simulator import apply_update
+        options = from_shell_value(parse_shell_literal(job['options'])) if job.get('options') else {}
+        for name in ('collation', 'arrayFilters'):
+            if name in options:
+                raise UnsupportedQuery(f"Option {name}")
+        collection = self.store.get(job['collection'])
+        predicate = compile_filter(query)
+        counts = {'matched': 0, 'modified': 0, 'deleted': 0}
+        for value in ids:
+            number = collection.ids.get(value_key(value))
+            if number is None or not predicate(collection.documents[number]):
+                continue
+            document = collection.documents[number]
+            counts['matched'] += 1
+            if update is None:
+                collection.delete(number)
+                counts['deleted'] += 1
+                continue
+            updated = apply_update(document, update)
+            if updated != document:
+                collection.replace(number, updated)
+                counts['modified'] += 1
+        return counts
+
+class MongoTarget:
+    """Applies batches through a pymongo client."""
+
+    def __init__(self, client):
+        import bson
+        self.bson = bson
+        self.client = client
+
+    def _to_bson(self, value):
+        if isinstance(value, ObjectId):
+            return self.bson.ObjectId(value.hex)
+        if isinstance(value, Decimal):
+            return self.bson.Decimal128(value)
+        if isinstance(value, ShellRegex):
+            return self.bson.Regex(value.pattern, value.flags)
+        if isinstance(value, dict):
+            return {key: self._to_bson(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self._to_bson(item) for item in value]
+        return value
+
+    def _from_bson(self, value):
+        if isinstance(value, self.bson.ObjectId):
+            return ObjectId(str(value))
+        if isinstance(value, self.bson.Decimal128):
+            return value.to_decimal()
+        return value
+
+    def load_checkpoint(self, database, job):
+        document = self.client[database][CHECKPOINT_COLLECTION].find_one({'_id': job['id']}) or {}
+        return {key: self._from_bson(value) for key, value in document.items() if key not in ('_id', 'collection', 'type', 'updatedAt')}
+
+    def save_checkpoint(self, database, job, checkpoint):
+        document = dict(self._to_bson(checkpoint), collection=job['collection'], type=job['type'],
+                        updatedAt=datetime.now(timezone.utc))
+        self.client[database][CHECKPOINT_COLLECTION].replace_one({'_id': job['id']}, document, upsert=True)
+
+    def next_ids(self, database, job, query, after, limit):
+        if after is not None:
+            # $gt only matches _ids of after's own type; later types are added by $type
+            rank = id_sort_key(after)[0]
+            later = [name for other, names in RANK_TYPES.items() if other > rank for name in names]
+            query = {'$and': [query, {'$or': [{'_id': {'$gt': after}}, {'_id': {'$type': later}}]}]}
+        cursor = self.client[database][job['collection']].find(self._to_bson(query), {'_id': 1}).sort('_id', 1).limit(limit)
+        return [self._from_bson(document['_id']) for document in cursor]
+
+    def apply(self, database, job, query, ids, update):
+        # $in rather than an _id range: a range only matches _ids of its bounds' type (type bracketing)
+        batch = self._to_bson({'$and': [query, {'_id': {'$in': ids}}]})
+        options = from_shell_value(parse_shell_literal(job['options'])) if job.get('options') else {}
+        kwargs = {key: self._to_bson(options[key]) for key in ('hint', 'collation', 'comment', 'let') if key in options}
+        collection = self.client[database][job['collection']]
+        if 'writeConcern' in options:
+            from pymongo import WriteConcern
+            collection = collection.with_options(write_concern=WriteConcern(**options['writeConcern']))
+        if update is None:
+            return {'matched': 0, 'modified': 0, 'deleted': collection.delete_many(batch, **kwargs).deleted_count}
+        if 'arrayFilters' in options:
+            kwargs['array_filters'] = self._to_bson(options['arrayFilters'])
+        result = collection.update_many(batch, self._to_bson(update), **kwargs)
+        return {'matched': result.matched_count, 'modified': result.modified_count, 'deleted': 0}
+
+def run_job(target, database, job, checkpoint, sleep=time.sleep, max_batches=None, log=print):
+    """Apply one job from its checkpoint until no matching _id is left; returns False when max_batches stopped it.
+
+    checkpoint is the job's progress ({'after', 'batches', 'matched', 'modified',
+    'deleted', 'done'}); target.save_checkpoint() stores it after every batch.
+    """
+    query = from_shell_value(parse_shell_literal(job['filter']))
+    update = from_shell_value(parse_shell_literal(job['update'])) if job['type'] == 'updateMany' else None
+    after = checkpoint.get('after')
+    batches = 0
+    while not checkpoint.get('done'):
+        if max_batches is not None and batches >= max_batches:
+            return False
+        ids = target.next_ids(database, job, query, after, job['batch_size'])
+        if not ids:
+            checkpoint['done'] = True
+            target.save_checkpoint(database, job, checkpoint)
+            break
+        counts = target.apply(database, job, query, ids, update)
+        after = ids[-1]
+        checkpoint['after'] = after
+        checkpoint['batches'] = checkpoint.get('batches', 0) + 1
+        for name, count in counts.items():
+            checkpoint[name] = checkpoint.get(name, 0) + count
+        target.save_checkpoint(database, job, checkpoint)
+        batches += 1
+        log(f"   📦 {database}/{job['id']}: batch {checkpoint['batches']} up to _id {after!r} "
+            f"({counts['deleted'] or counts['modified']:,} document(s))")
+        sleep(job['pause_ms'] / 1000)
+    return True
+
+def run_jobs(target, database, jobs, sleep=time.sleep, max_batches=None, log=print):
+    """Run jobs in order on database, skipping finished ones and resuming from the target's checkpoints.
+
+    Returns (checkpoints, finished); checkpoints are keyed by job id.
+    """
+    checkpoints = {}
+    for job in jobs:
+        checkpoint = checkpoints[job['id']] = target.load_checkpoint(database, job)
+        if checkpoint.get('done'):
+            log(f"⏭️ {database}/{job['id']}: already done")
+            continue
+        log(f"🔁 {database}/{job['id']}: {job['type']} on '{job['collection']}' in batches of {job['batch_size']:,}"
+            + (f", resuming after _id {checkpoint['after']!r}" if 'after' in checkpoint else ""))
+        if not run_job(target, database, job, checkpoint, sleep, max_batches, log):
+            return checkpoints, False
+    return checkpoints, True
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="liquibase-mongo chunked", description="Run chunked deleteMany/updateMany jobs batch by batch.")
+    parser.add_argument("command", choices=["run"], help="Run the jobs of a job file, skipping finished ones and resuming interrupted ones.")
+    parser.add_argument("jobs", help="Job file written by --chunked-writes (json_changesets/{version}.chunked.json).")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--uri", help="MongoDB connection string (needs pymongo).")
+    target.add_argument("--snapshot", metavar="DIR", help="Try the jobs on an in-memory copy of a snapshot directory.")
+    parser.add_argument("--database", required=True, help="Database to run every job on (the runner passes each one it updates).")
+    parser.add_argument("--batch-size", type=int, help="Override every job's batch size.")
+    parser.add_argument("--pause-ms", type=int, help="Override every job's pause between batches.")
+    parser.add_argument("--max-batches", type=int, help="Stop a job after this many batches (rerun to resume).")
+    args = parser.parse_args(argv)
+
+    try:
+        jobs = load_jobs(args.jobs)
+    except (OSError, ValueError) as e:
+        print(f"💥 {e}")
+        return 1
+    overrides = {'batch_size': args.batch_size, 'pause_ms': args.pause_ms}
+    for job in jobs:
+        job.update({key: value for key, value in overrides.items() if value is not None})
+
+    client = None
+    if args.snapshot:
+        from .simulator import DocumentStore
+        target = SimulatorTarget(DocumentStore(args.snapshot))
+    else:
+        try:
+            from pymongo import MongoClient
+        except ImportError:
+            print("💥 chunked run needs pymongo: pip install pymongo")
+            return 1
+        client = MongoClient(args.uri)
+        target = MongoTarget(client)
+    try:
+        checkpoints, finished = run_jobs(target, args.database, jobs, max_batches=args.max_batches)
+    except (UnsupportedQuery, ValueError) as e:
+        print(f"💥 {e}")
+        return 1
+    finally:
+        if client is not None:
+            client.close()
+
+    for job in jobs:
+        checkpoint = checkpoints.get(job['id'], {})
+        print(f"   {args.database}/{job['id']}: {checkpoint.get('batches', 0)} batch(es), {checkpoint.get('deleted', 0):,} deleted, "
+              f"{checkpoint.get('modified', 0):,} modified")
+    if not finished:
+        print("⏸️ Stopped after --max-batches; rerun to resume")
+    else:
+        print(f"✅ {len(jobs)} job(s) done" + ("" if args.snapshot else f"; progress in {args.database}.{CHECKPOINT_COLLECTION}"))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
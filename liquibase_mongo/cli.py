@@ -0,0 +1,260 @@
+"""Command line entry point: ``liquibase-mongo`` (and ``scripts/v5.py``)."""
+import os
+import sys
+import glob
+import logging
+import argparse
+import importlib
+from contextlib import nullcontext
+
+from .parser import DEFAULT_CONTEXT, parse_js_file, extract_context_from_content, extract_mongodb_operations_robust
+from .rules import build_rule_config, generate_rule_list, generate_rule_timing_report
+from .generator import generate_validation_report, iter_liquibase_xml_robust, write_lines_to_file
+
+# Subcommands are imported only when invoked so each one pays for its own dependencies
+COMMANDS = {
+    'chunked': 'liquibase_mongo.chunked',
+    'duplicates': 'liquibase_mongo.duplicates',
+    'indexes': 'liquibase_mongo.indexes',
+    'lint': 'liquibase_mongo.lint',
+    'serve': 'liquibase_mongo.server',
+    'simulate': 'liquibase_mongo.simulator',
+    'squash': 'liquibase_mongo.squash',
+    'watch': 'liquibase_mongo.watch',
+}
+
+class ConsoleFormatter(logging.Formatter):
+    """Print log records the way the converter always has: DEBUG lines prefixed, the rest bare."""
+
+    def format(self, record):
+        message = record.getMessage()
+        return f"DEBUG: {message}" if record.levelno == logging.DEBUG else message
+
+def configure_console_logging(level=logging.DEBUG):
+    """Send the package's log records to stdout."""
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(ConsoleFormatter())
+    package_logger = logging.getLogger('liquibase_mongo')
+    package_logger.handlers[:] = [handler]
+    package_logger.setLevel(level)
+    package_logger.propagate = False
+
+def parse_rule_options(args, index_catalog=None):
+    """Build a rule configuration from --disable-rule / --rule-severity."""
+    return build_rule_config(
+        disabled=args.disable_rule,
+        severities=dict(item.split("=", 1) for item in args.rule_severity if "=" in item),
+        index_catalog=index_catalog,
+    )
+
+def add_rule_arguments(parser):
+    """Add the validation rule options shared by every command."""
+    parser.add_argument("--disable-rule", action="append", default=[], metavar="RULE", help="Disable a validation rule (repeatable).")
+    parser.add_argument("--rule-severity", action="append", default=[], metavar="RULE=LEVEL", help="Override a rule's severity with 'error' or 'warning' (repeatable).")
+
+def build_parser(default_context=DEFAULT_CONTEXT):
+    parser = argparse.ArgumentParser(
+        prog="liquibase-mongo",
+        description="Generate Liquibase XML with enhanced validation and error handling.",
+        epilog=(f"commands:\n  {', '.join(COMMANDS)}  (run 'liquibase-mongo <command> --help')\n\n"
+                "validation rules:\n" + generate_rule_list()),
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--js_file", required=True, help="Path to the .js file.")
+    parser.add_argument("--version", required=True, help="Version for the XML changeset.")
+    parser.add_argument("--author", required=True, help="Author for the changeset.")
+    parser.add_argument("--repo", help="GitHub repository (e.g., 'owner/repo'). Required unless --skip-pr.")
+    parser.add_argument("--branch", help="Target branch for the PR. Required unless --skip-pr.")
+    parser.add_argument("--token", help="GitHub token for authentication. Required unless --skip-pr.")
+    parser.add_argument("--default-context", default=default_context, help=f"Context used when the file declares none (default: {default_context}).")
+    parser.add_argument("--fail-on-warnings", action="store_true", help="Fail if warnings are found.")
+    parser.add_argument("--skip-pr", action="store_true", help="Skip creating PR, just generate XML.")
+    parser.add_argument("--check-duplicates", nargs="?", const="db_queries", metavar="DIR",
+                        help="Warn about operations that already exist in another .js file in DIR (default: db_queries).")
+    parser.add_argument("--index-catalog", nargs="?", const="json_changesets/index_catalog.json", metavar="FILE",
+                        help="Warn about update/delete filters no known index serves (default catalog: json_changesets/index_catalog.json).")
+    parser.add_argument("--samples", metavar="DIR", help="Estimate documents touched by each update/delete from DIR/{collection}.ndjson and DIR/counts.json.")
+    parser.add_argument("--max-affected", type=int, metavar="N", help="With --samples, warn when an operation would touch more than N documents.")
+    parser.add_argument("--reorder", action="store_true",
+                        help="Emit operations in file order, moving createIndex on new collections after their bulk inserts.")
+    parser.add_argument("--estimate-apply-time", action="store_true",
+                        help="Estimate how long each changeSet takes to apply (uses --samples and --index-catalog when given).")
+    parser.add_argument("--throughput-profile", default="benchmarks/throughput_profile.json", metavar="FILE",
+                        help="Throughput profile for --estimate-apply-time (default: benchmarks/throughput_profile.json).")
+    parser.add_argument("--apply-budget", type=float, metavar="SECONDS",
+                        help="Fail when the estimated apply time exceeds SECONDS (implies --estimate-apply-time).")
+    parser.add_argument("--chunked-writes", action="store_true",
+                        help="Move large deleteMany/updateMany into a throttled, resumable job file for 'liquibase-mongo chunked run' (with --samples, only those touching more than one batch).")
+    parser.add_argument("--chunk-size", type=int, default=1000, metavar="N", help="Documents per batch for --chunked-writes (default: 1000).")
+    parser.add_argument("--chunk-pause-ms", type=int, default=100, metavar="MS", help="Pause between batches for --chunked-writes (default: 100).")
+    parser.add_argument("--changeset-ids", choices=["position", "hash", "anchor"], default="position",
+                        help="Changeset ID scheme: position ({version}.{n}, default), hash (content hash) or anchor (IDs kept in an ID map file).")
+    parser.add_argument("--id-map", help="ID map file for --changeset-ids hash/anchor (default: json_changesets/{version}.ids.json).")
+    parser.add_argument("--memprofile", action="store_true", help="Report peak memory and top allocation sites per phase.")
+    parser.add_argument("--memprofile-top", type=int, default=10, help="Number of allocation sites to show per phase.")
+    add_rule_arguments(parser)
+    parser.add_argument("--rule-timings", action="store_true", help="Report time spent in each validation rule.")
+    return parser
+
+def main(argv=None, default_context=DEFAULT_CONTEXT):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in COMMANDS:
+        return importlib.import_module(COMMANDS[argv[0]]).main(argv[1:])
+
+    parser = build_parser(default_context)
+    args = parser.parse_args(argv)
+    if not args.skip_pr:
+        missing = [f"--{name}" for name in ('repo', 'branch', 'token') if not getattr(args, name)]
+        if missing:
+            parser.error(f"{', '.join(missing)} required unless --skip-pr is given")
+
+    configure_console_logging()
+
+    # Set before the try so the memory report in finally works on every return path
+    profile = None
+    content = ""
+    try:
+        js_file_path = args.js_file
+        version = args.version
+        author = args.author
+
+        print(f"🔍 Processing JS file: {js_file_path}")
+        print("=" * 60)
+        
+        rule_config = parse_rule_options(args)
+        rule_timings = {} if args.rule_timings else None
+        
+        if args.memprofile:
+            from . import memprofile
+            profile = memprofile.start_memory_profile()
+            phase = lambda name: memprofile.memory_phase(profile, name)
+        else:
+            phase = lambda name: nullcontext()
+        
+        with phase("read"):
+            content = parse_js_file(js_file_path)
+        
+        if args.index_catalog:
+            from .indexes import catalog_for_source
+            print(f"📇 Loading index catalog: {args.index_catalog}")
+            rule_config = parse_rule_options(args, catalog_for_source(args.index_catalog, content, args.default_context))
+        
+        print(f"📋 Extracting context from file...")
+        with phase("context"):
+            context = extract_context_from_content(content, args.default_context)
+        print(f"✅ Using context: '{context}'")
+        
+        print(f"🔎 Extracting and validating MongoDB operations...")
+        with phase("extract"):
+            operations, errors, warnings = extract_mongodb_operations_robust(content, rule_config, rule_timings)
+        
+        if args.check_duplicates:
+            from .duplicates import build_index
+            print(f"🧬 Checking for duplicates of other files in {args.check_duplicates}/...")
+            corpus = sorted(glob.glob(os.path.join(args.check_duplicates, "*.js")))
+            warnings.extend(build_index(corpus, rule_config, exclude=js_file_path).check(js_file_path, operations))
+        
+        notes = []
+        if args.reorder:
+            from .costmodel import load_profile
+            from .reorder import reorder_operations, reorder_notes
+            print("🔀 Reordering operations (file order, indexes after bulk loads)...")
+            operations, moves = reorder_operations(operations, load_profile(args.throughput_profile)['rates'])
+            notes.extend(reorder_notes(moves))
+        
+        estimates = samples = None
+        if args.samples:
+            from .selectivity import SampleSet, estimate_notes, estimate_operations
+            print(f"🧪 Estimating affected documents from samples in {args.samples}/...")
+            samples = SampleSet(args.samples)
+            estimates = estimate_operations(operations, samples)
+            sample_notes, sample_warnings = estimate_notes(operations, estimates, args.max_affected)
+            notes.extend(sample_notes)
+            warnings.extend(sample_warnings)
+        
+        jobs = []
+        if args.chunked_writes:
+            from .chunked import chunk_operations
+            print(f"🧱 Moving large deleteMany/updateMany into chunked jobs ({args.chunk_size:,} per batch)...")
+            operations, estimates, jobs, chunk_notes, chunk_warnings = chunk_operations(
+                operations, estimates, args.chunk_size, args.chunk_pause_ms, version)
+            notes.extend(chunk_notes)
+            warnings.extend(chunk_warnings)
+        
+        if args.estimate_apply_time or args.apply_budget is not None:
+            from .costmodel import apply_time_notes, load_profile
+            print(f"⏱️ Estimating apply time with throughput profile {args.throughput_profile}...")
+            cost_notes, cost_errors = apply_time_notes(operations, load_profile(args.throughput_profile), estimates,
+                                                       samples.counts if samples else None,
+                                                       rule_config.get('index_catalog'), args.apply_budget)
+            notes.extend(cost_notes)
+            errors.extend(cost_errors)
+        
+        print("\n" + "=" * 60)
+        print("📊 VALIDATION SUMMARY")
+        print("=" * 60)
+        
+        validation_report = generate_validation_report(errors, warnings, notes)
+        print(validation_report)
+        
+        if rule_timings is not None:
+            print(generate_rule_timing_report(rule_timings))
+        
+        # Stop if there are critical errors
+        if errors:
+            print("💥 GENERATION FAILED: Critical errors must be fixed before proceeding.")
+            print("\n📖 Please refer to the MongoDB Query Guidelines and fix the issues above.")
+            return 1
+        
+        # Stop if fail-on-warnings is enabled and there are warnings
+        if args.fail_on_warnings and warnings:
+            print("⚠️ GENERATION STOPPED: Warnings found and --fail-on-warnings is enabled.")
+            return 1
+        
+        print(f"🏗️ Generating Liquibase XML for version: {version}")
+        changeset_file_path = f"json_changesets/{version}.xml"
+        changeset_ids = id_map = None
+        if args.changeset_ids != "position":
+            from .changeset_ids import assign_changeset_ids, default_id_map_path, load_id_map, save_id_map
+            id_map_path = args.id_map or default_id_map_path(version)
+            changeset_ids, id_map = assign_changeset_ids(version, operations, args.changeset_ids, load_id_map(id_map_path))
+        print(f"💾 Writing XML to: {changeset_file_path}")
+        with phase("generate+write"):
+            xml_lines = iter_liquibase_xml_robust(version, operations, author, context, errors, warnings, changeset_ids, notes)
+            write_lines_to_file(xml_lines, changeset_file_path)
+        print(f"✅ XML file created successfully!")
+        if id_map is not None:
+            save_id_map(id_map, id_map_path)
+            print(f"🔖 Changeset IDs ({args.changeset_ids}) saved to: {id_map_path}")
+        if jobs:
+            from .chunked import default_jobs_path, write_jobs
+            jobs_path = default_jobs_path(version)
+            write_jobs(jobs, version, jobs_path)
+            print(f"🧱 {len(jobs)} chunked job(s) saved to: {jobs_path} (run on each database by scripts/liquibase_runner.sh update after the changelog)")
+        
+        if args.skip_pr:
+            print("⏭️ Skipping PR creation as requested (--skip-pr flag).")
+            print(f"📄 XML file saved to: {changeset_file_path}")
+        else:
+            # PyGithub (requests, cryptography, jwt) is only loaded on this path
+            from .github_pr import create_pull_request
+            print(f"🚀 Creating pull request...")
+            extra_files = ([id_map_path] if id_map is not None else []) + ([jobs_path] if jobs else [])
+            pr = create_pull_request(args.repo, args.branch, changeset_file_path, js_file_path, args.token, extra_files)
+            print(f"🎉 Pull Request created successfully: {pr.html_url}")
+        
+        print("\n" + "=" * 60)
+        print("✅ PROCESS COMPLETED SUCCESSFULLY!")
+        print("=" * 60)
+        return 0
+        
+    except Exception as e:
+        print(f"💥 ERROR: {str(e)}")
+        return 1
+    finally:
+        if profile is not None:
+            memprofile.stop_memory_profile(profile)
+            print(memprofile.generate_memory_report(profile, len(content), args.memprofile_top))
+
+if __name__ == "__main__":
+    sys.exit(main())
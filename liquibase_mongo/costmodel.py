@@ -0,0 +1,170 @@
+"""Estimate how long each changeset takes to apply.
+
+Every changeSet pays a fixed Liquibase overhead (lock check, the
+DATABASECHANGELOG insert). On top of that inserts cost per document and per
+byte, updates and deletes per document they touch (from ``--samples``
+estimates; updateOne/deleteOne touch one), filters no index serves a scan of
+the whole collection, createIndex a pass over every document and aggregate
+($merge/$out) at least a pass over its source collection. Writes are
+slowed down by each secondary index they have to maintain (from the index
+catalog). Document counts come from the samples' ``counts.json``.
+
+The rates live in a throughput profile, ``benchmarks/throughput_profile.json``,
+which ``benchmarks/calibrate_throughput.py`` measures against a real
+deployment. Without one the built-in defaults are used. An estimate is a
+lower bound ("+") when a count or match estimate it needs is missing.
+"""
+import os
+import json
+
+from .bulkwrite import bulk_requests
+from .shell_literal import split_literal
+
+DEFAULT_PROFILE_PATH = os.path.join('benchmarks', 'throughput_profile.json')
+PROFILE_FORMAT = 1
+
+DEFAULT_RATES = {
+    'changeset_seconds': 0.05,
+    'insert_docs_per_second': 20000,
+    'insert_bytes_per_second': 20000000,
+    'update_docs_per_second': 8000,
+    'delete_docs_per_second': 10000,
+    'scan_docs_per_second': 400000,
+    'index_build_docs_per_second': 150000,
+    # Extra cost of a write per secondary index, as a fraction of the write itself
+    'index_write_overhead': 0.2,
+}
+
+INSERT_TYPES = ('insertOne', 'insertMany', 'insert')
+UPDATE_TYPES = ('updateOne', 'updateMany', 'replaceOne')
+DELETE_TYPES = ('deleteOne', 'deleteMany', 'remove')
+SINGLE_DOCUMENT_TYPES = ('updateOne', 'replaceOne', 'deleteOne')
+
+def load_profile(path=DEFAULT_PROFILE_PATH):
+    """{'source': ..., 'rates': {...}}; rates missing from the file keep their defaults."""
+    profile = {'source': 'built-in defaults', 'rates': dict(DEFAULT_RATES)}
+    if path and os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as file:
+            data = json.load(file)
+        if data.get('format') == PROFILE_FORMAT:
+            profile['source'] = data.get('source') or path
+            profile['rates'].update({key: value for key, value in data.get('rates', {}).items() if key in DEFAULT_RATES})
+    return profile
+
+def save_profile(rates, source, path=DEFAULT_PROFILE_PATH):
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump({'format': PROFILE_FORMAT, 'source': source, 'rates': rates}, file, indent=2)
+        file.write('\n')
+
+def format_duration(seconds):
+    if seconds < 60:
+        return f"{seconds * 1000:.1f} ms" if seconds < 1 else f"{seconds:.1f} s"
+    if seconds < 3600:
+        return f"{int(seconds // 60)}m {int(seconds % 60):02d}s"
+    return f"{int(seconds // 3600)}h {int(seconds % 3600 // 60):02d}m"
+
+def _document_count(text):
+    try:
+        members = split_literal(text)
+    except ValueError:
+        return 1
+    return len(members) if text.strip().startswith('[') else 1
+
+def estimate_apply_time(operation, rates, estimate=None, count=None, indexes=0, unindexed=False):
+    """{'seconds', 'lower_bound', 'details'} for one operation.
+
+    estimate is the operation's selectivity estimate, count the collection's
+    document count, indexes its number of secondary indexes and unindexed
+    whether no index serves the filter.
+    """
+    op_type = operation['type']
+    seconds = rates['changeset_seconds']
+    lower_bound = False
+    details = []
+    write_factor = 1 + rates['index_write_overhead'] * indexes
+    if indexes and op_type in INSERT_TYPES + UPDATE_TYPES + DELETE_TYPES:
+        details.append(f"{indexes} secondary index(es) to maintain")
+
+    if op_type in INSERT_TYPES:
+        documents = _document_count(operation.get('documents') or '')
+        size = len((operation.get('documents') or '').encode('utf-8'))
+        seconds += (documents / rates['insert_docs_per_second'] + size / rates['insert_bytes_per_second']) * write_factor
+        details.insert(0, f"{documents:,} document(s), {size:,} bytes")
+    elif op_type in UPDATE_TYPES + DELETE_TYPES:
+        if estimate is not None and estimate.get('estimated') is not None:
+            affected = estimate['estimated']
+        elif op_type in SINGLE_DOCUMENT_TYPES:
+            affected = 1
+        else:
+            affected = 0
+            lower_bound = True
+            details.insert(0, "documents touched unknown")
+        if affected or not lower_bound:
+            rate = rates['update_docs_per_second'] if op_type in UPDATE_TYPES else rates['delete_docs_per_second']
+            seconds += affected / rate * write_factor
+            details.insert(0, f"{affected:,} document(s) touched")
+        if unindexed:
+            if count is None:
+                lower_bound = True
+                details.append("collection scan of unknown size")
+            else:
+                seconds += count / rates['scan_docs_per_second']
+                details.append(f"collection scan of {count:,} documents")
+    elif op_type == 'bulkWrite':
+        # One changeSet overhead for the whole bulkWrite; each request costs what the standalone call would
+        request_rates = dict(rates, changeset_seconds=0)
+        requests = bulk_requests(operation)
+        for request in requests:
+            result = estimate_apply_time(request, request_rates, None, count, indexes, unindexed=False)
+            seconds += result['seconds']
+            lower_bound = lower_bound or result['lower_bound']
+        details.insert(0, f"{len(requests):,} request(s)")
+    elif op_type == 'aggregate':
+        # The pipeline reads the whole source collection at best; what $merge/$out writes is not estimated
+        lower_bound = True
+        if count is None:
+            details.insert(0, "pipeline over a collection of unknown size")
+        else:
+            seconds += count / rates['scan_docs_per_second']
+            details.insert(0, f"pipeline over {count:,} documents, writes not estimated")
+    elif op_type == 'createIndex':
+        if count is None:
+            lower_bound = True
+            details.insert(0, "document count unknown")
+        else:
+            seconds += count / rates['index_build_docs_per_second']
+            details.insert(0, f"{count:,} document(s) to index")
+    return {'seconds': seconds, 'lower_bound': lower_bound, 'details': details}
+
+def apply_time_notes(operations, profile, estimates=None, counts=None, catalog=None, budget=None):
+    """Report notes with the estimated apply time per changeset and in total, and an error above budget seconds.
+
+    Each operation is its own changeSet, so the notes follow the operations.
+    """
+    from .indexes import unindexed_filter_message
+    counts = counts or {}
+    rates = profile['rates']
+    notes = []
+    total = 0.0
+    lower_bound = False
+    for number, operation in enumerate(operations, 1):
+        collection = operation['collection']
+        unindexed = (catalog is not None and 'filter' in operation
+                     and unindexed_filter_message(catalog, operation) is not None)
+        indexes = len(catalog.indexes(collection, operation.get('context'))) if catalog is not None else 0
+        result = estimate_apply_time(operation, rates, estimates[number - 1] if estimates else None,
+                                     counts.get(collection), indexes, unindexed)
+        total += result['seconds']
+        lower_bound = lower_bound or result['lower_bound']
+        plus = '+' if result['lower_bound'] else ''
+        notes.append(f"Operation {number} (line {operation.get('line_number')}): {operation['type']} on "
+                     f"'{collection}' takes about {format_duration(result['seconds'])}{plus} "
+                     f"({', '.join(result['details']) or 'changeSet overhead only'})")
+    plus = '+' if lower_bound else ''
+    notes.insert(0, f"Estimated apply time: {format_duration(total)}{plus} for {len(operations)} changeSet(s) "
+                    f"(throughput profile: {profile['source']})")
+    errors = []
+    if budget is not None and total > budget:
+        errors.append(f"Estimated apply time {format_duration(total)}{plus} exceeds the budget of "
+                      f"{format_duration(budget)}")
+    return notes, errors
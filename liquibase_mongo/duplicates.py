@@ -0,0 +1,182 @@
+"""Find operations that appear in more than one query file (``liquibase-mongo duplicates``).
+
+Every operation gets two content keys. The exact key hashes the type,
+collection and parsed arguments, so quoting and whitespace do not matter.
+Key order is ignored only where MongoDB ignores it (the fields and operators
+of a filter or update); index keys, pipeline stages like ``$sort`` and
+embedded documents keep theirs. The near key also ignores volatile values (dates, ObjectIds,
+timestamps), the order of documents in an insert, and whether an insert was
+written as insertOne, insertMany or insert. Both keys are looked up in dicts,
+so checking an operation against the whole corpus is O(1).
+"""
+import os
+import sys
+import glob
+import json
+import hashlib
+import logging
+import argparse
+
+from .parser import extract_context_from_content, extract_mongodb_operations_robust
+from .shell_literal import ShellCall, parse_shell_literal, canonical_json, to_json_compatible
+
+VOLATILE_CALLS = {'ISODate', 'ObjectId', 'Timestamp', 'UUID'}
+INSERT_TYPES = ('insertOne', 'insertMany', 'insert')
+ARGUMENT_FIELDS = ('documents', 'filter', 'update', 'pipeline', 'requests', 'options', 'index_key', 'index_spec')
+# Arguments whose key order MongoDB ignores, and the operators whose value is again a filter or field list
+UNORDERED_FIELDS = ('filter', 'update')
+UNORDERED_OPERATORS = {'$and', '$or', '$nor', '$not', '$elemMatch', '$set', '$unset', '$setOnInsert', '$inc',
+                       '$mul', '$min', '$max', '$rename', '$currentDate', '$push', '$addToSet', '$pull',
+                       '$pullAll', '$pop', '$bit'}
+
+def _parse_argument(text):
+    try:
+        return parse_shell_literal(text)
+    except ValueError:
+        # Keep unparseable arguments comparable, just without normalization
+        return ' '.join(text.split())
+
+def _sort_unordered(value, fields=True):
+    """Sort the field names and operators of a filter or update; values they compare or set keep their order."""
+    if isinstance(value, list) and fields:
+        return [_sort_unordered(item) for item in value]
+    if not isinstance(value, dict) or not (fields or all(str(key).startswith('$') for key in value)):
+        return value
+    return {key: _sort_unordered(value[key], key in UNORDERED_OPERATORS) for key in sorted(value, key=str)}
+
+def _mask_volatile(value):
+    if isinstance(value, ShellCall):
+        return f"<{value.name}>" if value.name in VOLATILE_CALLS else ShellCall(value.name, tuple(_mask_volatile(a) for a in value.args))
+    if isinstance(value, dict):
+        return {key: _mask_volatile(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_mask_volatile(item) for item in value]
+    return value
+
+def _digest(parts):
+    # Not canonical_json: its sorted keys would make createIndex({a: 1, b: 1}) equal ({b: 1, a: 1})
+    encoded = json.dumps(to_json_compatible(parts), separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()[:16]
+
+def operation_keys(operation):
+    """Return (exact_key, near_key) for an extracted operation."""
+    arguments = {field: _parse_argument(operation[field]) for field in ARGUMENT_FIELDS if operation.get(field)}
+    for field in UNORDERED_FIELDS:
+        if field in arguments:
+            arguments[field] = _sort_unordered(arguments[field])
+    exact = _digest([operation['type'], operation['collection'], arguments])
+
+    near_type = 'insert' if operation['type'] in INSERT_TYPES else operation['type']
+    near_arguments = _mask_volatile(arguments)
+    if near_type == 'insert' and 'documents' in near_arguments:
+        documents = near_arguments['documents']
+        documents = documents if isinstance(documents, list) else [documents]
+        near_arguments['documents'] = sorted(canonical_json(document) for document in documents)
+    near = _digest([near_type, operation['collection'], near_arguments])
+    return exact, near
+
+class DuplicateIndex:
+    """Content-addressed index of every operation in a set of query files."""
+
+    def __init__(self):
+        self.exact = {}
+        self.near = {}
+
+    def add(self, source, operations, context=None):
+        """Index the operations of one file."""
+        for number, operation in enumerate(operations, 1):
+            exact, near = operation_keys(operation)
+            entry = {
+                'file': source,
+                'operation': number,
+                'line': operation.get('line_number'),
+                'type': operation['type'],
+                'collection': operation['collection'],
+                'context': context,
+            }
+            self.exact.setdefault(exact, []).append(entry)
+            self.near.setdefault(near, []).append(entry)
+
+    def check(self, source, operations):
+        """Return warnings for operations that already exist in another indexed file."""
+        warnings = []
+        for number, operation in enumerate(operations, 1):
+            exact, near = operation_keys(operation)
+            for kind, matches in (('Exact duplicate', self.exact.get(exact, ())), ('Near-duplicate', self.near.get(near, ()))):
+                others = [entry for entry in matches if entry['file'] != source]
+                if others:
+                    where = ', '.join(f"{os.path.basename(e['file'])} (operation {e['operation']}, line {e['line']})" for e in others[:3])
+                    more = f" and {len(others) - 3} more" if len(others) > 3 else ""
+                    warnings.append(f"Operation {number} (line {operation.get('line_number')}): "
+                                    f"{kind} of {where}{more}; it would run again")
+                    break
+        return warnings
+
+    def clusters(self):
+        """Groups of operations found in more than one file; near clusters exclude exact ones."""
+        result = []
+        exact_groups = set()
+        for kind, index in (('exact', self.exact), ('near', self.near)):
+            for key, entries in index.items():
+                if len({entry['file'] for entry in entries}) < 2:
+                    continue
+                members = tuple(sorted((entry['file'], entry['operation']) for entry in entries))
+                if kind == 'near' and members in exact_groups:
+                    continue
+                exact_groups.add(members)
+                result.append({'kind': kind, 'key': key, 'operations': entries})
+        return result
+
+def build_index(paths, rule_config=None, exclude=None):
+    """Extract and index every file in paths, skipping exclude (the file being generated)."""
+    index = DuplicateIndex()
+    exclude = os.path.abspath(exclude) if exclude else None
+    # Extraction logs every operation at debug level; indexing a corpus should stay quiet
+    package_logger = logging.getLogger('liquibase_mongo')
+    previous_level = package_logger.level
+    package_logger.setLevel(logging.WARNING)
+    try:
+        for path in paths:
+            if exclude and os.path.abspath(path) == exclude:
+                continue
+            with open(path, 'r', encoding='utf-8') as file:
+                content = file.read()
+            operations, _, _ = extract_mongodb_operations_robust(content, rule_config)
+            index.add(path, operations, extract_context_from_content(content))
+    finally:
+        package_logger.setLevel(previous_level)
+    return index
+
+def format_clusters(clusters):
+    lines = []
+    for number, cluster in enumerate(clusters, 1):
+        first = cluster['operations'][0]
+        lines.append(f"{number}. {cluster['kind']} duplicate: {first['type']} on {first['collection']} "
+                     f"in {len({entry['file'] for entry in cluster['operations']})} files")
+        for entry in cluster['operations']:
+            lines.append(f"     {entry['file']}: operation {entry['operation']} (line {entry['line']}, context {entry['context']})")
+    exact = sum(1 for cluster in clusters if cluster['kind'] == 'exact')
+    lines.append(f"{exact} exact and {len(clusters) - exact} near-duplicate cluster(s)")
+    return "\n".join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="liquibase-mongo duplicates", description="List operations that appear in more than one query file.")
+    parser.add_argument("js_files", nargs="*", help="Files to index (default: db_queries/*.js).")
+    parser.add_argument("--format", choices=["json", "text"], default="text", help="Output format (default: text).")
+    parser.add_argument("--exact-only", action="store_true", help="Hide near-duplicate clusters.")
+    parser.add_argument("--fail-on-duplicates", action="store_true", help="Exit 1 when any cluster is found.")
+    args = parser.parse_args(argv)
+
+    paths = args.js_files or sorted(glob.glob(os.path.join("db_queries", "*.js")))
+    clusters = build_index(paths).clusters()
+    if args.exact_only:
+        clusters = [cluster for cluster in clusters if cluster['kind'] == 'exact']
+
+    if args.format == "json":
+        print(json.dumps({'files': len(paths), 'clusters': clusters}))
+    else:
+        print(format_clusters(clusters))
+    return 1 if args.fail_on_duplicates and clusters else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
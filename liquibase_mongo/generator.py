@@ -0,0 +1,371 @@
+"""Render extracted operations as Liquibase MongoDB changelog XML."""
+import os
+import re
+import logging
+
+from .bulkwrite import BULK_OPTIONS, bulk_requests, group_requests
+from .shell_literal import parse_shell_literal, split_literal
+
+logger = logging.getLogger(__name__)
+
+def clean_json_for_xml(json_str):
+    """Clean and format JSON for XML inclusion."""
+    if not json_str:
+        return "{}"
+    return json_str.strip()
+
+def comment_text(text):
+    """Make text safe inside an XML comment, which must not contain '--'."""
+    return re.sub(r'-(?=-)', '- ', str(text))
+
+def extract_version_number(version_string):
+    """Extract numeric part from version string."""
+    match = re.search(r'(\d+)', version_string)
+    if match:
+        return match.group(1)
+    return "1"
+
+def extract_index_name(options_str):
+    """Index name from the top-level name option (not one nested in e.g. partialFilterExpression)."""
+    for key, value in extract_options(options_str):
+        if key == 'name':
+            try:
+                name = parse_shell_literal(value)
+            except ValueError:
+                return None
+            return name if isinstance(name, str) and name else None
+    return None
+
+def extract_options(options_str, skip=()):
+    """(name, source text) of every option not in skip, in source order."""
+    if not options_str or not options_str.strip():
+        return []
+    try:
+        members = split_literal(options_str)
+    except ValueError:
+        return []
+    return [(key, value) for key, value in members if isinstance(members[0], tuple) and key not in skip]
+
+def extract_index_options(options_str):
+    """(name, source text) of every createIndex option other than name, in source order."""
+    return extract_options(options_str, skip=('name',))
+
+# Options that belong in each updates[]/deletes[] statement; the rest (writeConcern, ordered, ...) go on the command
+UPDATE_STATEMENT_OPTIONS = ('upsert', 'arrayFilters', 'hint', 'collation')
+DELETE_STATEMENT_OPTIONS = ('hint', 'collation')
+
+def split_write_options(options_str, statement_names):
+    """(statement options, command options) of an update/delete options object, each as (name, source text) pairs."""
+    options = extract_options(options_str)
+    return ([(key, value) for key, value in options if key in statement_names],
+            [(key, value) for key, value in options if key not in statement_names])
+
+def option_lines(options, indent, last=True):
+    """'"name": value' lines for (name, source text) pairs; last=False keeps a comma after the final one."""
+    for number, (option, value) in enumerate(options, 1):
+        separator = '' if last and number == len(options) else ','
+        yield f'{indent}"{option}": {clean_json_for_xml(value)}{separator}'
+
+def bulk_write_lines(operation):
+    """One runCommand per run of consecutive same-kind bulkWrite requests, in request order."""
+    bulk_options = extract_options(operation.get('options'))
+    for kind, requests in group_requests(bulk_requests(operation)):
+        command_options = [(key, value) for key, value in bulk_options if kind in BULK_OPTIONS.get(key, ())]
+        yield '        <mongodb:runCommand>'
+        yield '            <mongodb:command><![CDATA['
+        yield '            {'
+        yield f'                "{kind}": "{operation["collection"]}",'
+        if kind == 'insert':
+            yield '                "documents": ['
+            for number, request in enumerate(requests, 1):
+                yield f'                    {clean_json_for_xml(request["documents"])}' + (',' if number < len(requests) else '')
+        else:
+            yield f'                "{kind}s": ['
+            statement_names = UPDATE_STATEMENT_OPTIONS if kind == 'update' else DELETE_STATEMENT_OPTIONS
+            for number, request in enumerate(requests, 1):
+                statement_options, _ = split_write_options(request.get('options'), statement_names)
+                separator = ',' if statement_options else ''
+                yield '                    {'
+                yield f'                        "q": {clean_json_for_xml(request["filter"])},'
+                if kind == 'update':
+                    yield f'                        "u": {clean_json_for_xml(request["update"])},'
+                    yield f'                        "multi": {"true" if request["type"] == "updateMany" else "false"}{separator}'
+                else:
+                    yield f'                        "limit": {1 if request["type"] == "deleteOne" else 0}{separator}'
+                yield from option_lines(statement_options, ' ' * 24)
+                yield '                    }' + (',' if number < len(requests) else '')
+        yield '                ]' + (',' if command_options else '')
+        yield from option_lines(command_options, ' ' * 16)
+        yield '            }'
+        yield '            ]]></mongodb:command>'
+        yield '        </mongodb:runCommand>'
+
+def generate_validation_report(errors, warnings, notes=None):
+    """Generate a human-readable validation report; notes are informational lines (estimates, savings)."""
+    report = []
+    
+    if errors:
+        report.append("🚨 CRITICAL ERRORS FOUND:")
+        report.append("=" * 50)
+        for i, error in enumerate(errors, 1):
+            report.append(f"{i}. {error}")
+        report.append("")
+        report.append("❌ Liquibase XML generation FAILED due to above errors.")
+        report.append("Please fix these issues and try again.")
+        report.append("")
+    
+    if warnings:
+        report.append("⚠️ WARNINGS:")
+        report.append("=" * 50)
+        for i, warning in enumerate(warnings, 1):
+            report.append(f"{i}. {warning}")
+        report.append("")
+        report.append("✅ Liquibase XML generated successfully, but please review warnings above.")
+        report.append("")
+    
+    if not errors and not warnings:
+        report.append("✅ ALL VALIDATIONS PASSED!")
+        report.append("Your MongoDB queries follow best practices.")
+        report.append("")
+    
+    if notes:
+        report.append("📝 NOTES:")
+        report.append("=" * 50)
+        for note in notes:
+            report.append(f"- {note}")
+        report.append("")
+    
+    return "\n".join(report)
+
+def iter_liquibase_xml_robust(version, operations, author_name, context, errors, warnings, changeset_ids=None, notes=None):
+    """Yield Liquibase XML lines one at a time so large changelogs can be streamed to disk."""
+    
+    base_version_num = extract_version_number(version)
+    
+    yield '<?xml version="1.0" encoding="UTF-8"?>'
+    yield '<databaseChangeLog'
+    yield '    xmlns="http://www.liquibase.org/xml/ns/dbchangelog"'
+    yield '    xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"'
+    yield '    xmlns:mongodb="http://www.liquibase.org/xml/ns/dbchangelog-ext"'
+    yield '    xsi:schemaLocation="'
+    yield '        http://www.liquibase.org/xml/ns/dbchangelog'
+    yield '        http://www.liquibase.org/xml/ns/dbchangelog/dbchangelog-4.5.xsd'
+    yield '        http://www.liquibase.org/xml/ns/dbchangelog-ext'
+    yield '        http://www.liquibase.org/xml/ns/dbchangelog/dbchangelog-ext.xsd">'
+    
+    # Add validation report as comments
+    if errors or warnings or notes:
+        yield '    <!-- VALIDATION REPORT -->'
+        validation_report = generate_validation_report(errors, warnings, notes)
+        for line in validation_report.split('\n'):
+            if line.strip():
+                yield f'    <!-- {comment_text(line)} -->'
+        yield '    <!-- END VALIDATION REPORT -->'
+        yield ''
+
+    if not operations:
+        yield f'    <changeSet id="{base_version_num}" author="{author_name}" context="{context}">'
+        yield '        <!-- No valid MongoDB operations found in the JS file -->'
+        yield '    </changeSet>'
+    else:
+        # Create separate changeSet for each operation
+        for i, operation in enumerate(operations):
+            op_type = operation['type']
+            collection = operation['collection']
+            # Operations read back from a changelog keep the context of their original changeSet
+            op_context = operation.get('context') or context
+            
+            if changeset_ids is None:
+                changeset_id = base_version_num if len(operations) == 1 else f"{base_version_num}.{i+1}"
+                index_suffix = i + 1
+                yield f'    <changeSet id="{changeset_id}" author="{author_name}" context="{op_context}">'
+                yield f'        <!-- {comment_text(op_type.upper())} operation on {comment_text(collection)} (from line {operation.get("line_number", "unknown")}) -->'
+            else:
+                # Stable IDs: nothing positional goes inside the changeSet, so its bytes only change with the operation
+                changeset_id = changeset_ids[i]
+                index_suffix = changeset_id[len(base_version_num) + 1:] or 1
+                yield f'    <changeSet id="{changeset_id}" author="{author_name}" context="{op_context}">'
+                yield f'        <!-- {comment_text(op_type.upper())} operation on {comment_text(collection)} -->'
+            
+            try:
+                if op_type == 'createCollection':
+                    collection_options = extract_options(operation.get('options'))
+                    if not collection_options:
+                        yield f'        <mongodb:createCollection collectionName="{collection}" />'
+                    else:
+                        # Capped, clustered and time-series layouts are set through the create command
+                        yield '        <mongodb:runCommand>'
+                        yield '            <mongodb:command><![CDATA['
+                        yield '            {'
+                        yield f'                "create": "{collection}",'
+                        yield from option_lines(collection_options, ' ' * 16)
+                        yield '            }'
+                        yield '            ]]></mongodb:command>'
+                        yield '        </mongodb:runCommand>'
+                    
+                elif op_type == 'createIndex':
+                    index_key = clean_json_for_xml(operation['index_key'])
+                    index_name = extract_index_name(operation.get('options', '')) or f"{collection}_index_{index_suffix}"
+                    
+                    yield '        <mongodb:runCommand>'
+                    yield '            <mongodb:command><![CDATA['
+                    yield '            {'
+                    yield f'                "createIndexes": "{collection}",'
+                    yield '                "indexes": ['
+                    yield '                    {'
+                    index_options = extract_index_options(operation.get('options'))
+                    yield f'                        "key": {index_key},'
+                    yield f'                        "name": "{index_name}"' + (',' if index_options else '')
+                    yield from option_lines(index_options, ' ' * 24)
+                    yield '                    }'
+                    yield '                ]'
+                    yield '            }'
+                    yield '            ]]></mongodb:command>'
+                    yield '        </mongodb:runCommand>'
+                    
+                elif op_type == 'insertOne':
+                    doc_content = clean_json_for_xml(operation['documents'])
+                    yield f'        <mongodb:insertOne collectionName="{collection}">'
+                    yield '            <mongodb:document><![CDATA['
+                    yield f'            {doc_content}'
+                    yield '            ]]></mongodb:document>'
+                    yield '        </mongodb:insertOne>'
+                    
+                elif op_type in ['insertMany', 'insert']:
+                    docs_content = clean_json_for_xml(operation['documents'])
+                    if not docs_content.strip().startswith('['):
+                        docs_content = f"[{docs_content}]"
+                    
+                    yield f'        <mongodb:insertMany collectionName="{collection}">'
+                    yield '            <mongodb:documents><![CDATA['
+                    yield f'            {docs_content}'
+                    yield '            ]]></mongodb:documents>'
+                    yield '        </mongodb:insertMany>'
+                    
+                elif op_type in ['updateOne', 'updateMany']:
+                    filter_json = clean_json_for_xml(operation['filter'])
+                    update_json = clean_json_for_xml(operation['update'])
+                    multi = "true" if op_type == "updateMany" else "false"
+                    statement_options, command_options = split_write_options(operation.get('options'), UPDATE_STATEMENT_OPTIONS)
+                    
+                    yield '        <mongodb:runCommand>'
+                    yield '            <mongodb:command><![CDATA['
+                    yield '            {'
+                    yield f'                "update": "{collection}",'
+                    yield '                "updates": ['
+                    yield '                    {'
+                    yield f'                        "q": {filter_json},'
+                    yield f'                        "u": {update_json},'
+                    yield f'                        "multi": {multi}' + (',' if statement_options else '')
+                    yield from option_lines(statement_options, ' ' * 24)
+                    yield '                    }'
+                    yield '                ]' + (',' if command_options else '')
+                    yield from option_lines(command_options, ' ' * 16)
+                    yield '            }'
+                    yield '            ]]></mongodb:command>'
+                    yield '        </mongodb:runCommand>'
+                    
+                elif op_type == 'replaceOne':
+                    filter_json = clean_json_for_xml(operation['filter'])
+                    replacement_json = clean_json_for_xml(operation['update'])
+                    
+                    yield '        <mongodb:runCommand>'
+                    yield '            <mongodb:command><![CDATA['
+                    yield '            {'
+                    yield f'                "findAndModify": "{collection}",'
+                    yield f'                "query": {filter_json},'
+                    replace_options = extract_options(operation.get('options'))
+                    yield f'                "update": {replacement_json},'
+                    yield '                "new": true' + (',' if replace_options else '')
+                    yield from option_lines(replace_options, ' ' * 16)
+                    yield '            }'
+                    yield '            ]]></mongodb:command>'
+                    yield '        </mongodb:runCommand>'
+                    
+                elif op_type in ['deleteOne', 'deleteMany', 'remove']:
+                    filter_json = clean_json_for_xml(operation['filter'])
+                    limit = 1 if op_type == "deleteOne" else 0
+                    statement_options, command_options = split_write_options(operation.get('options'), DELETE_STATEMENT_OPTIONS)
+                    
+                    yield '        <mongodb:runCommand>'
+                    yield '            <mongodb:command><![CDATA['
+                    yield '            {'
+                    yield f'                "delete": "{collection}",'
+                    yield '                "deletes": ['
+                    yield '                    {'
+                    yield f'                        "q": {filter_json},'
+                    yield f'                        "limit": {limit}' + (',' if statement_options else '')
+                    yield from option_lines(statement_options, ' ' * 24)
+                    yield '                    }'
+                    yield '                ]' + (',' if command_options else '')
+                    yield from option_lines(command_options, ' ' * 16)
+                    yield '            }'
+                    yield '            ]]></mongodb:command>'
+                    yield '        </mongodb:runCommand>'
+                    
+                elif op_type == 'bulkWrite':
+                    yield from bulk_write_lines(operation)
+                    
+                elif op_type == 'aggregate':
+                    # $merge/$out pipelines run entirely on the server; the cursor is required by the command
+                    aggregate_options = extract_options(operation.get('options'))
+                    batch_size = dict(aggregate_options).pop('batchSize', None)
+                    aggregate_options = [(key, value) for key, value in aggregate_options if key != 'batchSize']
+                    if 'allowDiskUse' not in dict(aggregate_options):
+                        aggregate_options.insert(0, ('allowDiskUse', 'true'))
+                    
+                    yield '        <mongodb:runCommand>'
+                    yield '            <mongodb:command><![CDATA['
+                    yield '            {'
+                    yield f'                "aggregate": "{collection}",'
+                    yield f'                "pipeline": {clean_json_for_xml(operation["pipeline"])},'
+                    yield from option_lines(aggregate_options, ' ' * 16, last=False)
+                    yield '                "cursor": {' + (f' "batchSize": {batch_size.strip()} ' if batch_size else '') + '}'
+                    yield '            }'
+                    yield '            ]]></mongodb:command>'
+                    yield '        </mongodb:runCommand>'
+                    
+                elif op_type == 'dropIndex':
+                    index_spec = operation['index_spec']
+                    if index_spec.startswith('"') or index_spec.startswith("'"):
+                        index_name = index_spec.strip('"\'')
+                        yield f'        <mongodb:dropIndex collectionName="{collection}" indexName="{index_name}" />'
+                    else:
+                        yield f'        <mongodb:dropIndex collectionName="{collection}">'
+                        yield '            <mongodb:keys><![CDATA['
+                        yield f'            {clean_json_for_xml(index_spec)}'
+                        yield '            ]]></mongodb:keys>'
+                        yield '        </mongodb:dropIndex>'
+                    
+                elif op_type == 'dropCollection':
+                    yield f'        <mongodb:dropCollection collectionName="{collection}" />'
+                    
+            except Exception as e:
+                logger.debug(f"Error processing operation {i+1}: {str(e)}")
+                yield f'        <!-- Failed to process {op_type} operation: {comment_text(e)} -->'
+                yield f'        <!-- Raw operation: {comment_text(operation.get("raw_match", "")[:100])}... -->'
+            
+            yield '    </changeSet>'
+
+    yield '</databaseChangeLog>'
+
+def generate_liquibase_xml_robust(version, operations, author_name, context, errors, warnings, changeset_ids=None, notes=None):
+    """Generate Liquibase XML with enhanced error handling and validation report."""
+    return '\n'.join(iter_liquibase_xml_robust(version, operations, author_name, context, errors, warnings, changeset_ids, notes))
+
+def write_to_file(xml_content, output_file_path):
+    """Write XML content to a file."""
+    os.makedirs(os.path.dirname(output_file_path), exist_ok=True)
+    
+    with open(output_file_path, "w", encoding="utf-8") as file:
+        file.write(xml_content)
+
+def write_lines_to_file(lines, output_file_path):
+    """Write XML lines to a file without joining them in memory first."""
+    os.makedirs(os.path.dirname(output_file_path), exist_ok=True)
+    
+    with open(output_file_path, "w", encoding="utf-8") as file:
+        for i, line in enumerate(lines):
+            if i:
+                file.write('\n')
+            file.write(line)
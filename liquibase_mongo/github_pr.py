@@ -0,0 +1,78 @@
+"""Open a pull request with a generated changeset (requires PyGithub)."""
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+def commit_file(repo, branch_name, local_path, file_path_in_repo, js_file_path):
+    """Create or update one file on the PR branch."""
+    with open(local_path, "r", encoding="utf-8") as file:
+        content = file.read()
+
+    try:
+        existing_file = repo.get_contents(file_path_in_repo, ref=branch_name)
+        repo.update_file(
+            path=file_path_in_repo,
+            message=f"Updated {os.path.basename(local_path)} for {os.path.basename(js_file_path)}",
+            content=content,
+            sha=existing_file.sha,
+            branch=branch_name
+        )
+    except:
+        repo.create_file(
+            path=file_path_in_repo,
+            message=f"Generated {os.path.basename(local_path)} for {os.path.basename(js_file_path)}",
+            content=content,
+            branch=branch_name
+        )
+
+def create_pull_request(repo_name, branch_name, changeset_file_path, js_file_path, github_token, extra_file_paths=()):
+    """Create a GitHub Pull Request with the newly generated XML file (and any extra json_changesets/ files)."""
+    from github import Github
+
+    try:
+        g = Github(github_token)
+        repo = g.get_repo(repo_name)
+
+        with open(changeset_file_path, "r", encoding="utf-8") as file:
+            changeset_content = file.read()
+
+        # Check if branch already exists
+        try:
+            existing_branch = repo.get_branch(branch_name)
+            logger.info(f"Branch {branch_name} already exists, deleting it first...")
+            ref = repo.get_git_ref(f"heads/{branch_name}")
+            ref.delete()
+        except:
+            pass
+
+        # Create a new branch
+        main_branch = repo.get_branch("main")
+        ref = repo.create_git_ref(ref=f"refs/heads/{branch_name}", sha=main_branch.commit.sha)
+
+        # Add / commit the files to the branch
+        file_path_in_repo = f"json_changesets/{os.path.basename(changeset_file_path)}"
+        commit_file(repo, branch_name, changeset_file_path, file_path_in_repo, js_file_path)
+        for extra_file_path in extra_file_paths:
+            commit_file(repo, branch_name, extra_file_path, f"json_changesets/{os.path.basename(extra_file_path)}", js_file_path)
+
+        # Create PR
+        pr = repo.create_pull(
+            title=f"[Auto-Generated] XML Changeset for {os.path.basename(js_file_path)}",
+            body=(
+                f"This PR was auto-generated from `{os.path.basename(js_file_path)}`.\n\n"
+                f"- Generated XML: `{file_path_in_repo}`\n"
+                f"- Source JS: `{js_file_path}`\n\n"
+                f"Please review the generated changeset and merge if correct.\n\n"
+                f"### Generated XML Preview:\n"
+                f"```xml\n{changeset_content}\n```"
+            ),
+            head=branch_name,
+            base="main"
+        )
+
+        return pr
+    
+    except Exception as e:
+        logger.error(f"Error creating pull request: {str(e)}")
+        raise
@@ -0,0 +1,298 @@
+"""Read Liquibase MongoDB changelogs back into operations.
+
+Each change element (``insertMany``, ``createCollection``, the ``runCommand``
+forms written by the generator, ...) becomes an operation dict with the same
+fields the parser extracts from query files, plus where it came from:
+``changeset_id``, ``author``, ``context`` and ``source``. Arguments keep their
+original text, so a changelog rendered from these operations runs the same
+documents and filters as the history it was read from.
+
+``load_history`` reads many changelogs at once: files are parsed with
+``iterparse``, cached by mtime and content hash, and spread over worker
+processes when enough of them need parsing.
+"""
+import io
+import os
+import glob
+import json
+import hashlib
+import xml.etree.ElementTree as ET
+
+from .shell_literal import split_literal, parse_shell_literal
+
+# changeSet children that describe the changeSet rather than change the database
+IGNORED_ELEMENTS = {'comment', 'rollback', 'preConditions', 'validCheckSum'}
+
+# Below this many files to parse, starting worker processes costs more than it saves
+PARALLEL_MIN_FILES = 64
+
+def default_history_paths(changelog='changeset/changelog.xml', changesets_dir='json_changesets'):
+    """The hand-written changelog first, then generated changesets in version order."""
+    from .parser import version_sort_key
+    paths = [changelog] if os.path.exists(changelog) else []
+    return paths + sorted(glob.glob(os.path.join(changesets_dir, '*.xml')), key=version_sort_key)
+
+def _string(text):
+    value = parse_shell_literal(text)
+    if not isinstance(value, str):
+        raise ValueError(f"Expected a string, found {text}")
+    return value
+
+def _operation(op_type, collection, **fields):
+    operation = {'type': op_type, 'collection': collection}
+    operation.update(fields)
+    return operation
+
+def _options_text(options):
+    """Shell options object for (name, source text) pairs, or None when there are none (as the parser stores it)."""
+    return '{ ' + ', '.join(f"{key}: {value}" for key, value in options) + ' }' if options else None
+
+def _collection_operation(collection, options):
+    # Plain createCollection keeps no options field, as before options were read back
+    return _operation('createCollection', collection, **({'options': options} if options else {}))
+
+def command_operations(command_text):
+    """Turn the text of a runCommand into operations; raises ValueError for commands it cannot represent."""
+    members = split_literal(command_text)
+    if not members or not isinstance(members[0], tuple):
+        raise ValueError("Command is not an object")
+    fields = dict(members)
+    name, collection_text = members[0]
+    collection = _string(collection_text)
+    operations = []
+    unused = []
+
+    if name == 'createIndexes':
+        for index_text in split_literal(fields.get('indexes', '[]')):
+            index = dict(split_literal(index_text))
+            options = [f"{key}: {value}" for key, value in split_literal(index_text) if key != 'key']
+            operations.append(_operation('createIndex', collection, index_key=index['key'],
+                                         options='{ ' + ', '.join(options) + ' }' if options else ''))
+    elif name == 'insert':
+        # Written for bulkWrite runs of insertOne requests
+        operations.append(_operation('insertMany', collection, documents=fields['documents']))
+        unused += [key for key in fields if key not in ('insert', 'documents', 'ordered')]
+        return operations, sorted(set(unused))
+    elif name == 'update':
+        command_options = [(key, value) for key, value in members[1:] if key != 'updates']
+        for statement_text in split_literal(fields.get('updates', '[]')):
+            statement_members = split_literal(statement_text)
+            statement = dict(statement_members)
+            multi = parse_shell_literal(statement.get('multi', 'false'))
+            options = [(key, value) for key, value in statement_members if key not in ('q', 'u', 'multi')]
+            op_type = 'updateMany' if multi else 'updateOne'
+            # bulkWrite replaceOne requests are written as update statements with a plain document
+            if statement['u'].strip().startswith('{') and not any(key.startswith('$') for key, _ in split_literal(statement['u'])):
+                op_type = 'replaceOne'
+                # replaceOne is rendered as findAndModify, which has no ordered field
+                options += [(key, value) for key, value in command_options if key != 'ordered']
+            else:
+                options += command_options
+            operations.append(_operation(op_type, collection, filter=statement['q'],
+                                         update=statement['u'], options=_options_text(options)))
+        return operations, []
+    elif name == 'delete':
+        command_options = [(key, value) for key, value in members[1:] if key != 'deletes']
+        for statement_text in split_literal(fields.get('deletes', '[]')):
+            statement_members = split_literal(statement_text)
+            statement = dict(statement_members)
+            limit = parse_shell_literal(statement.get('limit', '0'))
+            options = [(key, value) for key, value in statement_members if key not in ('q', 'limit')]
+            operations.append(_operation('deleteOne' if limit == 1 else 'deleteMany', collection,
+                                         filter=statement['q'], options=_options_text(options + command_options)))
+        return operations, []
+    elif name == 'findAndModify':
+        options = [(key, value) for key, value in members[1:] if key not in ('query', 'update', 'new')]
+        operations.append(_operation('replaceOne', collection, filter=fields.get('query', '{}'), update=fields['update'],
+                                     options=_options_text(options)))
+        return operations, []
+    elif name == 'aggregate':
+        options = [(key, value) for key, value in members[1:] if key not in ('pipeline', 'cursor')]
+        options += [(key, value) for key, value in split_literal(fields.get('cursor', '{}')) if key == 'batchSize']
+        operations.append(_operation('aggregate', collection, pipeline=fields['pipeline'], options=_options_text(options)))
+        return operations, []
+    elif name == 'dropIndexes':
+        operations.append(_operation('dropIndex', collection, index_spec=fields['index']))
+    elif name == 'drop':
+        operations.append(_operation('dropCollection', collection))
+    elif name == 'create':
+        # Every other field of create is a collection option (capped, timeseries, clusteredIndex, ...)
+        options = [f"{key}: {value}" for key, value in members[1:]]
+        return [_collection_operation(collection, '{ ' + ', '.join(options) + ' }' if options else '')], []
+    else:
+        raise ValueError(f"Unsupported command '{name}'")
+
+    unused += [key for key in fields if key not in ('createIndexes', 'indexes', 'dropIndexes', 'index', 'drop')]
+    return operations, sorted(set(unused))
+
+def _local_name(tag):
+    return tag.split('}')[-1] if isinstance(tag, str) else None
+
+def _child_text(element, tag):
+    # Older changelogs used other extension namespaces; match on the local name only
+    for child in element:
+        if _local_name(child.tag) == tag:
+            return (child.text or '').strip()
+    return ''
+
+def change_operations(element):
+    """Operations and ignored option names for one change element of a changeSet."""
+    tag = _local_name(element.tag)
+    collection = element.get('collectionName')
+    if tag == 'createCollection':
+        return [_collection_operation(collection, _child_text(element, 'options'))], []
+    if tag == 'dropCollection':
+        return [_operation('dropCollection', collection)], []
+    if tag == 'insertOne':
+        return [_operation('insertOne', collection, documents=_child_text(element, 'document'))], []
+    if tag == 'insertMany':
+        return [_operation('insertMany', collection, documents=_child_text(element, 'documents'))], []
+    if tag == 'createIndex':
+        return [_operation('createIndex', collection, index_key=_child_text(element, 'keys'),
+                           options=_child_text(element, 'options'))], []
+    if tag == 'dropIndex':
+        spec = f'"{element.get("indexName")}"' if element.get('indexName') else _child_text(element, 'keys')
+        return [_operation('dropIndex', collection, index_spec=spec)], []
+    if tag == 'runCommand':
+        return command_operations(_child_text(element, 'command'))
+    raise ValueError(f"Unsupported change '{tag}'")
+
+def _preview(change, tag):
+    text = ' '.join(''.join(change.itertext()).split())
+    return f"<{tag} {change.get('collectionName') or ''}> {text}"[:200]
+
+def _changeset_operations(changeset, name, operations, problems):
+    changeset_id = changeset.get('id')
+    for change in changeset:
+        change_tag = _local_name(change.tag)
+        if change_tag in IGNORED_ELEMENTS:
+            continue
+        try:
+            change_ops, unused = change_operations(change)
+        except (ValueError, KeyError) as e:
+            problems.append(f"{name}: changeSet {changeset_id}: cannot read <{change_tag}>: {e}")
+            continue
+        if unused:
+            problems.append(f"{name}: changeSet {changeset_id}: options not carried over: {', '.join(unused)}")
+        for operation in change_ops:
+            operation.update({
+                'changeset_id': changeset_id,
+                'author': changeset.get('author'),
+                'context': changeset.get('context'),
+                'source': name,
+                'raw_match': _preview(change, change_tag),
+            })
+            operations.append(operation)
+
+def read_changelog(source, name=None):
+    """Return (operations, problems) for one changelog file (a path or binary file object).
+
+    problems lists changes that could not be turned into operations and
+    options the operations do not carry, as readable messages. The file is
+    parsed incrementally and each top-level element is discarded once read,
+    so memory does not grow with the size of the changelog.
+    """
+    name = name or source
+    operations = []
+    problems = []
+    root = None
+    depth = 0
+    for event, element in ET.iterparse(source, events=('start', 'end')):
+        if event == 'start':
+            root = element if root is None else root
+            depth += 1
+            continue
+        depth -= 1
+        if depth != 1:
+            continue
+        tag = _local_name(element.tag)
+        if tag in ('include', 'includeAll'):
+            problems.append(f"{name}: <{tag}> is not followed; list the included files explicitly")
+        elif tag == 'changeSet':
+            _changeset_operations(element, name, operations, problems)
+        root.clear()
+    return operations, problems
+
+def _load_file(path, known_sha256=None):
+    """Worker: (sha256, operations, problems) for one file; operations is None when the hash is known_sha256."""
+    with open(path, 'rb') as file:
+        data = file.read()
+    sha256 = hashlib.sha256(data).hexdigest()
+    if sha256 == known_sha256:
+        return sha256, None, None
+    try:
+        operations, problems = read_changelog(io.BytesIO(data), path)
+    except ET.ParseError as e:
+        operations, problems = [], [f"{path}: not valid XML: {e}"]
+    return sha256, operations, problems
+
+class HistoryCache:
+    """Operations read from each changelog, reused while the file is unchanged.
+
+    A file whose mtime and size match its entry is not opened at all; one
+    whose mtime moved (a checkout, a touch) is hashed and only reparsed if
+    its content changed. With a path the cache persists between runs as JSON.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.entries = {}
+        self.stats = {'hits': 0, 'rehashed': 0, 'parsed': 0}
+        if path and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as file:
+                self.entries = json.load(file)
+
+    def save(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with open(self.path, 'w', encoding='utf-8') as file:
+            json.dump(self.entries, file, separators=(',', ':'))
+
+def load_history(paths, cache=None, workers=None):
+    """Read changelogs in order; returns (operations, problems).
+
+    Files missing from the cache (or changed since) are parsed, in worker
+    processes when there are enough of them to pay for the pool.
+    """
+    cache = cache if cache is not None else HistoryCache()
+    workers = workers or os.cpu_count() or 1
+    stale = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError as e:
+            cache.entries[path] = {'mtime_ns': None, 'size': None, 'sha256': None,
+                                   'operations': [], 'problems': [f"{path}: cannot read: {e.strerror}"]}
+            continue
+        entry = cache.entries.get(path)
+        if entry and entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+            cache.stats['hits'] += 1
+        else:
+            stale.append((path, entry['sha256'] if entry else None, stat))
+
+    stale_paths = [path for path, _, _ in stale]
+    known = [sha256 for _, sha256, _ in stale]
+    if workers > 1 and len(stale) >= PARALLEL_MIN_FILES:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_load_file, stale_paths, known, chunksize=max(1, len(stale) // (workers * 4))))
+    else:
+        results = [_load_file(path, sha256) for path, sha256 in zip(stale_paths, known)]
+
+    for (path, _, stat), (sha256, operations, problems) in zip(stale, results):
+        entry = cache.entries.get(path)
+        if operations is None:
+            cache.stats['rehashed'] += 1
+            entry.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+        else:
+            cache.stats['parsed'] += 1
+            cache.entries[path] = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'sha256': sha256,
+                                   'operations': operations, 'problems': problems}
+
+    operations = []
+    problems = []
+    for path in paths:
+        operations.extend(cache.entries[path]['operations'])
+        problems.extend(cache.entries[path]['problems'])
+    return operations, problems
@@ -0,0 +1,250 @@
+"""Incremental reparse of query files for editor integration.
+
+The source is split into statements at top-level ``;`` and at newlines that
+start a new ``db.`` statement, skipping comments, strings and brackets. Each
+statement keeps its own regex matches, validation results and cleaned
+operations. An edit retokenizes only the statements around the edited range,
+reusing any whose text did not change, so the parsing and validation work
+depends on the size of the edit rather than the size of the file.
+
+``result()`` returns the same ``(operations, errors, warnings)`` as
+``extract_mongodb_operations_robust`` on the full text, including its
+operation numbering and line numbers, for every file whose operations each
+sit inside one statement (true for any well-formed file).
+"""
+import re
+import logging
+from bisect import bisect_right
+from itertools import accumulate
+
+from .parser import COMMENT_RE, OPERATION_PATTERNS, populate_operation, clean_operation
+from .rules import DEFAULT_RULE_CONFIG, HEADER_LINES, validate_query_syntax, validate_file_header, file_header
+
+logger = logging.getLogger(__name__)
+
+STATEMENT_TOKEN_RE = re.compile(
+    # Comment starters end a string and start a comment, as they do for COMMENT_RE. Unterminated
+    # comments and template strings run to the end of the text and unterminated quotes to the end
+    # of the line, so a later edit never re-pairs them with text before the edited statement.
+    r'//[^\n]*|/\*.*?(?:\*/|\Z)'
+    r'|"(?:[^"\\\n/]|/(?![/*])|\\(?!/[/*]).)*(?:"|$|(?=\\?/[/*])|(?=\\\Z))'
+    r"|'(?:[^'\\\n/]|/(?![/*])|\\(?!/[/*]).)*(?:'|$|(?=\\?/[/*])|(?=\\\Z))"
+    r'|`(?:[^`\\/]|/(?![/*])|\\(?!/[/*]).)*(?:`|\Z|(?=\\?/[/*])|(?=\\\Z))'
+    r'|[;{}\[\]()]'
+    r'|\n[ \t\r]*(?=db\.)',
+    re.DOTALL | re.MULTILINE,
+)
+
+def statement_boundaries(text):
+    """Yield the end offset of every complete statement in text."""
+    depth = 0
+    last = 0
+    for match in STATEMENT_TOKEN_RE.finditer(text):
+        token = match.group()
+        first = token[0]
+        if first in '{[(':
+            depth += 1
+        elif first in '}])':
+            depth = max(0, depth - 1)
+        elif depth == 0 and (first == ';' or (first == '\n' and text[last:match.start()].strip())):
+            last = match.end()
+            yield last
+
+def split_statements(text):
+    """Split text into statements; the last one may be unterminated."""
+    pieces = []
+    start = 0
+    for end in statement_boundaries(text):
+        pieces.append(text[start:end])
+        start = end
+    if start < len(text) or not pieces:
+        pieces.append(text[start:])
+    return pieces
+
+def parse_statement(text, rule_config):
+    """Match, validate and clean the operations of one statement."""
+    stripped = COMMENT_RE.sub('', text)
+    candidates = []
+    for operation_type, pattern in OPERATION_PATTERNS.items():
+        for match in pattern.finditer(stripped):
+            groups = match.groups()
+            operation = {
+                'type': operation_type,
+                'collection': groups[0],
+                'raw_match': stripped[match.start():min(match.end(), match.start() + 200)],
+                'line_number': None,
+            }
+            populate_operation(operation, operation_type, groups)
+            op_errors, op_warnings = validate_query_syntax(operation, rule_config)
+            if not op_errors:
+                clean_operation(operation)
+            candidates.append((operation_type, match.start(), operation, op_errors, op_warnings))
+
+    source_hits = []
+    for index, (rule, _) in enumerate(rule_config['scopes']['source']):
+        message = rule['check'](stripped)
+        if message:
+            source_hits.append((index, message))
+    return {
+        'text': text,
+        'length': len(text),
+        'stripped_length': len(stripped),
+        'newlines': text.count('\n'),
+        'candidates': candidates,
+        'source_hits': source_hits,
+    }
+
+class IncrementalParser:
+    """Keep per-statement parse results and reparse only what an edit touches."""
+
+    # Statement lengths are summed per block so locating an offset costs O(statements / BLOCK)
+    # list work in C instead of rebuilding every statement's start offset after each edit
+    BLOCK = 256
+
+    def __init__(self, content, rule_config=None):
+        self.rule_config = rule_config or DEFAULT_RULE_CONFIG
+        self.source_counts = [0] * len(self.rule_config['scopes']['source'])
+        self.source_messages = [None] * len(self.source_counts)
+        self.statements = []
+        self.lengths = []
+        self.block_lengths = []
+        self.length = 0
+        # Statements dropped by the previous edit, so undoing it (or closing a comment) reuses them
+        self.recent = {}
+        self._replace(0, 0, [self._parse(piece) for piece in split_statements(content)])
+
+    @property
+    def text(self):
+        return ''.join(statement['text'] for statement in self.statements)
+
+    def _parse(self, text, reusable=None):
+        if reusable and text in reusable:
+            return reusable[text]
+        return parse_statement(text, self.rule_config)
+
+    def _replace(self, first, last, statements):
+        for statement in self.statements[first:last]:
+            for index, _ in statement['source_hits']:
+                self.source_counts[index] -= 1
+        for statement in statements:
+            for index, message in statement['source_hits']:
+                self.source_counts[index] += 1
+                self.source_messages[index] = message
+
+        lengths = [statement['length'] for statement in statements]
+        self.length += sum(lengths) - sum(self.lengths[first:last])
+        resized = len(statements) != last - first
+        self.statements[first:last] = statements
+        self.lengths[first:last] = lengths
+
+        # Same statement count: only the touched blocks change; otherwise every later block shifts
+        block = self.BLOCK
+        if resized:
+            self.block_lengths[first // block:] = [
+                sum(self.lengths[i:i + block]) for i in range(first // block * block, len(self.lengths), block)]
+        else:
+            for index in range(first // block, (last - 1) // block + 1):
+                self.block_lengths[index] = sum(self.lengths[index * block:(index + 1) * block])
+
+    def _locate(self, offset):
+        """Return (index, start) of the statement containing offset; the end of text maps past the last one."""
+        if offset >= self.length:
+            return len(self.statements), self.length
+        block_starts = list(accumulate(self.block_lengths, initial=0))
+        block = bisect_right(block_starts, offset) - 1
+        first = block * self.BLOCK
+        starts = list(accumulate(self.lengths[first:first + self.BLOCK], initial=block_starts[block]))
+        position = bisect_right(starts, offset) - 1
+        return first + position, starts[position]
+
+    def apply_edit(self, start, end, new_text):
+        """Replace text[start:end] with new_text; return how many statements were reparsed."""
+        if not 0 <= start <= end <= self.length:
+            raise ValueError(f"Edit range {start}-{end} is outside the text (length {self.length})")
+
+        # Start one statement early: the edit may remove the boundary in front of the statement it touches
+        count = len(self.statements)
+        first, region_start = self._locate(start)
+        if first > 0:
+            first -= 1
+            region_start -= self.lengths[first]
+        last = min(count, self._locate(end)[0] + 1)
+
+        old_region = ''.join(statement['text'] for statement in self.statements[first:last])
+        edited = old_region[:start - region_start] + new_text + old_region[end - region_start:]
+        edit_end = start - region_start + len(new_text)
+
+        # Retokenizing must end on an old boundary after the edit. An unclosed comment or bracket
+        # can swallow the statements after it, so grow the region, doubling to keep the cost linear.
+        cuts = {len(edited): last}
+        grow = 1
+        while last < count:
+            boundaries = set(statement_boundaries(edited + self.statements[last]['text']))
+            cut = min((offset for offset in cuts if offset >= edit_end and offset in boundaries), default=None)
+            if cut is not None:
+                edited, last = edited[:cut], cuts[cut]
+                break
+            for statement in self.statements[last:last + grow]:
+                edited += statement['text']
+                last += 1
+                cuts[len(edited)] = last
+            grow *= 2
+
+        replaced = {statement['text']: statement for statement in self.statements[first:last]}
+        reusable = {**self.recent, **replaced}
+        statements = [self._parse(piece, reusable) for piece in split_statements(edited)] if edited else []
+        reparsed = sum(1 for statement in statements if statement['text'] not in reusable)
+        self.recent = replaced
+        self._replace(first, last, statements)
+        logger.debug("Edit %d-%d reparsed %d statement(s) of %d", start, end, reparsed, len(self.statements))
+        return reparsed
+
+    def _header(self):
+        pieces = []
+        newlines = 0
+        for statement in self.statements:
+            pieces.append(statement['text'])
+            newlines += statement['newlines']
+            if newlines >= HEADER_LINES:
+                break
+        return file_header(''.join(pieces))
+
+    def result(self):
+        """Return (operations, errors, warnings) exactly as a full extraction would."""
+        operations = []
+        all_errors = []
+        all_warnings = []
+
+        header_errors, header_warnings = validate_file_header(self._header(), self.rule_config)
+        all_errors.extend([f"Header: {e}" for e in header_errors])
+        all_warnings.extend([f"Header: {w}" for w in header_warnings])
+
+        for (_, severity), hits, message in zip(self.rule_config['scopes']['source'], self.source_counts, self.source_messages):
+            if hits:
+                (all_errors if severity == 'error' else all_warnings).append(message)
+
+        starts = list(accumulate(self.lengths, initial=0))
+        stripped_starts = list(accumulate((statement['stripped_length'] for statement in self.statements), initial=0))
+        newline_starts = list(accumulate((statement['newlines'] for statement in self.statements), initial=0))
+
+        # The full extractor scans pattern by pattern, so group candidates by type to number them the same way
+        by_type = {operation_type: [] for operation_type in OPERATION_PATTERNS}
+        for index, statement in enumerate(self.statements):
+            for candidate in statement['candidates']:
+                by_type[candidate[0]].append((index, candidate))
+
+        for candidates in by_type.values():
+            for index, (_, position, operation, op_errors, op_warnings) in candidates:
+                # Like the full extractor, the stripped-text offset is counted against the original text
+                offset = stripped_starts[index] + position
+                line_index = min(bisect_right(starts, offset) - 1, len(self.statements) - 1)
+                line_number = 1 + newline_starts[line_index] + self.statements[line_index]['text'].count(
+                    '\n', 0, offset - starts[line_index])
+                if op_errors:
+                    all_errors.extend([f"Operation {len(operations)+1} (line {line_number}): {e}" for e in op_errors])
+                    continue
+                if op_warnings:
+                    all_warnings.extend([f"Operation {len(operations)+1} (line {line_number}): {w}" for w in op_warnings])
+                operations.append(dict(operation, line_number=line_number, offset=offset))
+
+        return operations, all_errors, all_warnings
@@ -0,0 +1,328 @@
+"""Catalog of the indexes each collection has after the changeset history (``liquibase-mongo indexes``).
+
+The catalog replays createIndex, dropIndex and dropCollection operations in
+order, per collection and context (each context is its own database), and remembers which changelogs it has already applied, so an update
+after a new changeset is generated only reads the new files. It is saved as
+compact JSON. ``findings`` reports indexes that another index already
+covers, the same key pattern under two names, and collections with so many
+indexes that every write pays for all of them.
+"""
+import os
+import sys
+import json
+import argparse
+
+from .parser import DEFAULT_CONTEXT
+from .generator import extract_index_name
+from .shell_literal import ShellRegex, parse_shell_literal, to_json_compatible
+
+DEFAULT_CATALOG_PATH = os.path.join('json_changesets', 'index_catalog.json')
+DEFAULT_MAX_INDEXES = 10
+CATALOG_FORMAT = 2
+
+EQUALITY_OPERATORS = {'$eq', '$in'}
+RANGE_OPERATORS = {'$gt', '$gte', '$lt', '$lte'}
+# $or branches multiply out; past this many the filter is too complex to judge
+MAX_FILTER_BRANCHES = 64
+
+# Options that change what an index enforces or contains; an index with any of these is never redundant
+SEMANTIC_OPTIONS = {'unique', 'partialFilterExpression', 'sparse', 'expireAfterSeconds', 'collation', 'hidden', 'weights', 'wildcardProjection'}
+# MongoDB keeps two indexes on the same key pattern apart when these differ
+DISTINCT_KEY_OPTIONS = ('collation', 'partialFilterExpression')
+
+def parse_index_key(text):
+    """Key pattern as a list of [field, direction] pairs, or None when it cannot be parsed."""
+    try:
+        value = parse_shell_literal(text)
+    except ValueError:
+        return None
+    if not isinstance(value, dict) or not value:
+        return None
+    return [[field, direction] for field, direction in to_json_compatible(value).items()]
+
+def default_index_name(key):
+    """The name MongoDB gives an index created without one: a_1_b_-1."""
+    return '_'.join(f"{field}_{direction}" for field, direction in key)
+
+def _parse_options(text):
+    try:
+        value = parse_shell_literal(text) if text and text.strip() else {}
+    except ValueError:
+        return {}
+    return to_json_compatible(value) if isinstance(value, dict) else {}
+
+def _format_key(key):
+    return '{ ' + ', '.join(f"{field}: {json.dumps(direction)}" for field, direction in key) + ' }'
+
+def _is_prefix(short, long):
+    if len(short) >= len(long) or any(direction not in (1, -1) for _, direction in short + long):
+        return False
+    head = long[:len(short)]
+    # An index can be walked backwards, so {a: -1} is as good a prefix of {a: 1, b: 1} as {a: 1}
+    return short == head or short == [[field, -direction] for field, direction in head]
+
+class IndexCatalog:
+    """Indexes per (context, collection), plus the changelogs (path, mtime, size) they were built from.
+
+    ``context`` stands in for operations that carry none; ``catalog_for_source``
+    sets it to the context of the file being checked.
+    """
+
+    def __init__(self):
+        self.collections = {}
+        self.sources = []
+        self.context = DEFAULT_CONTEXT
+
+    def apply(self, operations, context=None):
+        """Replay the index-changing operations of one changelog or query file (declared in context)."""
+        for operation in operations:
+            op_type = operation['type']
+            collection = (operation.get('context') or context or self.context, operation['collection'])
+            if op_type == 'createIndex':
+                key = parse_index_key(operation['index_key'])
+                options = _parse_options(operation.get('options'))
+                name = extract_index_name(operation.get('options') or '') or (
+                    default_index_name(key) if key else ' '.join(operation['index_key'].split()))
+                options.pop('name', None)
+                self.collections.setdefault(collection, {})[name] = {'key': key, 'options': options}
+            elif op_type == 'dropIndex':
+                indexes = self.collections.get(collection, {})
+                spec = operation['index_spec'].strip()
+                if spec[:1] in ('"', "'"):
+                    name = spec.strip('"\'')
+                    if name == '*':
+                        indexes.clear()
+                    indexes.pop(name, None)
+                else:
+                    key = parse_index_key(spec)
+                    for name in [name for name, index in indexes.items() if index['key'] == key]:
+                        del indexes[name]
+            elif op_type == 'dropCollection':
+                self.collections.pop(collection, None)
+
+    def indexes(self, collection, context=None):
+        """{name: index} for one collection; index is {'key': [[field, direction], ...], 'options': {...}}."""
+        return self.collections.get((context or self.context, collection), {})
+
+    def index_count(self):
+        return sum(len(indexes) for indexes in self.collections.values())
+
+    def findings(self, max_indexes=DEFAULT_MAX_INDEXES):
+        """Warnings about redundant, duplicate and excessive indexes."""
+        warnings = []
+        for (context, collection), indexes in sorted(self.collections.items()):
+            prefix = f"Index catalog ({context})"
+            parsed = [(name, index) for name, index in indexes.items() if index['key']]
+            for number, (name, index) in enumerate(parsed):
+                if index['key'] == [['_id', 1]] and not index['options']:
+                    warnings.append(f"{prefix}: {collection}.{name} duplicates the built-in _id index")
+                for other_name, other in parsed[number + 1:]:
+                    distinct = any(index['options'].get(option) != other['options'].get(option) for option in DISTINCT_KEY_OPTIONS)
+                    if index['key'] == other['key'] and not distinct:
+                        warnings.append(f"{prefix}: {collection}.{name} and {collection}.{other_name} "
+                                        f"have the same key pattern {_format_key(index['key'])}")
+                for other_name, other in parsed:
+                    # Neither side may change what is indexed: a partial or collated longer index does not cover the prefix
+                    if (_is_prefix(index['key'], other['key']) and not SEMANTIC_OPTIONS & set(index['options'])
+                            and not SEMANTIC_OPTIONS & set(other['options'])):
+                        warnings.append(f"{prefix}: {collection}.{name} {_format_key(index['key'])} is a prefix "
+                                        f"of {collection}.{other_name} {_format_key(other['key'])} and can be dropped")
+                        break
+            # Every collection also carries the _id index
+            total = len(indexes) + 1
+            if total > max_indexes:
+                warnings.append(f"{prefix}: {collection} has {total} indexes (limit {max_indexes}); "
+                                "every insert and update has to maintain all of them")
+        return warnings
+
+    def to_json(self):
+        collections = [{'context': context, 'collection': collection, 'indexes': indexes}
+                       for (context, collection), indexes in self.collections.items()]
+        return {'format': CATALOG_FORMAT, 'sources': self.sources, 'collections': collections}
+
+    @classmethod
+    def from_json(cls, data):
+        catalog = cls()
+        # Older formats are left empty, so update_catalog rebuilds them from the history
+        if data.get('format') == CATALOG_FORMAT:
+            catalog.sources = [list(source) for source in data.get('sources', [])]
+            catalog.collections = {(entry['context'], entry['collection']): entry['indexes']
+                                   for entry in data.get('collections', [])}
+        return catalog
+
+def _usable_condition(condition):
+    """Whether a field's condition can be answered from an index (equality, range or anchored regex)."""
+    if isinstance(condition, ShellRegex):
+        return condition.pattern.startswith('^')
+    if isinstance(condition, dict) and any(str(key).startswith('$') for key in condition):
+        if EQUALITY_OPERATORS & set(condition) or RANGE_OPERATORS & set(condition):
+            return True
+        regex = condition.get('$regex')
+        return isinstance(regex, (str, ShellRegex)) and (regex if isinstance(regex, str) else regex.pattern).startswith('^')
+    return True
+
+def filter_branches(filter_value):
+    """Fields with index-usable conditions, one set per $or branch; None when there are too many branches."""
+    branches = [set()]
+    for key, condition in filter_value.items():
+        if key in ('$and', '$or') and isinstance(condition, list):
+            clauses = [filter_branches(clause) if isinstance(clause, dict) else [set()] for clause in condition]
+            if any(clause is None for clause in clauses):
+                return None
+            if key == '$and':
+                for clause in clauses:
+                    branches = [branch | fields for branch in branches for fields in clause]
+            else:
+                branches = [branch | fields for branch in branches for clause in clauses for fields in clause]
+            if len(branches) > MAX_FILTER_BRANCHES:
+                return None
+        elif not key.startswith('$') and _usable_condition(condition):
+            for branch in branches:
+                branch.add(key)
+    return branches
+
+def _index_serves(index, fields):
+    if not index['key'] or index['options'].get('hidden'):
+        return False
+    field, direction = index['key'][0]
+    if field not in fields or direction not in (1, -1, 'hashed'):
+        return False
+    partial = index['options'].get('partialFilterExpression')
+    # A partial index is only used when the query repeats the fields of its filter
+    return not isinstance(partial, dict) or set(partial) <= fields
+
+def unindexed_filter_message(catalog, operation, field='filter'):
+    """Warning text when no known index can serve an update/delete filter, else None."""
+    try:
+        filter_value = parse_shell_literal(operation[field])
+    except ValueError:
+        return None
+    if not isinstance(filter_value, dict) or not filter_value:
+        return None
+    branches = filter_branches(filter_value)
+    if branches is None:
+        return None
+    indexes = catalog.indexes(operation['collection'], operation.get('context'))
+    uncovered = [fields for fields in branches
+                 if '_id' not in fields and not any(_index_serves(index, fields) for index in indexes.values())]
+    if not uncovered:
+        return None
+    fields = sorted(set().union(*uncovered))
+    where = f"{operation['type']} on '{operation['collection']}'"
+    if not fields:
+        return f"{where} has no equality or range condition an index can use; expect a collection scan (COLLSCAN)"
+    return (f"{where} filters on {', '.join(fields)} but no index starts with any of them "
+            f"(known indexes: {', '.join(indexes) or 'only _id'}); expect a collection scan (COLLSCAN)")
+
+def source_index_operations(content):
+    """createIndex/dropIndex operations of a query file, in source order, without validation."""
+    from .parser import COMMENT_RE, OPERATION_PATTERNS, populate_operation
+    stripped = COMMENT_RE.sub('', content)
+    matches = []
+    for operation_type in ('createIndex', 'dropIndex'):
+        for match in OPERATION_PATTERNS[operation_type].finditer(stripped):
+            operation = {'type': operation_type, 'collection': match.group(1)}
+            populate_operation(operation, operation_type, match.groups())
+            matches.append((match.start(), operation))
+    return [operation for _, operation in sorted(matches, key=lambda item: item[0])]
+
+def catalog_for_source(path, content, default_context=DEFAULT_CONTEXT):
+    """The saved catalog, brought up to date with the history and the indexes content itself creates.
+
+    The updated catalog is saved; content's own index operations are applied
+    only in memory, as they are not part of the history yet. Lookups default
+    to the context content declares, so only indexes of that database count.
+    """
+    from .parser import extract_context_from_content
+    from .history import default_history_paths
+    catalog, _, _ = update_catalog(load_catalog(path), default_history_paths())
+    save_catalog(catalog, path)
+    catalog.context = extract_context_from_content(content, default_context)
+    catalog.apply(source_index_operations(content))
+    return catalog
+
+def load_catalog(path):
+    """Read a saved catalog, or return an empty one when there is none."""
+    if not path or not os.path.exists(path):
+        return IndexCatalog()
+    with open(path, 'r', encoding='utf-8') as file:
+        return IndexCatalog.from_json(json.load(file))
+
+def save_catalog(catalog, path):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(catalog.to_json(), file, separators=(',', ':'))
+
+def build_catalog(sources):
+    """Catalog from (source, operations, context) triples, in apply order."""
+    catalog = IndexCatalog()
+    for _, operations, context in sources:
+        catalog.apply(operations, context)
+    return catalog
+
+def update_catalog(catalog, paths):
+    """Bring a catalog up to date with changelogs in apply order; returns (catalog, applied, problems).
+
+    When the changelogs it was built from are unchanged and still come first,
+    only the new ones are read. Anything else (an edited or removed
+    changelog, a different order) rebuilds it from scratch.
+    """
+    from .history import load_history
+    stamps = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            stamps.append([path, stat.st_mtime_ns, stat.st_size])
+        except OSError:
+            # load_history reports it; a missing file never matches a saved stamp
+            stamps.append([path, None, None])
+    if catalog.sources != stamps[:len(catalog.sources)]:
+        catalog = IndexCatalog()
+    new = stamps[len(catalog.sources):]
+    operations, problems = load_history([path for path, _, _ in new])
+    catalog.apply(operations)
+    catalog.sources.extend(new)
+    return catalog, len(new), problems
+
+def format_catalog(catalog):
+    lines = []
+    for (context, collection), indexes in sorted(catalog.collections.items()):
+        lines.append(f"{collection} in {context} ({len(indexes) + 1} indexes with _id)")
+        for name, index in indexes.items():
+            key = _format_key(index['key']) if index['key'] else '(unparsed key)'
+            options = f"  {json.dumps(index['options'], sort_keys=True)}" if index['options'] else ''
+            lines.append(f"   {name}: {key}{options}")
+    return "\n".join(lines)
+
+def main(argv=None):
+    from .history import default_history_paths
+    parser = argparse.ArgumentParser(prog="liquibase-mongo indexes", description="Build the index catalog from the changeset history and report index problems.")
+    parser.add_argument("changelogs", nargs="*", help="Changelogs in apply order (default: changeset/changelog.xml, then json_changesets/*.xml by version).")
+    parser.add_argument("--catalog", default=DEFAULT_CATALOG_PATH, help=f"Catalog file to update (default: {DEFAULT_CATALOG_PATH}).")
+    parser.add_argument("--rebuild", action="store_true", help="Ignore the saved catalog and replay the whole history.")
+    parser.add_argument("--max-indexes", type=int, default=DEFAULT_MAX_INDEXES, help=f"Indexes per collection, _id included, before warning (default: {DEFAULT_MAX_INDEXES}).")
+    parser.add_argument("--format", choices=["json", "text"], default="text", help="Output format (default: text).")
+    parser.add_argument("--fail-on-findings", action="store_true", help="Exit 1 when any finding is reported.")
+    args = parser.parse_args(argv)
+
+    paths = args.changelogs or default_history_paths()
+    catalog = IndexCatalog() if args.rebuild else load_catalog(args.catalog)
+    catalog, applied, problems = update_catalog(catalog, paths)
+    save_catalog(catalog, args.catalog)
+    findings = catalog.findings(args.max_indexes)
+
+    if args.format == "json":
+        print(json.dumps({'collections': catalog.to_json()['collections'], 'findings': findings, 'problems': problems}))
+    else:
+        print(f"📇 {catalog.index_count()} indexes on {len(catalog.collections)} collections "
+              f"({applied} of {len(paths)} changelogs read, catalog: {args.catalog})")
+        for problem in problems:
+            print(f"⚠️ {problem}")
+        if catalog.collections:
+            print(format_catalog(catalog))
+        for finding in findings:
+            print(f"⚠️ {finding}")
+    return 1 if args.fail_on_findings and findings else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
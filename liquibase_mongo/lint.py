@@ -0,0 +1,92 @@
+"""Fail-fast validation of query files without XML generation (``liquibase-mongo lint``)."""
+import os
+import sys
+import json
+import time
+import argparse
+
+from .parser import extract_mongodb_operations_robust
+from .rules import build_rule_config
+
+def lint_file(js_file_path, rule_config, fail_fast=False):
+    """Extract and validate one .js file without generating XML."""
+    start = time.perf_counter()
+    result = {'file': js_file_path, 'ok': True, 'operations': 0, 'errors': [], 'warnings': []}
+
+    if not os.path.exists(js_file_path):
+        result['ok'] = False
+        result['errors'].append(f"JS file not found: {js_file_path}")
+        return result
+
+    with open(js_file_path, "r", encoding="utf-8") as file:
+        content = file.read()
+
+    operations, errors, warnings = extract_mongodb_operations_robust(content, rule_config, fail_fast=fail_fast)
+
+    result['ok'] = not errors
+    result['operations'] = len(operations)
+    result['errors'] = errors
+    result['warnings'] = warnings
+    result['elapsed_ms'] = round((time.perf_counter() - start) * 1000, 3)
+    return result
+
+def lint_files(js_file_paths, rule_config, fail_fast=False, fail_on_warnings=False):
+    """Lint files in order, stopping at the first failing file when fail_fast is set."""
+    start = time.perf_counter()
+    results = []
+
+    for js_file_path in js_file_paths:
+        result = lint_file(js_file_path, rule_config, fail_fast)
+        if fail_on_warnings and result['warnings']:
+            result['ok'] = False
+        results.append(result)
+        if fail_fast and not result['ok']:
+            break
+
+    return {
+        'ok': all(result['ok'] for result in results),
+        'fail_fast': fail_fast,
+        'files': results,
+        'elapsed_ms': round((time.perf_counter() - start) * 1000, 3),
+    }
+
+def format_text(summary):
+    """Format a lint summary as compiler-style lines."""
+    lines = []
+    for result in summary['files']:
+        for error in result['errors']:
+            lines.append(f"{result['file']}: error: {error}")
+        for warning in result['warnings']:
+            lines.append(f"{result['file']}: warning: {warning}")
+    status = "passed" if summary['ok'] else "failed"
+    lines.append(f"lint {status}: {len(summary['files'])} file(s) in {summary['elapsed_ms']} ms")
+    return "\n".join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="liquibase-mongo lint", description="Validate MongoDB query files without generating Liquibase XML.")
+    parser.add_argument("js_files", nargs="+", help="Paths to .js files.")
+    parser.add_argument("--fail-fast", action="store_true", help="Stop at the first error.")
+    parser.add_argument("--fail-on-warnings", action="store_true", help="Treat warnings as failures.")
+    parser.add_argument("--format", choices=["json", "text"], default="json", help="Output format (default: json).")
+    parser.add_argument("--disable-rule", action="append", default=[], metavar="RULE", help="Disable a validation rule (repeatable).")
+    parser.add_argument("--rule-severity", action="append", default=[], metavar="RULE=LEVEL", help="Override a rule's severity with 'error' or 'warning' (repeatable).")
+    args = parser.parse_args(argv)
+
+    try:
+        rule_config = build_rule_config(
+            disabled=args.disable_rule,
+            severities=dict(item.split("=", 1) for item in args.rule_severity if "=" in item),
+        )
+    except ValueError as e:
+        parser.error(str(e))
+
+    summary = lint_files(args.js_files, rule_config, args.fail_fast, args.fail_on_warnings)
+
+    if args.format == "json":
+        print(json.dumps(summary))
+    else:
+        print(format_text(summary))
+    return 0 if summary['ok'] else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,268 @@
+"""Evaluate MongoDB query filters against Python documents.
+
+``compile_filter`` turns a parsed filter into a predicate once, so it can be
+run over many documents cheaply. Field paths may be dotted and descend into
+arrays the way MongoDB does; comparisons only match values of the same type
+class (numbers with numbers, strings with strings, ...). Supported operators:
+``$eq $ne $gt $gte $lt $lte $in $nin $exists $regex $not $size $and $or $nor``.
+Anything else raises ``UnsupportedQuery``.
+
+Documents exported with ``mongoexport`` use Extended JSON; ``from_extended_json``
+(or ``extended_json_hook`` while decoding) converts ``$oid``/``$date``/``$numberLong``...
+so they compare with shell literals normalized by ``from_shell_value``.
+"""
+import re
+from datetime import datetime, timezone
+from decimal import Decimal
+from collections import namedtuple
+
+from .shell_literal import ShellCall, ShellRegex
+
+class ObjectId(namedtuple('ObjectId', ['hex'])):
+    __slots__ = ()
+
+    def __repr__(self):
+        return f'ObjectId("{self.hex}")'
+
+class UnsupportedQuery(ValueError):
+    """The filter uses an operator or value the matcher cannot evaluate."""
+
+def parse_date(text):
+    """Parse the ISO-8601 forms used by ISODate() and mongoexport into an aware datetime."""
+    text = text.strip()
+    if text.endswith('Z'):
+        text = text[:-1] + '+00:00'
+    try:
+        value = datetime.fromisoformat(text)
+    except ValueError:
+        raise UnsupportedQuery(f"Unrecognized date: {text!r}")
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+def extended_json_hook(value):
+    """json.loads object_hook: converts one Extended JSON wrapper ({"$oid": ...}, {"$date": ...}) as it is decoded."""
+    if len(value) != 1:
+        return value
+    (key, inner), = value.items()
+    if key == '$oid':
+        return ObjectId(inner.lower())
+    if key == '$date':
+        if isinstance(inner, (int, float)):
+            return datetime.fromtimestamp(inner / 1000, tz=timezone.utc)
+        try:
+            return parse_date(inner) if isinstance(inner, str) else value
+        except UnsupportedQuery:
+            return inner
+    if key in ('$numberLong', '$numberInt'):
+        return int(inner)
+    if key == '$numberDouble':
+        return float(inner)
+    if key == '$numberDecimal':
+        return Decimal(inner)
+    return value
+
+def from_extended_json(value):
+    """Convert Extended JSON wrappers in an already decoded value to comparable Python values."""
+    if isinstance(value, dict):
+        return extended_json_hook({key: from_extended_json(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return [from_extended_json(item) for item in value]
+    return value
+
+def from_shell_value(value):
+    """Convert a parsed shell literal (ISODate(), ObjectId(), NumberLong()...) to comparable Python values."""
+    if isinstance(value, ShellCall):
+        args = [from_shell_value(arg) for arg in value.args]
+        if value.name == 'ISODate':
+            return parse_date(args[0]) if args else datetime.now(timezone.utc)
+        if value.name == 'ObjectId' and args:
+            return ObjectId(str(args[0]).lower())
+        if value.name in ('NumberLong', 'NumberInt') and args:
+            return int(args[0])
+        if value.name == 'NumberDecimal' and args:
+            return Decimal(str(args[0]))
+        raise UnsupportedQuery(f"Unsupported value {value.name}()")
+    if isinstance(value, dict):
+        return {key: from_shell_value(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [from_shell_value(item) for item in value]
+    return value
+
+def _type_class(value):
+    if isinstance(value, bool):
+        return 'bool'
+    if isinstance(value, (int, float, Decimal)):
+        return 'number'
+    return type(value).__name__
+
+def _resolve(value, parts):
+    """Yield the values at a dotted path, descending into arrays like MongoDB does."""
+    if not parts:
+        yield value
+        return
+    head, rest = parts[0], parts[1:]
+    if isinstance(value, dict):
+        if head in value:
+            yield from _resolve(value[head], rest)
+    elif isinstance(value, list):
+        if head.isdigit() and int(head) < len(value):
+            yield from _resolve(value[int(head)], rest)
+        for item in value:
+            if isinstance(item, dict):
+                yield from _resolve(item, parts)
+
+def _candidates(values):
+    """Each value, plus the elements of array values."""
+    for value in values:
+        yield value
+        if isinstance(value, list):
+            yield from value
+
+def path_values(document, path):
+    """Every value a filter on path compares against: the values at the path plus their array elements."""
+    if '.' not in path:
+        if path not in document:
+            return []
+        value = document[path]
+        return [value, *value] if isinstance(value, list) else [value]
+    return list(_candidates(_resolve(document, path.split('.'))))
+
+def value_key(value):
+    """A hashable key; values the matcher considers equal get equal keys."""
+    if isinstance(value, dict):
+        return ('object', tuple(sorted((key, value_key(item)) for key, item in value.items())))
+    if isinstance(value, list):
+        return ('array', tuple(value_key(item) for item in value))
+    return (_type_class(value), value)
+
+def equality_values(condition):
+    """The values a field condition requires one of ({f: v}, $eq, $in), or None when it is not such a condition."""
+    if _is_operator_object(condition):
+        if set(condition) == {'$eq'}:
+            values = [condition['$eq']]
+        elif set(condition) == {'$in'} and isinstance(condition['$in'], list):
+            values = condition['$in']
+        else:
+            return None
+    else:
+        values = [condition]
+    values = [_literal(value) for value in values]
+    # null also matches missing fields and regexes match by pattern: neither can be looked up by key
+    if any(value is None or isinstance(value, re.Pattern) for value in values):
+        return None
+    return values
+
+def _equals(a, b):
+    if isinstance(b, re.Pattern):
+        return isinstance(a, str) and b.search(a) is not None
+    return _type_class(a) == _type_class(b) and a == b
+
+def _compare(operator):
+    def compare(a, b):
+        if _type_class(a) != _type_class(b) or isinstance(a, (dict, list)):
+            return False
+        try:
+            return operator(a, b)
+        except TypeError:
+            return False
+    return compare
+
+COMPARISONS = {
+    '$gt': _compare(lambda a, b: a > b),
+    '$gte': _compare(lambda a, b: a >= b),
+    '$lt': _compare(lambda a, b: a < b),
+    '$lte': _compare(lambda a, b: a <= b),
+}
+
+def _regex(pattern, options=''):
+    flags = 0
+    for option in options:
+        flags |= {'i': re.IGNORECASE, 'm': re.MULTILINE, 's': re.DOTALL, 'x': re.VERBOSE}.get(option, 0)
+    try:
+        return re.compile(pattern, flags)
+    except re.error as e:
+        raise UnsupportedQuery(f"Invalid regex {pattern!r}: {e}")
+
+def _literal(value):
+    """Normalize a filter value: shell calls become Python values, regexes are compiled."""
+    if isinstance(value, ShellRegex):
+        return _regex(value.pattern, value.flags)
+    if isinstance(value, list):
+        return [_literal(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _literal(item) for key, item in value.items()}
+    return from_shell_value(value)
+
+def _is_operator_object(value):
+    return isinstance(value, dict) and value and all(str(key).startswith('$') for key in value)
+
+def _equality(expected):
+    if expected is None:
+        # {field: null} also matches documents without the field
+        return lambda values: not values or any(value is None for value in values)
+    return lambda values: any(_equals(value, expected) for value in _candidates(values))
+
+def _field_predicate(condition):
+    """Predicate over the list of values found at a path."""
+    if not _is_operator_object(condition):
+        return _equality(_literal(condition))
+
+    checks = []
+    options = condition.get('$options', '')
+    for operator, argument in condition.items():
+        if operator == '$eq':
+            checks.append(_equality(_literal(argument)))
+        elif operator == '$ne':
+            equal = _equality(_literal(argument))
+            checks.append(lambda values, equal=equal: not equal(values))
+        elif operator in COMPARISONS:
+            compare, bound = COMPARISONS[operator], _literal(argument)
+            checks.append(lambda values, compare=compare, bound=bound: any(compare(v, bound) for v in _candidates(values)))
+        elif operator in ('$in', '$nin'):
+            if not isinstance(argument, list):
+                raise UnsupportedQuery(f"{operator} needs an array")
+            options_list = [_equality(_literal(item)) for item in argument]
+            check = lambda values, options_list=options_list: any(option(values) for option in options_list)
+            checks.append(check if operator == '$in' else (lambda values, check=check: not check(values)))
+        elif operator == '$exists':
+            checks.append(lambda values, wanted=bool(argument): bool(values) == wanted)
+        elif operator == '$regex':
+            pattern = _regex(argument.pattern, argument.flags + options) if isinstance(argument, ShellRegex) else _regex(argument, options)
+            checks.append(lambda values, pattern=pattern: any(isinstance(v, str) and pattern.search(v) for v in _candidates(values)))
+        elif operator == '$options':
+            continue
+        elif operator == '$not':
+            inner = _field_predicate(argument)
+            checks.append(lambda values, inner=inner: not inner(values))
+        elif operator == '$size':
+            checks.append(lambda values, size=argument: any(isinstance(v, list) and len(v) == size for v in values))
+        else:
+            raise UnsupportedQuery(f"Unsupported operator {operator}")
+    return lambda values: all(check(values) for check in checks)
+
+def compile_filter(query):
+    """Compile a parsed filter (dict from parse_shell_literal) into a document predicate."""
+    if not isinstance(query, dict):
+        raise UnsupportedQuery("Filter is not an object")
+    checks = []
+    for key, condition in query.items():
+        if key in ('$and', '$or', '$nor'):
+            if not isinstance(condition, list) or not condition:
+                raise UnsupportedQuery(f"{key} needs a non-empty array")
+            clauses = [compile_filter(clause) for clause in condition]
+            if key == '$and':
+                checks.append(lambda document, clauses=clauses: all(clause(document) for clause in clauses))
+            elif key == '$or':
+                checks.append(lambda document, clauses=clauses: any(clause(document) for clause in clauses))
+            else:
+                checks.append(lambda document, clauses=clauses: not any(clause(document) for clause in clauses))
+        elif key.startswith('$'):
+            raise UnsupportedQuery(f"Unsupported operator {key}")
+        else:
+            parts = key.split('.')
+            predicate = _field_predicate(condition)
+            checks.append(lambda document, parts=parts, predicate=predicate: predicate(list(_resolve(document, parts))))
+    return lambda document: all(check(document) for check in checks)
+
+def matches(document, query):
+    """Whether one document matches a parsed filter."""
+    return compile_filter(query)(document)
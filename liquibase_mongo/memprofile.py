@@ -0,0 +1,75 @@
+"""tracemalloc-based per-phase memory profiling (--memprofile)."""
+import tracemalloc
+from contextlib import contextmanager
+
+def start_memory_profile(enabled=True):
+    """Start tracemalloc and return a profile that collects per-phase results."""
+    profile = {'enabled': enabled, 'phases': [], 'snapshot': None}
+    if enabled:
+        tracemalloc.start()
+        profile['snapshot'] = tracemalloc.take_snapshot()
+    return profile
+
+@contextmanager
+def memory_phase(profile, name):
+    """Record peak memory and the top allocation sites of one phase."""
+    if not profile['enabled']:
+        yield
+        return
+
+    tracemalloc.reset_peak()
+    start_current, _ = tracemalloc.get_traced_memory()
+    try:
+        yield
+    finally:
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ])
+        stats = snapshot.compare_to(profile['snapshot'], 'lineno')
+        profile['snapshot'] = snapshot
+        profile['phases'].append({
+            'name': name,
+            'start': start_current,
+            'current': current,
+            'peak': peak,
+            'top': [stat for stat in stats if stat.size_diff > 0],
+        })
+
+def stop_memory_profile(profile):
+    """Stop tracemalloc and return the overall peak in bytes."""
+    if not profile['enabled']:
+        return 0
+    tracemalloc.stop()
+    return max((phase['peak'] for phase in profile['phases']), default=0)
+
+def format_size(num_bytes):
+    """Format a byte count for humans."""
+    for unit in ['B', 'KiB', 'MiB']:
+        if abs(num_bytes) < 1024:
+            return f"{num_bytes:.1f} {unit}"
+        num_bytes /= 1024
+    return f"{num_bytes:.1f} GiB"
+
+def generate_memory_report(profile, input_size, top=10):
+    """Generate a human-readable per-phase memory report."""
+    report = []
+    overall_peak = max((phase['peak'] for phase in profile['phases']), default=0)
+
+    report.append("🧠 MEMORY PROFILE")
+    report.append("=" * 50)
+    report.append(f"Input size: {format_size(input_size)}")
+    ratio = f" ({overall_peak / input_size:.1f}x input)" if input_size else ""
+    report.append(f"Overall peak: {format_size(overall_peak)}{ratio}")
+    report.append("")
+
+    for phase in profile['phases']:
+        report.append(f"▶ {phase['name']}: peak {format_size(phase['peak'])}, "
+                      f"retained {format_size(phase['current'] - phase['start'])}")
+        for stat in phase['top'][:top]:
+            frame = stat.traceback[0]
+            report.append(f"    {format_size(stat.size_diff):>12}  {frame.filename}:{frame.lineno}")
+    report.append("")
+
+    return "\n".join(report)
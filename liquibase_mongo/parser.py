@@ -0,0 +1,252 @@
+"""Read MongoDB query files and extract the operations they contain."""
+import os
+import re
+import logging
+
+from .rules import validate_query_syntax, validate_file_header, run_text_rules
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONTEXT = "liquibase_test"
+
+OPERATION_PATTERNS = {
+    # Insert operations
+    'insertMany': r'db\.getCollection\s*\(\s*["\']([^"\']+)["\']\s*\)\s*\.insertMany\s*\(\s*(\[.*?\])\s*\)\s*;?',
+    'insertOne': r'db\.getCollection\s*\(\s*["\']([^"\']+)["\']\s*\)\s*\.insertOne\s*\(\s*(\{.*?\})\s*\)\s*;?',
+    'insert': r'db\.getCollection\s*\(\s*["\']([^"\']+)["\']\s*\)\s*\.insert\s*\(\s*(\{.*?\}|\[.*?\])\s*\)\s*;?',
+    
+    # Update operations  
+    'updateOne': r'db\.getCollection\s*\(\s*["\']([^"\']+)["\']\s*\)\s*\.updateOne\s*\(\s*(\{.*?\})\s*,\s*(\{.*?\}|\[.*?\])\s*(?:,\s*(\{.*?\}))?\s*\)\s*;?',
+    'updateMany': r'db\.getCollection\s*\(\s*["\']([^"\']+)["\']\s*\)\s*\.updateMany\s*\(\s*(\{.*?\})\s*,\s*(\{.*?\}|\[.*?\])\s*(?:,\s*(\{.*?\}))?\s*\)\s*;?',
+    'replaceOne': r'db\.getCollection\s*\(\s*["\']([^"\']+)["\']\s*\)\s*\.replaceOne\s*\(\s*(\{.*?\})\s*,\s*(\{.*?\})\s*(?:,\s*(\{.*?\}))?\s*\)\s*;?',
+    
+    # Delete operations
+    'deleteOne': r'db\.getCollection\s*\(\s*["\']([^"\']+)["\']\s*\)\s*\.deleteOne\s*\(\s*(\{.*?\})\s*(?:,\s*(\{.*?\}))?\s*\)\s*;?',
+    'deleteMany': r'db\.getCollection\s*\(\s*["\']([^"\']+)["\']\s*\)\s*\.deleteMany\s*\(\s*(\{.*?\})\s*(?:,\s*(\{.*?\}))?\s*\)\s*;?',
+    'remove': r'db\.getCollection\s*\(\s*["\']([^"\']+)["\']\s*\)\s*\.remove\s*\(\s*(\{.*?\})\s*(?:,\s*(\{.*?\}))?\s*\)\s*;?',
+    
+    # Mixed writes, grouped into insert/update/delete commands by the generator
+    'bulkWrite': r'db\.getCollection\s*\(\s*["\']([^"\']+)["\']\s*\)\s*\.bulkWrite\s*\(\s*(\[.*?\])\s*(?:,\s*(\{.*?\}))?\s*\)\s*;?',
+    
+    # Aggregation (only pipelines ending in $merge/$out pass validation)
+    'aggregate': r'db\.getCollection\s*\(\s*["\']([^"\']+)["\']\s*\)\s*\.aggregate\s*\(\s*(\[.*?\])\s*(?:,\s*(\{.*?\}))?\s*\)\s*;?',
+    
+    # Index operations
+    'createIndex': r'db\.getCollection\s*\(\s*["\']([^"\']+)["\']\s*\)\s*\.createIndex\s*\(\s*(\{.*?\})\s*(?:,\s*(\{.*?\}))?\s*\)\s*;?',
+    'dropIndex': r'db\.getCollection\s*\(\s*["\']([^"\']+)["\']\s*\)\s*\.dropIndex\s*\(\s*(["\'][^"\']*["\']|\{.*?\})\s*\)\s*;?',
+    
+    # Collection operations
+    'createCollection': r'db\.createCollection\s*\(\s*["\']([^"\']+)["\']\s*(?:,\s*(\{.*?\}))?\s*\)\s*;?',
+    'dropCollection_direct': r'db\.dropCollection\s*\(\s*["\']([^"\']+)["\']\s*\)\s*;?',
+    'dropCollection_getCollection': r'db\.getCollection\s*\(\s*["\']([^"\']+)["\']\s*\)\s*\.drop\s*\(\s*\)\s*;?',
+    'dropCollection_dot': r'db\.([a-zA-Z_][a-zA-Z0-9_]*)\s*\.drop\s*\(\s*\)\s*;?',
+}
+
+# Compiled once at import so repeated conversions (API, watch, server) skip regex setup
+OPERATION_PATTERNS = {name: re.compile(pattern, re.DOTALL) for name, pattern in OPERATION_PATTERNS.items()}
+COMMENT_RE = re.compile(r'//[^\n]*|/\*.*?\*/', re.DOTALL)
+
+def parse_js_file(js_file_path):
+    """Parse MongoDB queries from a .js file."""
+    if not os.path.exists(js_file_path):
+        raise FileNotFoundError(f"JS file not found: {js_file_path}")
+    
+    with open(js_file_path, "r", encoding="utf-8") as file:
+        content = file.read()
+        logger.debug("JS file content (%d characters):\n%s\n%s\n%s", len(content), "=" * 50, content, "=" * 50)
+        return content
+
+def version_sort_key(path):
+    """Sort version_2.js before version_10.js."""
+    name = os.path.basename(path)
+    digits = ''.join(ch for ch in name if ch.isdigit())
+    return (int(digits) if digits else 0, name)
+
+def extract_context_from_content(content, default_context=DEFAULT_CONTEXT):
+    """Extract context from the top of the JS file."""
+    lines = content.split('\n')[:10]
+    first_lines = '\n'.join(lines)
+    
+    logger.debug("Looking for context in first 10 lines:\n%s\n%s\n%s", "=" * 30, first_lines, "=" * 30)
+    
+    context_patterns = [
+        r'//\s*@?context\s*:?\s*([a-zA-Z0-9_]+)',
+        r'/\*\s*@?context\s*:?\s*([a-zA-Z0-9_]+)\s*\*/',
+        r'//\s*@?Context\s*:?\s*([a-zA-Z0-9_]+)',
+        r'/\*\s*@?Context\s*:?\s*([a-zA-Z0-9_]+)\s*\*/',
+        r'//\s*DATABASE\s*:?\s*([a-zA-Z0-9_]+)',
+        r'/\*\s*DATABASE\s*:?\s*([a-zA-Z0-9_]+)\s*\*/',
+    ]
+    
+    for pattern in context_patterns:
+        match = re.search(pattern, first_lines, re.IGNORECASE)
+        if match:
+            context = match.group(1)
+            logger.debug(f"Found context: '{context}' using pattern: {pattern}")
+            return context
+    
+    logger.debug(f"No context found in file, using default '{default_context}'")
+    return default_context
+
+def validate_and_clean_json(json_str):
+    """Validate and clean JSON, converting problematic date formats."""
+    if not json_str:
+        return "{}"
+    
+    # Clean the JSON string
+    cleaned = json_str.strip()
+    
+    logger.debug(f"Original JSON snippet: {cleaned[:100]}...")
+    
+    # Replace common problematic patterns
+    replacements = [
+        # Fix new Date() calls to ISODate() - Various formats
+        (r'new\s+Date\s*\(\s*"([^"]+)"\s*\)', r'ISODate("\1")'),
+        (r'new\s+Date\s*\(\s*\'([^\']+)\'\s*\)', r'ISODate("\1")'),
+        (r'new\s+Date\s*\(\s*\)', r'ISODate()'),
+        
+        # Handle common date format issues
+        (r'ISODate\s*\(\s*"(\d{4}-\d{2}-\d{2})"\s*\)', r'ISODate("\1T00:00:00.000Z")'),
+        
+        # Clean up whitespace and formatting
+        (r'\s+', ' '),  # Multiple spaces to single space
+        (r'\s*,\s*', ', '),  # Clean comma spacing
+        (r'\s*:\s*', ': '),  # Clean colon spacing
+        
+        # Ensure proper quote usage for MongoDB
+        (r"'([^']*)'(\s*:)", r'"\1"\2'),  # Convert single quotes to double quotes for keys
+    ]
+    
+    for pattern, replacement in replacements:
+        before = cleaned
+        cleaned = re.sub(pattern, replacement, cleaned)
+        if before != cleaned:
+            logger.debug(f"Applied replacement: {pattern[:50]}...")
+    
+    logger.debug(f"Cleaned JSON snippet: {cleaned[:100]}...")
+    return cleaned
+
+def populate_operation(operation, operation_type, groups):
+    """Fill in the type-specific fields of an operation from its regex groups."""
+    if operation_type in ['insertMany', 'insertOne', 'insert']:
+        operation['documents'] = groups[1]
+    elif operation_type in ['updateOne', 'updateMany', 'replaceOne']:
+        operation['filter'] = groups[1]
+        operation['update'] = groups[2]
+        operation['options'] = groups[3] if len(groups) > 3 and groups[3] else None
+    elif operation_type in ['deleteOne', 'deleteMany', 'remove']:
+        operation['filter'] = groups[1]
+        operation['options'] = groups[2] if len(groups) > 2 and groups[2] else None
+    elif operation_type == 'bulkWrite':
+        operation['requests'] = groups[1]
+        operation['options'] = groups[2] if len(groups) > 2 and groups[2] else None
+    elif operation_type == 'aggregate':
+        operation['pipeline'] = groups[1]
+        operation['options'] = groups[2] if len(groups) > 2 and groups[2] else None
+    elif operation_type == 'createIndex':
+        operation['index_key'] = groups[1]
+        operation['options'] = groups[2] if len(groups) > 2 and groups[2] else None
+    elif operation_type == 'dropIndex':
+        operation['index_spec'] = groups[1]
+    elif operation_type == 'createCollection':
+        operation['options'] = groups[1] if len(groups) > 1 and groups[1] else None
+    elif operation_type in ['dropCollection_direct', 'dropCollection_getCollection', 'dropCollection_dot']:
+        operation['type'] = 'dropCollection'
+        operation['collection'] = groups[0]
+
+def clean_operation(operation):
+    """Clean the JSON-like arguments of a validated operation in place."""
+    if 'documents' in operation:
+        operation['documents'] = validate_and_clean_json(operation['documents'])
+    if 'filter' in operation:
+        operation['filter'] = validate_and_clean_json(operation['filter'])
+    if 'update' in operation:
+        operation['update'] = validate_and_clean_json(operation['update'])
+    if 'pipeline' in operation:
+        operation['pipeline'] = validate_and_clean_json(operation['pipeline'])
+    if 'requests' in operation:
+        operation['requests'] = validate_and_clean_json(operation['requests'])
+
+def extract_mongodb_operations_robust(content, rule_config=None, rule_timings=None, fail_fast=False):
+    """Enhanced operation extraction with comprehensive validation.
+
+    With fail_fast the scan stops at the first error and returns what it has so far.
+    """
+    operations = []
+    all_errors = []
+    all_warnings = []
+    
+    logger.debug("Starting robust MongoDB operation extraction...")
+    
+    # Validate file header
+    header_errors, header_warnings = validate_file_header(content, rule_config, rule_timings)
+    all_errors.extend([f"Header: {e}" for e in header_errors])
+    all_warnings.extend([f"Header: {w}" for w in header_warnings])
+    if fail_fast and all_errors:
+        return operations, all_errors, all_warnings
+    
+    # Remove comments first (single pass so only one stripped copy of the file is held)
+    content_no_comments = COMMENT_RE.sub('', content)
+    
+    
+    # Check for unsupported patterns
+    source_errors, source_warnings = run_text_rules('source', content_no_comments, rule_config, rule_timings)
+    all_errors.extend(source_errors)
+    all_warnings.extend(source_warnings)
+    if fail_fast and all_errors:
+        return operations, all_errors, all_warnings
+    
+    # Extract operations
+    for operation_type, pattern in OPERATION_PATTERNS.items():
+        # Matches arrive in order, so count newlines incrementally instead of from the start each time
+        line_pos, line_number = 0, 1
+        for match in pattern.finditer(content_no_comments):
+            groups = match.groups()
+            line_number += content.count('\n', line_pos, match.start())
+            line_pos = match.start()
+            
+            operation = {
+                'type': operation_type,
+                'collection': groups[0],
+                # Only a preview is kept; holding every full match would duplicate the file
+                'raw_match': content_no_comments[match.start():min(match.end(), match.start() + 200)],
+                'line_number': line_number,
+                # Operations are collected pattern by pattern; the offset keeps their order in the file
+                'offset': match.start()
+            }
+            
+            populate_operation(operation, operation_type, groups)
+            
+            # Validate and clean the operation
+            op_errors, op_warnings = validate_query_syntax(operation, rule_config, rule_timings)
+            
+            if op_errors:
+                all_errors.extend([f"Operation {len(operations)+1} (line {operation['line_number']}): {e}" for e in op_errors])
+                if fail_fast:
+                    return operations, all_errors, all_warnings
+                logger.debug(f"Skipping invalid operation due to errors: {op_errors}")
+                continue
+            
+            if op_warnings:
+                all_warnings.extend([f"Operation {len(operations)+1} (line {operation['line_number']}): {w}" for w in op_warnings])
+            
+            clean_operation(operation)
+            
+            operations.append(operation)
+            logger.debug(f"Found {operation['type']} operation on collection '{operation['collection']}' at line {operation['line_number']}")
+    
+    logger.debug(f"Total operations found: {len(operations)}")
+    logger.debug(f"Total errors: {len(all_errors)}")
+    logger.debug(f"Total warnings: {len(all_warnings)}")
+    
+    if all_errors:
+        logger.info("ERRORS:")
+        for error in all_errors:
+            logger.info(f"  ❌ {error}")
+    
+    if all_warnings:
+        logger.info("WARNINGS:")
+        for warning in all_warnings:
+            logger.info(f"  ⚠️ {warning}")
+    
+    return operations, all_errors, all_warnings
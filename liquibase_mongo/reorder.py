@@ -0,0 +1,147 @@
+"""Reorder a file's operations so indexes on new collections are built after their bulk loads.
+
+Operations are extracted pattern by pattern; ``reorder_operations`` first
+puts them back in the order they appear in the file, then moves each
+``createIndex`` on a collection the file creates (or drops) past the inserts
+that follow it. Building an index once over loaded documents is cheaper than
+having every insert maintain it. An index only moves:
+
+- past inserts into its own collection (other collections' operations are
+  independent and stay where they are),
+- up to the first operation that reads or reshapes the collection (update,
+  delete, aggregate, another index change, drop),
+- for a unique index, only when the documents inserted into the collection
+  up to its new position have no duplicate keys, so the inserts cannot
+  succeed where they used to fail on the index,
+- and only when the throughput profile says it saves time.
+"""
+from .costmodel import DEFAULT_RATES, format_duration
+from .matcher import UnsupportedQuery, from_shell_value, path_values, value_key
+from .rules import aggregate_output
+from .shell_literal import parse_shell_literal
+
+INSERT_TYPES = ('insertOne', 'insertMany', 'insert')
+
+def source_order(operations):
+    """Operations in the order they appear in the file (offset, else line number)."""
+    return sorted(operations, key=lambda operation: operation['offset'] if 'offset' in operation
+                  else operation.get('line_number') or 0)
+
+def _documents(operation):
+    value = from_shell_value(parse_shell_literal(operation['documents']))
+    return value if isinstance(value, list) else [value]
+
+def _insert_count(operation):
+    try:
+        return len(_documents(operation))
+    except ValueError:
+        return None
+
+def _index_options(operation):
+    try:
+        options = parse_shell_literal(operation['options']) if operation.get('options') else {}
+    except ValueError:
+        return None
+    return options if isinstance(options, dict) else None
+
+def _unique_keys_distinct(index_operation, inserts):
+    """Whether the inserted documents have pairwise distinct keys for the index; False when unsure."""
+    try:
+        key = parse_shell_literal(index_operation['index_key'])
+        fields = list(key) if isinstance(key, dict) else None
+        if not fields:
+            return False
+        seen = set()
+        for operation in inserts:
+            for document in _documents(operation):
+                values = []
+                for field in fields:
+                    found = path_values(document, field)
+                    # Arrays make the index multikey: every element is a key, too many cases to be sure
+                    if any(isinstance(value, list) for value in found):
+                        return False
+                    values.append(value_key(found[0] if found else None))
+                if tuple(values) in seen:
+                    return False
+                seen.add(tuple(values))
+    except (ValueError, UnsupportedQuery):
+        return False
+    return True
+
+def _move_target(ordered, position):
+    """New position for the createIndex at position, or None when it has to stay."""
+    operation = ordered[position]
+    collection = operation['collection']
+    target = None
+    for index in range(position + 1, len(ordered)):
+        other = ordered[index]
+        # A $merge into the collection may rely on the index (its 'on' fields need a unique one)
+        if other['type'] == 'aggregate' and aggregate_output(other['pipeline']) == collection:
+            break
+        if other['collection'] != collection:
+            continue
+        if other['type'] not in INSERT_TYPES:
+            break
+        target = index
+    if target is None:
+        return None
+    options = _index_options(operation)
+    if options is None:
+        return None
+    if options.get('unique'):
+        inserts = [other for other in ordered[:target + 1]
+                   if other['collection'] == collection and other['type'] in INSERT_TYPES]
+        if not _unique_keys_distinct(operation, inserts):
+            return None
+    return target
+
+def reorder_operations(operations, rates=None):
+    """Return (operations, moves): operations in file order with createIndex moved past bulk loads.
+
+    moves lists {'operation', 'inserts', 'documents', 'saving'} per moved
+    index; saving is the estimated seconds saved (documents the index no
+    longer maintains on insert, minus building it over them afterwards).
+    """
+    rates = rates or DEFAULT_RATES
+    ordered = source_order(operations)
+    fresh_at = {}
+    for position, operation in enumerate(ordered):
+        if operation['type'] in ('createCollection', 'dropCollection'):
+            fresh_at.setdefault(operation['collection'], position)
+
+    moves = []
+    # Last index first, so indexes that move past the same inserts keep their relative order
+    for position in range(len(ordered) - 1, -1, -1):
+        operation = ordered[position]
+        if operation['type'] != 'createIndex' or fresh_at.get(operation['collection'], len(ordered)) > position:
+            continue
+        target = _move_target(ordered, position)
+        if target is None:
+            continue
+        jumped = [other for other in ordered[position + 1:target + 1]
+                  if other['collection'] == operation['collection']]
+        counts = [_insert_count(other) for other in jumped]
+        documents = sum(count or 0 for count in counts)
+        saving = documents * (rates['index_write_overhead'] / rates['insert_docs_per_second']
+                              - 1 / rates['index_build_docs_per_second'])
+        if saving <= 0:
+            continue
+        ordered.insert(target, ordered.pop(position))
+        moves.append({'operation': operation, 'inserts': len(jumped), 'documents': documents,
+                      'saving': saving, 'lower_bound': None in counts})
+    moves.reverse()
+    return ordered, moves
+
+def reorder_notes(moves):
+    """Report notes describing each moved index and the total estimated saving."""
+    notes = []
+    for move in moves:
+        operation = move['operation']
+        plus = '+' if move['lower_bound'] else ''
+        notes.append(f"Reordered: createIndex on '{operation['collection']}' (line {operation.get('line_number')}) "
+                     f"now runs after {move['inserts']} insert(s) of {move['documents']:,}{plus} document(s); "
+                     f"saves about {format_duration(move['saving'])}")
+    if moves:
+        total = sum(move['saving'] for move in moves)
+        notes.append(f"Reordering saves about {format_duration(total)} in total")
+    return notes
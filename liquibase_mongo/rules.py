@@ -0,0 +1,534 @@
+"""Validation rule registry shared by the converter and the linter."""
+import re
+import time
+from functools import partial
+
+# Every rule is declared once here with its regexes compiled at import time.
+# 'scope' is 'operation' (run against each parsed operation), 'header' (the
+# first HEADER_LINES lines of the file) or 'source' (the comment-stripped file).
+# Operation rules list the op types they apply to (None = all) and the fields
+# they inspect; a rule returning a message reports it at the rule's severity.
+
+HEADER_LINES = 15
+INSERT_TYPES = ['insertMany', 'insertOne', 'insert']
+UPDATE_TYPES = ['updateOne', 'updateMany', 'replaceOne']
+DELETE_TYPES = ['deleteOne', 'deleteMany', 'remove']
+OPERATION_TYPES = INSERT_TYPES + UPDATE_TYPES + DELETE_TYPES + ['bulkWrite', 'aggregate', 'createIndex', 'dropIndex', 'createCollection',
+                                                                 'dropCollection']
+
+COLLECTION_NAME_RE = re.compile(r'^[a-zA-Z_][a-zA-Z0-9_]*$')
+SINGLE_QUOTED_KEY_RE = re.compile(r"'[^']*'\s*:")
+JS_FUNCTION_RE = re.compile(r'function\s*\(')
+
+def _check_missing_collection(operation, field):
+    if field not in operation or not operation[field]:
+        return "Missing collection name"
+
+def _check_collection_name(operation, field):
+    if not COLLECTION_NAME_RE.match(operation[field]):
+        return f"Invalid collection name format: '{operation[field]}'. Use alphanumeric and underscore only."
+
+def _check_missing_type(operation, field):
+    if not operation.get(field, ''):
+        return "Missing operation type"
+
+def _check_required_field(description):
+    def check(operation, field):
+        if field not in operation:
+            return f"{operation['type']} operation missing {description}"
+    return check
+
+def _check_new_date(operation, field):
+    if field in operation and 'new Date(' in operation[field] and 'ISODate(' not in operation[field]:
+        return "Found 'new Date()' - converting to 'ISODate()' format"
+
+def _check_single_quoted_keys(operation, field):
+    if field in operation and SINGLE_QUOTED_KEY_RE.search(operation[field]):
+        return "Found single quotes for object keys - converting to double quotes"
+
+def _check_js_function(operation, field):
+    if field in operation and JS_FUNCTION_RE.search(operation[field]):
+        return f"JavaScript functions not supported in {field}"
+
+def _check_unsafe(operation, field):
+    if field in operation and ('eval(' in operation[field] or '$where' in operation[field]):
+        return f"Potentially unsafe operation found in {field}"
+
+# createIndexes index options and the type of their value
+INDEX_OPTIONS = {
+    'name': str, 'unique': bool, 'sparse': bool, 'hidden': bool, 'background': bool,
+    'expireAfterSeconds': int, 'partialFilterExpression': dict, 'collation': dict,
+    'weights': dict, 'default_language': str, 'language_override': str, 'textIndexVersion': int,
+    '2dsphereIndexVersion': int, 'bits': int, 'min': (int, float), 'max': (int, float),
+    'wildcardProjection': dict, 'storageEngine': dict,
+}
+TYPE_NAMES = {str: 'a string', bool: 'true or false', int: 'an integer', dict: 'an object', list: 'an array',
+              (int, float): 'a number', (str, dict): 'an index name or key'}
+
+def _index_option_problem(key, options):
+    """Why the createIndex key/options combination is rejected by MongoDB, or None."""
+    directions = list(key.values()) if isinstance(key, dict) else []
+    if 'partialFilterExpression' in options and options.get('sparse'):
+        return "partialFilterExpression and sparse cannot be combined"
+    if 'expireAfterSeconds' in options:
+        if len(directions) != 1 or directions[0] not in (1, -1):
+            return "expireAfterSeconds (TTL) needs a single-field ascending or descending index"
+        if options['expireAfterSeconds'] < 0:
+            return "expireAfterSeconds must not be negative"
+    if options.get('unique') and 'hashed' in directions:
+        return "hashed indexes cannot be unique"
+    if options.get('hidden') and list(key) == ['_id']:
+        return "the _id index cannot be hidden"
+    if 'wildcardProjection' in options and not any(field.endswith('$**') for field in key):
+        return "wildcardProjection needs a wildcard key ('$**')"
+    if 'collation' in options and 'locale' not in options['collation']:
+        return "collation needs a locale"
+    if {'weights', 'default_language', 'language_override'} & set(options) and 'text' not in directions:
+        return "weights, default_language and language_override only apply to text indexes"
+
+def _parse_options(text, known, command):
+    """Options object as a dict; raises ValueError naming the first unparsable, unknown or mistyped option."""
+    from .shell_literal import split_literal, parse_shell_literal
+    try:
+        members = split_literal(text)
+        if not members or not isinstance(members[0], tuple):
+            raise ValueError("not an object")
+        options = {name: parse_shell_literal(value) for name, value in members}
+    except ValueError as e:
+        raise ValueError(f"{command} options could not be parsed: {e}")
+    for name, value in options.items():
+        if name not in known:
+            raise ValueError(f"Unknown {command} option '{name}'. Known options: {', '.join(known)}")
+        expected = known[name]
+        if not isinstance(value, expected) or (isinstance(value, bool) and expected is not bool):
+            raise ValueError(f"{command} option '{name}' must be {TYPE_NAMES[expected]}")
+    return options
+
+def _check_index_options(operation, field):
+    if not operation.get(field):
+        return None
+    try:
+        options = _parse_options(operation[field], INDEX_OPTIONS, 'createIndex')
+    except ValueError as e:
+        return str(e)
+    from .shell_literal import parse_shell_literal
+    try:
+        key = parse_shell_literal(operation.get('index_key') or '{}')
+    except ValueError:
+        key = {}
+    return _index_option_problem(key if isinstance(key, dict) else {}, options)
+
+# create command options and the type of their value
+COLLECTION_OPTIONS = {
+    'capped': bool, 'size': int, 'max': int, 'timeseries': dict, 'expireAfterSeconds': int,
+    'clusteredIndex': dict, 'validator': dict, 'validationLevel': str, 'validationAction': str,
+    'collation': dict, 'storageEngine': dict, 'indexOptionDefaults': dict, 'viewOn': str, 'pipeline': list,
+    'changeStreamPreAndPostImages': dict, 'comment': str,
+}
+TIMESERIES_OPTIONS = ('timeField', 'metaField', 'granularity', 'bucketMaxSpanSeconds', 'bucketRoundingSeconds')
+
+def _timeseries_problem(timeseries):
+    unknown = [name for name in timeseries if name not in TIMESERIES_OPTIONS]
+    if unknown:
+        return f"Unknown timeseries option '{unknown[0]}'. Known options: {', '.join(TIMESERIES_OPTIONS)}"
+    if not isinstance(timeseries.get('timeField'), str):
+        return "timeseries needs a timeField string"
+    if 'granularity' in timeseries and timeseries['granularity'] not in ('seconds', 'minutes', 'hours'):
+        return "timeseries granularity must be 'seconds', 'minutes' or 'hours'"
+    buckets = [name for name in ('bucketMaxSpanSeconds', 'bucketRoundingSeconds') if name in timeseries]
+    if buckets and 'granularity' in timeseries:
+        return "timeseries granularity cannot be combined with bucketMaxSpanSeconds/bucketRoundingSeconds"
+    if len(buckets) == 1 or (buckets and timeseries['bucketMaxSpanSeconds'] != timeseries['bucketRoundingSeconds']):
+        return "timeseries bucketMaxSpanSeconds and bucketRoundingSeconds must be set together and be equal"
+
+def _collection_option_problem(options):
+    """Why MongoDB rejects the createCollection option combination, or None."""
+    if options.get('capped'):
+        if 'size' not in options:
+            return "capped collections need a size"
+        if 'timeseries' in options or 'clusteredIndex' in options:
+            return "capped collections cannot be time-series or clustered"
+    elif 'size' in options or 'max' in options:
+        return "size and max only apply to capped collections"
+    if 'timeseries' in options:
+        if 'clusteredIndex' in options:
+            return "timeseries and clusteredIndex cannot be combined"
+        problem = _timeseries_problem(options['timeseries'])
+        if problem:
+            return problem
+    if 'clusteredIndex' in options:
+        clustered = options['clusteredIndex']
+        if clustered.get('key') != {'_id': 1} or clustered.get('unique') is not True:
+            return "clusteredIndex needs key: { _id: 1 } and unique: true"
+    if 'expireAfterSeconds' in options:
+        if 'timeseries' not in options and 'clusteredIndex' not in options:
+            return "expireAfterSeconds on a collection needs timeseries or clusteredIndex"
+        if options['expireAfterSeconds'] < 0:
+            return "expireAfterSeconds must not be negative"
+    if options.get('validationLevel', 'strict') not in ('off', 'strict', 'moderate'):
+        return "validationLevel must be 'off', 'strict' or 'moderate'"
+    if options.get('validationAction', 'error') not in ('error', 'warn'):
+        return "validationAction must be 'error' or 'warn'"
+    if 'collation' in options and 'locale' not in options['collation']:
+        return "collation needs a locale"
+    if 'pipeline' in options and 'viewOn' not in options:
+        return "pipeline needs viewOn (it defines a view)"
+
+def _check_collection_options(operation, field):
+    if not operation.get(field):
+        return None
+    try:
+        options = _parse_options(operation[field], COLLECTION_OPTIONS, 'createCollection')
+    except ValueError as e:
+        return str(e)
+    return _collection_option_problem(options)
+
+# Stages an update pipeline may use (MongoDB 4.2+)
+PIPELINE_UPDATE_STAGES = ('$addFields', '$set', '$project', '$unset', '$replaceRoot', '$replaceWith')
+
+def _pipeline_stages(pipeline_text):
+    """(stage name, argument text) per stage; raises ValueError for anything but one-stage objects."""
+    from .shell_literal import split_literal
+    stages = []
+    for stage_text in split_literal(pipeline_text):
+        stage = split_literal(stage_text) if stage_text.strip().startswith('{') else None
+        if not stage or len(stage) != 1 or not isinstance(stage[0], tuple):
+            raise ValueError(f"stage {len(stages) + 1} must be an object with exactly one stage")
+        stages.append(stage[0])
+    return stages
+
+def _check_pipeline_update(operation, field):
+    text = (operation.get(field) or '').strip()
+    if not text.startswith('['):
+        return None
+    if operation['type'] == 'replaceOne':
+        return "replaceOne needs a replacement document, not an update pipeline"
+    try:
+        stages = _pipeline_stages(text)
+    except ValueError as e:
+        return f"The update pipeline could not be parsed: {e}"
+    if not stages:
+        return "The update pipeline is empty"
+    for number, (name, _) in enumerate(stages, 1):
+        if name not in PIPELINE_UPDATE_STAGES:
+            return (f"Update pipeline stage {number} uses {name}; update pipelines only allow "
+                    f"{', '.join(PIPELINE_UPDATE_STAGES)}")
+
+# aggregate command options and the type of their value; the cursor is always requested
+AGGREGATE_OPTIONS = {
+    'allowDiskUse': bool, 'bypassDocumentValidation': bool, 'collation': dict, 'hint': (str, dict),
+    'comment': str, 'let': dict, 'maxTimeMS': int, 'writeConcern': dict, 'readConcern': dict, 'batchSize': int,
+}
+OUTPUT_STAGES = ('$merge', '$out')
+
+
+def aggregate_output(pipeline_text):
+    """Collection a $merge/$out pipeline writes to (in the same database), or None."""
+    try:
+        stages = _pipeline_stages(pipeline_text)
+    except ValueError:
+        return None
+    if not stages or stages[-1][0] not in OUTPUT_STAGES:
+        return None
+    name, argument = stages[-1]
+    from .shell_literal import parse_shell_literal
+    try:
+        target = parse_shell_literal(argument)
+    except ValueError:
+        return None
+    if name == '$merge' and isinstance(target, dict):
+        target = target.get('into')
+    if isinstance(target, dict):
+        target = target.get('coll')
+    return target if isinstance(target, str) else None
+
+def _check_aggregate_output(operation, field):
+    try:
+        stages = _pipeline_stages(operation.get(field) or '[]')
+    except ValueError as e:
+        return f"The aggregate pipeline could not be parsed: {e}"
+    if not stages or stages[-1][0] not in OUTPUT_STAGES:
+        return "aggregate() is only supported when the pipeline ends in $merge or $out (read-only pipelines change nothing)"
+    if any(name in OUTPUT_STAGES for name, _ in stages[:-1]):
+        return "$merge and $out must be the last stage of the pipeline"
+    if aggregate_output(operation[field]) is None:
+        return f"{stages[-1][0]} needs a target collection (a name, {{ db, coll }} or, for $merge, {{ into: ... }})"
+    if not operation.get('options'):
+        return None
+    try:
+        options = _parse_options(operation['options'], AGGREGATE_OPTIONS, 'aggregate')
+    except ValueError as e:
+        return str(e)
+    if 'collation' in options and 'locale' not in options['collation']:
+        return "collation needs a locale"
+
+# update/delete/findAndModify options and the type of their value, per operation type
+_WRITE_COMMON = {'hint': (str, dict), 'collation': dict, 'writeConcern': dict, 'comment': str, 'let': dict}
+UPDATE_OPTIONS = dict(_WRITE_COMMON, upsert=bool, arrayFilters=list, ordered=bool, bypassDocumentValidation=bool)
+REPLACE_OPTIONS = dict(_WRITE_COMMON, upsert=bool, bypassDocumentValidation=bool)
+DELETE_OPTIONS = dict(_WRITE_COMMON, ordered=bool)
+WRITE_OPTIONS = {'updateOne': UPDATE_OPTIONS, 'updateMany': UPDATE_OPTIONS, 'replaceOne': REPLACE_OPTIONS,
+                 'deleteOne': DELETE_OPTIONS, 'deleteMany': DELETE_OPTIONS, 'remove': DELETE_OPTIONS}
+WRITE_CONCERN_FIELDS = ('w', 'j', 'wtimeout')
+ARRAY_FILTER_IDENTIFIER_RE = re.compile(r'\$\[([a-z][a-zA-Z0-9]*)\]')
+
+def _write_option_problem(operation, options):
+    """Why the update/delete option combination is rejected by MongoDB, or None."""
+    unknown = [name for name in options.get('writeConcern', {}) if name not in WRITE_CONCERN_FIELDS]
+    if unknown:
+        return f"Unknown writeConcern field '{unknown[0]}'. Known fields: {', '.join(WRITE_CONCERN_FIELDS)}"
+    if 'collation' in options and 'locale' not in options['collation']:
+        return "collation needs a locale"
+    if 'arrayFilters' in options:
+        if (operation.get('update') or '').strip().startswith('['):
+            return "arrayFilters cannot be used with an update pipeline"
+        if not options['arrayFilters'] or not all(isinstance(entry, dict) and entry for entry in options['arrayFilters']):
+            return "arrayFilters must be a non-empty array of filter objects"
+        used = set(ARRAY_FILTER_IDENTIFIER_RE.findall(operation.get('update') or ''))
+        declared = {name.split('.')[0] for entry in options['arrayFilters'] for name in entry}
+        if declared - used:
+            return f"arrayFilters declares {', '.join(sorted(declared - used))} but the update uses no matching $[<identifier>]"
+        if used - declared:
+            return f"The update uses $[{sorted(used - declared)[0]}] but arrayFilters does not declare it"
+
+def _check_write_options(operation, field):
+    if not operation.get(field):
+        return None
+    try:
+        options = _parse_options(operation[field], WRITE_OPTIONS[operation['type']], operation['type'])
+    except ValueError as e:
+        return str(e)
+    return _write_option_problem(operation, options)
+
+BULK_OPTION_TYPES = {'ordered': bool, 'writeConcern': dict, 'comment': str, 'bypassDocumentValidation': bool, 'let': dict}
+
+def _bulk_request_problem(request):
+    from .shell_literal import split_literal
+    update = (request.get('update') or '').strip()
+    if request['type'] == 'replaceOne':
+        if update.startswith('[') or any(key.startswith('$') for key, _ in split_literal(update)):
+            return "replacement must be a plain document without update operators"
+    elif 'update' in request:
+        if update.startswith('['):
+            return _check_pipeline_update(request, 'update')
+        if not all(key.startswith('$') for key, _ in split_literal(update)):
+            return "update needs update operators ($set, ...) or a pipeline; use replaceOne to replace documents"
+    if request.get('options'):
+        options = _parse_options(request['options'], WRITE_OPTIONS[request['type']], request['type'])
+        return _write_option_problem(request, options)
+
+def _check_bulk_write(operation, field):
+    from .bulkwrite import bulk_requests
+    try:
+        requests = bulk_requests(operation)
+        if not requests:
+            return "bulkWrite needs at least one request"
+        for request in requests:
+            problem = _bulk_request_problem(request)
+            if problem:
+                return f"bulkWrite request {request['request']} ({request['type']}): {problem}"
+        if operation.get('options'):
+            options = _parse_options(operation['options'], BULK_OPTION_TYPES, 'bulkWrite')
+            unknown = [name for name in options.get('writeConcern', {}) if name not in WRITE_CONCERN_FIELDS]
+            if unknown:
+                return f"Unknown writeConcern field '{unknown[0]}'. Known fields: {', '.join(WRITE_CONCERN_FIELDS)}"
+    except ValueError as e:
+        return str(e)
+
+def _check_unindexed_filter(operation, field, catalog):
+    if field in operation:
+        from .indexes import unindexed_filter_message
+        return unindexed_filter_message(catalog, operation, field)
+
+def _header_field_check(field):
+    pattern = re.compile(rf'//\s*@?{field}\s*:', re.IGNORECASE)
+    def check(text):
+        if not pattern.search(text):
+            return f"Missing recommended header field: @{field}"
+    return check
+
+def _unsupported_check(pattern, message):
+    compiled = re.compile(pattern)
+    def check(text):
+        if compiled.search(text):
+            return f"Unsupported operation: {message}"
+    return check
+
+VALIDATION_RULES = [
+    # Structural checks; 'stop' skips the remaining rules for the operation
+    {'name': 'collection-required', 'scope': 'operation', 'op_types': None, 'fields': ['collection'],
+     'severity': 'error', 'stop': True, 'check': _check_missing_collection},
+    {'name': 'collection-name-format', 'scope': 'operation', 'op_types': None, 'fields': ['collection'],
+     'severity': 'error', 'check': _check_collection_name},
+    {'name': 'type-required', 'scope': 'operation', 'op_types': None, 'fields': ['type'],
+     'severity': 'error', 'stop': True, 'check': _check_missing_type},
+    {'name': 'documents-required', 'scope': 'operation', 'op_types': INSERT_TYPES, 'fields': ['documents'],
+     'severity': 'error', 'check': _check_required_field('documents')},
+    {'name': 'filter-required', 'scope': 'operation', 'op_types': UPDATE_TYPES + DELETE_TYPES, 'fields': ['filter'],
+     'severity': 'error', 'check': _check_required_field('filter')},
+    {'name': 'update-required', 'scope': 'operation', 'op_types': UPDATE_TYPES, 'fields': ['update'],
+     'severity': 'error', 'check': _check_required_field('update document')},
+
+    # Content checks
+    {'name': 'new-date', 'scope': 'operation', 'op_types': INSERT_TYPES, 'fields': ['documents'],
+     'severity': 'warning', 'check': _check_new_date},
+    {'name': 'single-quoted-keys', 'scope': 'operation', 'op_types': INSERT_TYPES, 'fields': ['documents'],
+     'severity': 'warning', 'check': _check_single_quoted_keys},
+    {'name': 'js-function', 'scope': 'operation', 'op_types': None, 'fields': ['documents', 'filter', 'update', 'pipeline', 'requests'],
+     'severity': 'error', 'check': _check_js_function},
+    {'name': 'unsafe-operator', 'scope': 'operation', 'op_types': None, 'fields': ['documents', 'filter', 'update', 'pipeline', 'requests'],
+     'severity': 'warning', 'check': _check_unsafe},
+    {'name': 'index-options', 'scope': 'operation', 'op_types': ['createIndex'], 'fields': ['options'],
+     'severity': 'error', 'check': _check_index_options},
+    {'name': 'collection-options', 'scope': 'operation', 'op_types': ['createCollection'], 'fields': ['options'],
+     'severity': 'error', 'check': _check_collection_options},
+    {'name': 'bulk-write', 'scope': 'operation', 'op_types': ['bulkWrite'], 'fields': ['requests'],
+     'severity': 'error', 'check': _check_bulk_write},
+    {'name': 'aggregate-output', 'scope': 'operation', 'op_types': ['aggregate'], 'fields': ['pipeline'],
+     'severity': 'error', 'check': _check_aggregate_output},
+    {'name': 'pipeline-update', 'scope': 'operation', 'op_types': UPDATE_TYPES, 'fields': ['update'],
+     'severity': 'error', 'check': _check_pipeline_update},
+    {'name': 'write-options', 'scope': 'operation', 'op_types': UPDATE_TYPES + DELETE_TYPES, 'fields': ['options'],
+     'severity': 'error', 'check': _check_write_options},
+    # Runs only when an index catalog is passed to build_rule_config
+    {'name': 'unindexed-filter', 'scope': 'operation', 'op_types': UPDATE_TYPES + DELETE_TYPES, 'fields': ['filter'],
+     'severity': 'warning', 'requires': 'index_catalog', 'check': _check_unindexed_filter},
+
+    # File header
+    {'name': 'header-context', 'scope': 'header', 'severity': 'warning', 'check': _header_field_check('context')},
+    {'name': 'header-author', 'scope': 'header', 'severity': 'warning', 'check': _header_field_check('author')},
+    {'name': 'header-description', 'scope': 'header', 'severity': 'warning', 'check': _header_field_check('description')},
+    {'name': 'header-version', 'scope': 'header', 'severity': 'warning', 'check': _header_field_check('version')},
+
+    # Unsupported syntax anywhere in the comment-stripped source
+    {'name': 'dot-collection-access', 'scope': 'source', 'severity': 'error',
+     'check': _unsupported_check(r'db\.[a-zA-Z_][a-zA-Z0-9_]*\.(?!drop\(\))', "Use db.getCollection('name') instead of db.collection")},
+    {'name': 'unsupported-find', 'scope': 'source', 'severity': 'error',
+     'check': _unsupported_check(r'\.find\s*\(', "find() operations not supported in Liquibase")},
+    {'name': 'unsupported-aggregate', 'scope': 'source', 'severity': 'error',
+     'check': _unsupported_check(r'\.aggregate\s*\((?!\s*\[)', "aggregate() needs the pipeline written out as an array literal")},
+    {'name': 'unsupported-mapreduce', 'scope': 'source', 'severity': 'error',
+     'check': _unsupported_check(r'\.mapReduce\s*\(', "mapReduce() operations not supported in Liquibase")},
+    {'name': 'unsupported-distinct', 'scope': 'source', 'severity': 'error',
+     'check': _unsupported_check(r'\.distinct\s*\(', "distinct() operations not supported in Liquibase")},
+]
+
+RULES_BY_NAME = {rule['name']: rule for rule in VALIDATION_RULES}
+
+def _select_op_rules(operation_rules, op_type):
+    return [(rule, severity) for rule, severity in operation_rules
+            if rule['op_types'] is None or op_type in rule['op_types']]
+
+def build_rule_config(disabled=None, severities=None, index_catalog=None):
+    """Build the per-run rule configuration, rejecting unknown rule names.
+
+    Rules that need an index catalog are enabled only when one is given.
+    """
+    disabled = set(disabled or [])
+    severities = dict(severities or {})
+    for name in list(disabled) + list(severities):
+        if name not in RULES_BY_NAME:
+            raise ValueError(f"Unknown validation rule: '{name}'. Run 'liquibase-mongo --help' to see available rules.")
+    for name, severity in severities.items():
+        if severity not in ('error', 'warning'):
+            raise ValueError(f"Invalid severity '{severity}' for rule '{name}'. Use 'error' or 'warning'.")
+
+    # Resolve enabled rules per scope once so the per-operation loop stays cheap
+    scopes = {'operation': [], 'header': [], 'source': []}
+    for rule in VALIDATION_RULES:
+        if rule['name'] in disabled:
+            continue
+        if rule.get('requires') == 'index_catalog':
+            if index_catalog is None:
+                continue
+            rule = dict(rule, check=partial(rule['check'], catalog=index_catalog))
+        scopes[rule['scope']].append((rule, severities.get(rule['name'], rule['severity'])))
+    # Resolve operation rules per op type up front; configs are never mutated after this,
+    # so one config can be shared by concurrent conversions
+    op_rules = {op_type: _select_op_rules(scopes['operation'], op_type) for op_type in OPERATION_TYPES}
+    return {'disabled': disabled, 'severities': severities, 'scopes': scopes, 'op_rules': op_rules, 'index_catalog': index_catalog}
+
+DEFAULT_RULE_CONFIG = build_rule_config()
+
+def _record_timing(timings, name, elapsed):
+    if timings is not None:
+        entry = timings.setdefault(name, {'calls': 0, 'seconds': 0.0})
+        entry['calls'] += 1
+        entry['seconds'] += elapsed
+
+def _rules_for_op_type(rule_config, op_type):
+    """Return the enabled operation rules applying to op_type."""
+    rules = rule_config['op_rules'].get(op_type)
+    if rules is None:
+        rules = _select_op_rules(rule_config['scopes']['operation'], op_type)
+    return rules
+
+def run_operation_rules(operation, rule_config=None, timings=None):
+    """Run every enabled operation rule against one parsed operation."""
+    rule_config = rule_config or DEFAULT_RULE_CONFIG
+    errors = []
+    warnings = []
+
+    for rule, severity in _rules_for_op_type(rule_config, operation.get('type', '')):
+        start = time.perf_counter()
+        messages = [m for m in (rule['check'](operation, field) for field in rule['fields']) if m]
+        _record_timing(timings, rule['name'], time.perf_counter() - start)
+
+        (errors if severity == 'error' else warnings).extend(messages)
+        if messages and rule.get('stop'):
+            break
+
+    return errors, warnings
+
+def run_text_rules(scope, text, rule_config=None, timings=None):
+    """Run every enabled header or source rule against a block of text."""
+    rule_config = rule_config or DEFAULT_RULE_CONFIG
+    errors = []
+    warnings = []
+
+    for rule, severity in rule_config['scopes'][scope]:
+        start = time.perf_counter()
+        message = rule['check'](text)
+        _record_timing(timings, rule['name'], time.perf_counter() - start)
+
+        if message:
+            (errors if severity == 'error' else warnings).append(message)
+
+    return errors, warnings
+
+def file_header(content, max_lines=HEADER_LINES):
+    """Return the first max_lines lines of content without splitting the whole file."""
+    end = -1
+    for _ in range(max_lines):
+        end = content.find('\n', end + 1)
+        if end == -1:
+            return content
+    return content[:end]
+
+def validate_query_syntax(operation, rule_config=None, timings=None):
+    """Validate individual query syntax and structure."""
+    return run_operation_rules(operation, rule_config, timings)
+
+def validate_file_header(content, rule_config=None, timings=None):
+    """Validate that the file follows the template structure."""
+    return run_text_rules('header', file_header(content), rule_config, timings)
+
+def generate_rule_timing_report(timings):
+    """Generate a per-rule timing table, slowest rule first."""
+    report = []
+    report.append("⏱️ VALIDATION RULE TIMINGS")
+    report.append("=" * 50)
+    for name, entry in sorted(timings.items(), key=lambda item: item[1]['seconds'], reverse=True):
+        report.append(f"{entry['seconds'] * 1000:10.3f} ms  {entry['calls']:>8} calls  {name}")
+    report.append("")
+    return "\n".join(report)
+
+def generate_rule_list():
+    """Generate a listing of the registered validation rules."""
+    report = []
+    for rule in VALIDATION_RULES:
+        applies_to = ', '.join(rule['op_types']) if rule.get('op_types') else 'all'
+        target = f"{rule['scope']}" if rule['scope'] != 'operation' else f"operation [{applies_to}] fields: {', '.join(rule['fields'])}"
+        requires = " (needs --index-catalog)" if rule.get('requires') == 'index_catalog' else ""
+        report.append(f"{rule['name']:<24} {rule['severity']:<8} {target}{requires}")
+    return "\n".join(report)
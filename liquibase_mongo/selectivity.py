@@ -0,0 +1,141 @@
+"""Estimate how many documents each update/delete touches from offline samples.
+
+A samples directory holds one ``{collection}.ndjson`` file per collection
+(``mongoexport`` output works as is) or ``{collection}.bson`` (``mongodump``
+output, read with pymongo's ``bson`` package) and optionally ``counts.json``
+with the real document count of each collection. Each filter is run over the
+sample with the built-in matcher and the matched fraction is scaled to the count.
+"""
+import os
+import json
+import itertools
+from datetime import datetime, timezone
+
+from .matcher import ObjectId, UnsupportedQuery, compile_filter, extended_json_hook
+from .shell_literal import parse_shell_literal
+
+AFFECTING_TYPES = ['updateOne', 'updateMany', 'replaceOne', 'deleteOne', 'deleteMany', 'remove']
+SINGLE_DOCUMENT_TYPES = ('updateOne', 'replaceOne', 'deleteOne')
+DEFAULT_SAMPLE_LIMIT = 100000
+
+def _from_bson(value, bson):
+    if isinstance(value, bson.ObjectId):
+        return ObjectId(str(value))
+    if isinstance(value, bson.Decimal128):
+        return value.to_decimal()
+    if isinstance(value, datetime) and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    if isinstance(value, dict):
+        return {key: _from_bson(item, bson) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_from_bson(item, bson) for item in value]
+    return value
+
+def _read_bson(path):
+    try:
+        import bson
+    except ImportError:
+        raise ImportError(f"Reading {path} needs the bson package from pymongo (pip install pymongo)")
+    with open(path, 'rb') as file:
+        for document in bson.decode_file_iter(file):
+            yield _from_bson(document, bson)
+
+EXTENDED_JSON_DECODER = json.JSONDecoder(object_hook=extended_json_hook)
+
+def _read_ndjson(path):
+    with open(path, 'r', encoding='utf-8') as file:
+        for line in file:
+            if line.strip():
+                yield EXTENDED_JSON_DECODER.decode(line)
+
+def iter_sample_documents(directory, collection):
+    """Documents of {collection}.ndjson or {collection}.bson in directory, or None when neither exists."""
+    path = os.path.join(directory, collection)
+    if os.path.exists(path + '.ndjson'):
+        return _read_ndjson(path + '.ndjson')
+    if os.path.exists(path + '.bson'):
+        return _read_bson(path + '.bson')
+    return None
+
+class SampleSet:
+    """Sampled documents per collection, loaded on first use."""
+
+    def __init__(self, directory, limit=DEFAULT_SAMPLE_LIMIT):
+        self.directory = directory
+        self.limit = limit
+        self.samples = {}
+        counts_path = os.path.join(directory, 'counts.json')
+        self.counts = {}
+        if os.path.exists(counts_path):
+            with open(counts_path, 'r', encoding='utf-8') as file:
+                self.counts = json.load(file)
+
+    def documents(self, collection):
+        """The sample for a collection (up to limit documents), or None when there is no sample file."""
+        if collection not in self.samples:
+            documents = iter_sample_documents(self.directory, collection)
+            self.samples[collection] = list(itertools.islice(documents, self.limit)) if documents is not None else None
+        return self.samples[collection]
+
+    def count(self, collection):
+        """Known document count of a collection; falls back to None."""
+        count = self.counts.get(collection)
+        return int(count) if count is not None else None
+
+def estimate_operation(operation, samples):
+    """Estimate for one operation as a dict, or None for operations that match no documents."""
+    if operation['type'] not in AFFECTING_TYPES:
+        return None
+    estimate = {'type': operation['type'], 'collection': operation['collection'], 'matched': None,
+                'sampled': 0, 'total': samples.count(operation['collection']), 'estimated': None, 'reason': None}
+    documents = samples.documents(operation['collection'])
+    if documents is None:
+        estimate['reason'] = f"no sample for '{operation['collection']}'"
+        return estimate
+    try:
+        predicate = compile_filter(parse_shell_literal(operation['filter']))
+    except UnsupportedQuery as e:
+        estimate['reason'] = f"filter not estimated: {e}"
+        return estimate
+    except ValueError as e:
+        estimate['reason'] = f"filter could not be parsed: {e}"
+        return estimate
+
+    matched = sum(1 for document in documents if predicate(document))
+    estimate.update(matched=matched, sampled=len(documents))
+    if operation['type'] in SINGLE_DOCUMENT_TYPES:
+        estimate['estimated'] = min(matched, 1)
+    elif estimate['total'] is not None and documents:
+        estimate['estimated'] = round(matched / len(documents) * estimate['total'])
+    return estimate
+
+def format_estimate(estimate):
+    where = f"{estimate['type']} on '{estimate['collection']}'"
+    if estimate['reason']:
+        return f"{where}: {estimate['reason']}"
+    sampled = estimate['sampled']
+    share = f" ({estimate['matched'] / sampled:.2%})" if sampled else ""
+    text = f"{where} matches {estimate['matched']:,} of {sampled:,} sampled documents{share}"
+    if estimate['type'] in SINGLE_DOCUMENT_TYPES:
+        return text + f"; touches {estimate['estimated']} document"
+    if estimate['estimated'] is None:
+        return text + f"; no document count known for '{estimate['collection']}'"
+    return text + f"; about {estimate['estimated']:,} of {estimate['total']:,} documents"
+
+def estimate_operations(operations, samples):
+    """estimate_operation for each operation, in order."""
+    return [estimate_operation(operation, samples) for operation in operations]
+
+def estimate_notes(operations, estimates, max_affected=None):
+    """Report notes for every update/delete, plus warnings for those above max_affected documents."""
+    notes = []
+    warnings = []
+    for number, (operation, estimate) in enumerate(zip(operations, estimates), 1):
+        if estimate is None:
+            continue
+        prefix = f"Operation {number} (line {operation.get('line_number')})"
+        notes.append(f"{prefix}: {format_estimate(estimate)}")
+        if max_affected is not None and estimate['estimated'] is not None and estimate['estimated'] > max_affected:
+            warnings.append(f"{prefix}: {operation['type']} on '{operation['collection']}' would touch about "
+                            f"{estimate['estimated']:,} documents (limit {max_affected:,})")
+    return notes, warnings
@@ -0,0 +1,268 @@
+"""Local HTTP/JSON conversion service (``liquibase-mongo serve``).
+
+Endpoints:
+    POST /convert  {"source", "version", "author", "context"?, "disabled_rules"?,
+                    "rule_severities"?, "fail_on_warnings"?}
+    POST /lint     {"source", "disabled_rules"?, "rule_severities"?, "fail_on_warnings"?}
+    GET  /metrics  request counts, cache hits, queue depth, p50/p99 latency
+
+Conversions run in a bounded process pool. Requests beyond the pool size
+wait in a bounded queue and get 503 once it is full. Responses are cached
+by a hash of the endpoint and request body, so re-validating an unchanged
+snippet never reaches the pool.
+"""
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .api import convert
+from .parser import extract_mongodb_operations_robust
+from .rules import build_rule_config
+
+MAX_BODY_BYTES = 10 * 1024 * 1024
+LATENCY_WINDOW = 2048
+
+@lru_cache(maxsize=64)
+def _cached_rule_config(disabled, severities):
+    return build_rule_config(list(disabled), dict(severities))
+
+def _rule_config_from_payload(payload):
+    return _cached_rule_config(
+        tuple(sorted(payload.get('disabled_rules') or [])),
+        tuple(sorted((payload.get('rule_severities') or {}).items())),
+    )
+
+def _payload_problem(payload):
+    """Why the optional rule fields of a request cannot be used, or None."""
+    disabled = payload.get('disabled_rules') or []
+    if not isinstance(disabled, list) or not all(isinstance(name, str) for name in disabled):
+        return "disabled_rules must be a list of rule names"
+    severities = payload.get('rule_severities') or {}
+    if not isinstance(severities, dict) or not all(isinstance(level, str) for level in severities.values()):
+        return "rule_severities must be an object mapping rule names to 'error' or 'warning'"
+    return None
+
+def summarize_operations(operations):
+    """Keep what a client needs to locate each operation."""
+    return [
+        {'type': op['type'], 'collection': op['collection'], 'line_number': op['line_number']}
+        for op in operations
+    ]
+
+def convert_job(payload):
+    """Worker-side /convert; returns a JSON-ready dict."""
+    result = convert(
+        payload['source'],
+        version=payload['version'],
+        author=payload['author'],
+        context=payload.get('context'),
+        rule_config=_rule_config_from_payload(payload),
+        fail_on_warnings=bool(payload.get('fail_on_warnings')),
+    )
+    return {
+        'ok': result.ok and result.xml is not None,
+        'context': result.context,
+        'operations': summarize_operations(result.operations),
+        'errors': result.errors,
+        'warnings': result.warnings,
+        'xml': result.xml,
+    }
+
+def lint_job(payload):
+    """Worker-side /lint; returns a JSON-ready dict."""
+    operations, errors, warnings = extract_mongodb_operations_robust(
+        payload['source'], _rule_config_from_payload(payload))
+    return {
+        'ok': not errors and not (payload.get('fail_on_warnings') and warnings),
+        'operations': summarize_operations(operations),
+        'errors': errors,
+        'warnings': warnings,
+    }
+
+JOBS = {
+    '/convert': (convert_job, ('source', 'version', 'author')),
+    '/lint': (lint_job, ('source',)),
+}
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+class ConversionService:
+    """Process pool, admission control, response cache and latency metrics."""
+
+    def __init__(self, workers, queue_size, cache_size):
+        self.pool = ProcessPoolExecutor(max_workers=workers)
+        self.workers = workers
+        self.queue_size = queue_size
+        self.slots = threading.BoundedSemaphore(workers + queue_size)
+        self.cache = OrderedDict()
+        self.cache_size = cache_size
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.counters = {'requests': 0, 'cache_hits': 0, 'rejected': 0, 'failed': 0}
+        self.latencies = {path: deque(maxlen=LATENCY_WINDOW) for path in JOBS}
+
+    def submit(self, path, body):
+        """Return (status, response dict) for a POST to one of JOBS."""
+        job, required = JOBS[path]
+        key = hashlib.sha256(path.encode() + b'\0' + body).hexdigest()
+        with self.lock:
+            self.counters['requests'] += 1
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.cache.move_to_end(key)
+                self.counters['cache_hits'] += 1
+                return 200, cached
+
+        try:
+            payload = json.loads(body)
+        except ValueError as e:
+            return 400, {'error': f"Invalid JSON: {e}"}
+        if not isinstance(payload, dict):
+            return 400, {'error': "Request body must be a JSON object"}
+        problem = _payload_problem(payload)
+        if problem:
+            return 400, {'error': problem}
+        missing = [name for name in required if not isinstance(payload.get(name), str)]
+        if missing:
+            return 400, {'error': f"Missing string field(s): {', '.join(missing)}"}
+
+        if not self.slots.acquire(blocking=False):
+            with self.lock:
+                self.counters['rejected'] += 1
+            return 503, {'error': f"Server busy: {self.workers} workers and {self.queue_size} queued requests"}
+        try:
+            with self.lock:
+                self.in_flight += 1
+            response = self.pool.submit(job, payload).result()
+        except ValueError as e:
+            return 400, {'error': str(e)}
+        except Exception as e:
+            with self.lock:
+                self.counters['failed'] += 1
+            return 500, {'error': str(e)}
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+            self.slots.release()
+
+        with self.lock:
+            self.cache[key] = response
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return 200, response
+
+    def record_latency(self, path, seconds):
+        with self.lock:
+            self.latencies[path].append(seconds * 1000)
+
+    def metrics(self):
+        with self.lock:
+            endpoints = {}
+            for path, window in self.latencies.items():
+                values = sorted(window)
+                endpoints[path] = {
+                    'samples': len(values),
+                    'p50_ms': round(percentile(values, 50), 3),
+                    'p99_ms': round(percentile(values, 99), 3),
+                }
+            return {
+                **self.counters,
+                'in_flight': self.in_flight,
+                'queued': max(0, self.in_flight - self.workers),
+                'workers': self.workers,
+                'queue_size': self.queue_size,
+                'cache_entries': len(self.cache),
+                'endpoints': endpoints,
+            }
+
+    def shutdown(self):
+        self.pool.shutdown(cancel_futures=True)
+
+class ConversionHandler(BaseHTTPRequestHandler):
+    service = None
+    protocol_version = "HTTP/1.1"
+
+    def _send_json(self, status, data):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        if status == 503:
+            self.send_header('Retry-After', '1')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/metrics':
+            self._send_json(200, self.service.metrics())
+        else:
+            self._send_json(404, {'error': f"Unknown endpoint: {self.path}"})
+
+    def do_POST(self):
+        start = time.perf_counter()
+        if self.path not in JOBS:
+            self._send_json(404, {'error': f"Unknown endpoint: {self.path}"})
+            return
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            # The body cannot be delimited, so the connection cannot be reused either
+            self.close_connection = True
+            self._send_json(400, {'error': "Content-Length must be a non-negative integer"})
+            return
+        if length > MAX_BODY_BYTES:
+            self.close_connection = True
+            self._send_json(413, {'error': f"Request body exceeds {MAX_BODY_BYTES} bytes"})
+            return
+        status, response = self.service.submit(self.path, self.rfile.read(length))
+        self._send_json(status, response)
+        self.service.record_latency(self.path, time.perf_counter() - start)
+
+    def log_message(self, format, *args):
+        pass
+
+def create_server(host, port, workers, queue_size, cache_size):
+    """Build a ThreadingHTTPServer bound to a fresh ConversionService."""
+    service = ConversionService(workers, queue_size, cache_size)
+    handler = type('BoundConversionHandler', (ConversionHandler,), {'service': service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server, service
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="liquibase-mongo serve", description="Serve /convert, /lint and /metrics over HTTP/JSON.")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to bind (default: 127.0.0.1).")
+    parser.add_argument("--port", type=int, default=8765, help="Port to bind (default: 8765).")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="Worker processes (default: CPU count).")
+    parser.add_argument("--queue-size", type=int, default=64, help="Requests allowed to wait for a worker before 503 (default: 64).")
+    parser.add_argument("--cache-size", type=int, default=1024, help="Cached responses kept (default: 1024).")
+    args = parser.parse_args(argv)
+
+    server, service = create_server(args.host, args.port, args.workers, args.queue_size, args.cache_size)
+    print(f"🌐 Serving on http://{args.host}:{server.server_port} with {args.workers} workers; Ctrl+C to stop")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("👋 Shutting down.")
+    finally:
+        server.server_close()
+        service.shutdown()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
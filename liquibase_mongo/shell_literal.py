@@ -0,0 +1,205 @@
+"""Parse MongoDB shell literals ({a: 1, 'b': ISODate("...")}) into Python values.
+
+Objects become dicts, arrays lists, and constructor calls such as
+``ISODate("2023-01-01")``, ``new Date()`` or ``ObjectId("...")`` become
+``ShellCall(name, args)``. Unquoted and single-quoted keys, trailing commas
+and ``/regex/flags`` literals are accepted. ``canonical_json`` renders a
+parsed value with sorted keys so equal literals compare equal as strings.
+"""
+import re
+import json
+from collections import namedtuple
+
+ShellCall = namedtuple('ShellCall', ['name', 'args'])
+ShellRegex = namedtuple('ShellRegex', ['pattern', 'flags'])
+
+TOKEN_RE = re.compile(r'''
+    (?P<space>\s+)
+  | (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+  | (?P<number>-?(?:0[xX][0-9a-fA-F]+|(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?))
+  | (?P<regex>/(?![/*])(?:[^/\\\n]|\\.)+/[a-z]*)
+  | (?P<name>[A-Za-z_$][\w$.]*)
+  | (?P<punct>[{}\[\](),:])
+''', re.VERBOSE | re.DOTALL)
+
+# What split_literal needs to see: strings and regexes (which may contain brackets) and structure
+STRUCTURE_RE = re.compile(r'''"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*'|/(?![/*])(?:[^/\\\n]|\\.)+/[a-z]*|[{}\[\](),:]''', re.DOTALL)
+OPENERS = {'{', '[', '('}
+CLOSERS = {'}', ']', ')'}
+
+LITERAL_NAMES = {'true': True, 'false': False, 'null': None, 'undefined': None}
+
+# The shell treats Date and ISODate alike; normalize so both spellings hash the same
+CALL_ALIASES = {'Date': 'ISODate', 'new Date': 'ISODate', 'new ISODate': 'ISODate'}
+
+def _unquote(token):
+    if token[0] == '"':
+        return json.loads(token)
+    # Re-escape a single-quoted body for JSON: \' becomes ', a bare " becomes \", other escapes stay
+    body = re.sub(r'\\.|"', lambda m: "'" if m.group() == "\\'" else ('\\"' if m.group() == '"' else m.group()), token[1:-1])
+    return json.loads('"' + body + '"')
+
+def tokenize(text):
+    """Yield (kind, value) tokens, raising ValueError on anything unexpected."""
+    position = 0
+    while position < len(text):
+        match = TOKEN_RE.match(text, position)
+        if not match:
+            raise ValueError(f"Unexpected character {text[position]!r} at offset {position}")
+        position = match.end()
+        if match.lastgroup != 'space':
+            yield match.lastgroup, match.group()
+
+class _Parser:
+    def __init__(self, text):
+        self.tokens = list(tokenize(text))
+        self.index = 0
+
+    def peek(self):
+        return self.tokens[self.index] if self.index < len(self.tokens) else (None, None)
+
+    def take(self, value=None):
+        kind, token = self.peek()
+        if kind is None or (value is not None and token != value):
+            raise ValueError(f"Expected {value or 'a value'}, found {token or 'end of input'}")
+        self.index += 1
+        return kind, token
+
+    def value(self):
+        kind, token = self.take()
+        if kind == 'punct':
+            if token == '{':
+                return self.object()
+            if token == '[':
+                return self.array()
+            raise ValueError(f"Unexpected {token!r}")
+        if kind == 'string':
+            return _unquote(token)
+        if kind == 'number':
+            number = float(token) if any(c in token for c in '.eE') and not token.lower().startswith(('0x', '-0x')) else int(token, 0)
+            return int(number) if isinstance(number, float) and number.is_integer() else number
+        if kind == 'regex':
+            pattern, _, flags = token[1:].rpartition('/')
+            return ShellRegex(pattern, flags)
+        # name: a literal, a constructor call, or `new X(...)`
+        if token in LITERAL_NAMES:
+            return LITERAL_NAMES[token]
+        name = token
+        if name == 'new':
+            name = 'new ' + self.take()[1]
+        if self.peek() == ('punct', '('):
+            self.take('(')
+            args = self.sequence(')')
+            return ShellCall(CALL_ALIASES.get(name, name.replace('new ', '')), tuple(args))
+        raise ValueError(f"Unsupported identifier {token!r}")
+
+    def sequence(self, closer):
+        items = []
+        while self.peek() != ('punct', closer):
+            items.append(self.value())
+            if self.peek() == ('punct', ','):
+                self.take(',')
+            elif self.peek() != ('punct', closer):
+                raise ValueError(f"Expected ',' or {closer!r}, found {self.peek()[1] or 'end of input'}")
+        self.take(closer)
+        return items
+
+    def array(self):
+        return self.sequence(']')
+
+    def object(self):
+        result = {}
+        while self.peek() != ('punct', '}'):
+            kind, token = self.take()
+            if kind == 'string':
+                key = _unquote(token)
+            elif kind in ('name', 'number'):
+                key = token
+            else:
+                raise ValueError(f"Invalid object key {token!r}")
+            self.take(':')
+            result[key] = self.value()
+            if self.peek() == ('punct', ','):
+                self.take(',')
+            elif self.peek() != ('punct', '}'):
+                raise ValueError(f"Expected ',' or '}}', found {self.peek()[1] or 'end of input'}")
+        self.take('}')
+        return result
+
+def parse_shell_literal(text):
+    """Parse one shell literal; raises ValueError if text is not exactly one value."""
+    parser = _Parser(text)
+    value = parser.value()
+    if parser.index != len(parser.tokens):
+        raise ValueError(f"Unexpected trailing input: {parser.peek()[1]!r}")
+    return value
+
+def _member(text, start, end, key, is_object, members):
+    value = text[start:end].strip()
+    if is_object:
+        if key is None and value:
+            raise ValueError(f"Expected ':' after {value[:20]!r}")
+        if key is not None:
+            if not value:
+                raise ValueError(f"Missing value for key {key!r}")
+            members.append((key, value))
+    elif value:
+        members.append(value)
+
+def split_literal(text):
+    """Split an object or array literal into its members' source text, unparsed.
+
+    Objects give a list of (key, text) pairs, arrays a list of texts. Only
+    brackets, separators, strings and regex literals are looked at, so
+    splitting a large literal costs little more than one regex scan; raises
+    ValueError when text is not a single object or array.
+    """
+    text = text.strip()
+    if not text or text[0] not in '{[':
+        raise ValueError("Expected an object or array literal")
+    is_object = text[0] == '{'
+    members = []
+    depth = 0
+    start = 1
+    key = None
+    for match in STRUCTURE_RE.finditer(text):
+        token = match.group()
+        if token in OPENERS:
+            depth += 1
+        elif token in CLOSERS:
+            depth -= 1
+            if depth == 0:
+                _member(text, start, match.start(), key, is_object, members)
+                if text[match.end():].strip():
+                    raise ValueError(f"Unexpected trailing input: {text[match.end():].strip()[:20]!r}")
+                return members
+        elif depth != 1:
+            continue
+        elif token == ',':
+            _member(text, start, match.start(), key, is_object, members)
+            start = match.end()
+            key = None
+        elif token == ':' and is_object and key is None:
+            key = text[start:match.start()].strip()
+            if key[:1] in ('"', "'"):
+                key = _unquote(key)
+            elif not re.fullmatch(r'[\w$.]+', key):
+                raise ValueError(f"Invalid object key {key!r}")
+            start = match.end()
+    raise ValueError("Unterminated literal")
+
+def to_json_compatible(value):
+    """Replace ShellCall/ShellRegex with tagged dicts so the value can be JSON-encoded."""
+    if isinstance(value, ShellCall):
+        return {'$call': value.name, 'args': [to_json_compatible(arg) for arg in value.args]}
+    if isinstance(value, ShellRegex):
+        return {'$regex': value.pattern, '$options': value.flags}
+    if isinstance(value, dict):
+        return {key: to_json_compatible(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_json_compatible(item) for item in value]
+    return value
+
+def canonical_json(value):
+    """Compact JSON with sorted keys; equal literals give equal strings."""
+    return json.dumps(to_json_compatible(value), sort_keys=True, separators=(',', ':'), ensure_ascii=False)
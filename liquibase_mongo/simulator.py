@@ -0,0 +1,613 @@
+"""Dry-run changelogs against a local snapshot (``liquibase-mongo simulate``).
+
+The snapshot directory holds one ``{collection}.ndjson`` (``mongoexport``) or
+``{collection}.bson`` (``mongodump``) file per collection, plus the optional
+``{collection}.metadata.json`` that ``mongodump`` writes next to it with the
+collection's indexes. Collections are loaded into an in-process store the
+first time a changeset touches them; the changesets are then applied in order
+with the built-in matcher, the way ``/liquibase update`` would apply them.
+
+Equality lookups ({field: value}, ``$eq``, ``$in``) go through a hash index
+per field path, built on first use and kept up to date by every write, so
+updates and deletes by key stay fast on snapshots of millions of documents.
+The result is a diff per collection and the documents each changeset touched.
+Like Liquibase, the run stops at the first operation that would fail.
+"""
+import os
+import sys
+import json
+import argparse
+import itertools
+from decimal import Decimal
+from datetime import datetime, timezone
+
+from .bulkwrite import bulk_requests
+from .history import load_history
+from .indexes import parse_index_key, default_index_name
+from .generator import extract_index_name
+from .matcher import (ObjectId, UnsupportedQuery, compile_filter, equality_values, extended_json_hook,
+                      from_shell_value, path_values, value_key)
+from .selectivity import iter_sample_documents
+from .shell_literal import parse_shell_literal
+
+UPDATE_OPERATORS = ('$set', '$unset', '$inc', '$push', '$setOnInsert', '$currentDate')
+
+class SimulationError(Exception):
+    """The operation would fail on the server (duplicate key, $inc on a string, ...)."""
+
+def _parse(text, default=None):
+    if not text or not text.strip():
+        return default
+    return from_shell_value(parse_shell_literal(text))
+
+def _key_values(document, fields):
+    values = []
+    for field in fields:
+        found = path_values(document, field)
+        values.append(found[0] if found else None)
+    return values
+
+def _index_key(document, fields):
+    return tuple(value_key(value) for value in _key_values(document, fields))
+
+def _key_text(document, fields):
+    return '{ ' + ', '.join(f"{field}: {value!r}" for field, value in zip(fields, _key_values(document, fields))) + ' }'
+
+class Collection:
+    """Documents of one collection with their _id, hash and unique indexes."""
+
+    def __init__(self, name, documents=(), indexes=None):
+        self.name = name
+        self.documents = {}
+        self.ids = {}
+        self.hash_indexes = {}
+        self.indexes = {}
+        self.unique = {}
+        self.options = {}
+        self.sequence = itertools.count()
+        for document in documents:
+            self.insert(document)
+        for index_name, index in (indexes or {}).items():
+            self.create_index(index_name, index['key'], index['options'])
+
+    def __len__(self):
+        return len(self.documents)
+
+    def _hash_index(self, path):
+        index = self.hash_indexes.get(path)
+        if index is None:
+            index = self.hash_indexes[path] = {}
+            for number, document in self.documents.items():
+                for key in {value_key(value) for value in path_values(document, path)}:
+                    index.setdefault(key, set()).add(number)
+        return index
+
+    def _index_document(self, number, document, add):
+        for path, index in self.hash_indexes.items():
+            for key in {value_key(value) for value in path_values(document, path)}:
+                if add:
+                    index.setdefault(key, set()).add(number)
+                else:
+                    index[key].discard(number)
+        for index_name, entries in self.unique.items():
+            key = _index_key(document, self.indexes[index_name]['fields'])
+            if add:
+                if entries.get(key, number) != number:
+                    fields = self.indexes[index_name]['fields']
+                    raise SimulationError(f"E11000 duplicate key in {self.name}.{index_name}: {_key_text(document, fields)}")
+                entries[key] = number
+            elif entries.get(key) == number:
+                del entries[key]
+
+    def _store(self, number, document):
+        id_key = value_key(document['_id'])
+        if self.ids.get(id_key, number) != number:
+            raise SimulationError(f"E11000 duplicate key in {self.name}._id_: {document['_id']!r}")
+        try:
+            self._index_document(number, document, add=True)
+        except SimulationError:
+            self._index_document(number, document, add=False)
+            raise
+        self.ids[id_key] = number
+        self.documents[number] = document
+
+    def _remove(self, number):
+        document = self.documents.pop(number)
+        self.ids.pop(value_key(document['_id']), None)
+        self._index_document(number, document, add=False)
+        return document
+
+    def insert(self, document):
+        time_field = self.options.get('timeseries', {}).get('timeField')
+        if time_field and not isinstance(document.get(time_field), datetime):
+            raise SimulationError(f"Time-series collection {self.name} needs a date in '{time_field}': {document!r}")
+        if '_id' not in document:
+            document = dict(_id=ObjectId(f"{next(self.sequence):024x}"), **document)
+        self._store(next(self.sequence), document)
+        # Capped collections drop their oldest documents once max is reached
+        if self.options.get('capped') and self.options.get('max') and len(self.documents) > self.options['max']:
+            self._remove(min(self.documents))
+
+    def find(self, query, limit=None):
+        """Numbers of the documents matching a parsed filter, looked up by hash index where possible."""
+        predicate = compile_filter(query)
+        candidates = None
+        for path, condition in query.items():
+            if path.startswith('$'):
+                continue
+            values = equality_values(condition)
+            if values is None:
+                continue
+            index = self._hash_index(path)
+            numbers = set().union(*(index.get(value_key(value), ()) for value in values))
+            if candidates is None or len(numbers) < len(candidates):
+                candidates = numbers
+        numbers = sorted(candidates) if candidates is not None else list(self.documents)
+        found = []
+        for number in numbers:
+            if predicate(self.documents[number]):
+                found.append(number)
+                if limit is not None and len(found) >= limit:
+                    break
+        return found
+
+    def replace(self, number, document):
+        """Swap one document for its new version, keeping every index in step."""
+        old = self._remove(number)
+        try:
+            self._store(number, document)
+        except SimulationError:
+            self._store(number, old)
+            raise
+
+    def delete(self, number):
+        self._remove(number)
+
+    def create_index(self, name, key, options):
+        if name in self.indexes:
+            if self.indexes[name]['key'] != key:
+                raise SimulationError(f"Index {self.name}.{name} already exists with a different key")
+            return False
+        fields = [field for field, _ in key]
+        self.indexes[name] = {'key': key, 'fields': fields, 'options': options}
+        if options.get('unique'):
+            entries = self.unique[name] = {}
+            for number, document in self.documents.items():
+                index_key = _index_key(document, fields)
+                if index_key in entries:
+                    del self.indexes[name], self.unique[name]
+                    raise SimulationError(f"Cannot create unique index {self.name}.{name}: duplicate key {_key_text(document, fields)}")
+                entries[index_key] = number
+        return True
+
+    def drop_index(self, name):
+        if name not in self.indexes:
+            raise SimulationError(f"Index {self.name}.{name} not found")
+        del self.indexes[name]
+        self.unique.pop(name, None)
+
+def _copy(value):
+    # Documents hold only dicts, lists and immutable scalars; much cheaper than copy.deepcopy
+    if isinstance(value, dict):
+        return {key: _copy(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_copy(item) for item in value]
+    return value
+
+def _set_path(document, path, value):
+    if '$' in path:
+        raise UnsupportedQuery(f"Positional update path {path!r}")
+    parts = path.split('.')
+    target = document
+    for part in parts[:-1]:
+        if isinstance(target, list) and part.isdigit() and int(part) < len(target):
+            target = target[int(part)]
+        elif isinstance(target, dict):
+            target = target.setdefault(part, {})
+        else:
+            raise SimulationError(f"Cannot create field {part!r} in {path!r}")
+    if isinstance(target, list) and parts[-1].isdigit() and int(parts[-1]) < len(target):
+        target[int(parts[-1])] = value
+    elif isinstance(target, dict):
+        target[parts[-1]] = value
+    else:
+        raise SimulationError(f"Cannot set {path!r}")
+
+def _get_path(document, path):
+    target = document
+    for part in path.split('.'):
+        if isinstance(target, dict) and part in target:
+            target = target[part]
+        elif isinstance(target, list) and part.isdigit() and int(part) < len(target):
+            target = target[int(part)]
+        else:
+            return None, False
+    return target, True
+
+def _unset_path(document, path):
+    parent_path, _, last = path.rpartition('.')
+    parent, found = _get_path(document, parent_path) if parent_path else (document, True)
+    if found and isinstance(parent, dict):
+        parent.pop(last, None)
+
+# Field paths that resolve to nothing; $set/$addFields leave such fields out
+MISSING = object()
+
+def _expression(document, expression):
+    """Value of a pipeline expression: literals, "$field" paths and $literal; operators are not evaluated."""
+    if isinstance(expression, str) and expression.startswith('$'):
+        if expression.startswith('$$'):
+            raise UnsupportedQuery(f"Pipeline variable {expression}")
+        value, found = _get_path(document, expression[1:])
+        return _copy(value) if found else MISSING
+    if isinstance(expression, dict):
+        if set(expression) == {'$literal'}:
+            return expression['$literal']
+        if any(key.startswith('$') for key in expression):
+            raise UnsupportedQuery(f"Pipeline expression {next(iter(expression))}")
+        values = {key: _expression(document, value) for key, value in expression.items()}
+        return {key: value for key, value in values.items() if value is not MISSING}
+    if isinstance(expression, list):
+        return [None if value is MISSING else value for value in (_expression(document, item) for item in expression)]
+    return expression
+
+def _merge(current, value):
+    # $set/$addFields merge an embedded document into the existing one instead of replacing it
+    if isinstance(current, dict) and isinstance(value, dict):
+        merged = dict(current)
+        for key, item in value.items():
+            merged[key] = _merge(current.get(key), item)
+        return merged
+    return value
+
+def _project(document, projection):
+    if any(value not in (0, 1, True, False) for value in projection.values()):
+        raise UnsupportedQuery("$project with expressions")
+    excluded = {path for path, value in projection.items() if value in (0, False)}
+    included = [path for path, value in projection.items() if value not in (0, False)]
+    if included:
+        if excluded - {'_id'}:
+            raise SimulationError("$project cannot mix inclusion and exclusion")
+        projected = {} if '_id' in excluded else {'_id': document['_id']}
+        for path in included:
+            value, found = _get_path(document, path)
+            if found:
+                _set_path(projected, path, value)
+        return projected
+    for path in excluded:
+        _unset_path(document, path)
+    return document
+
+def apply_pipeline(document, pipeline):
+    """The updated copy of a document for an update pipeline ([{$set: ...}, {$unset: ...}])."""
+    updated = _copy(document)
+    for stage in pipeline:
+        if not isinstance(stage, dict) or len(stage) != 1:
+            raise UnsupportedQuery("Update pipeline stage must have exactly one stage name")
+        (name, argument), = stage.items()
+        if name in ('$set', '$addFields'):
+            source = _copy(updated)
+            for path, expression in argument.items():
+                value = _expression(source, expression)
+                if value is not MISSING:
+                    current, exists = _get_path(updated, path)
+                    _set_path(updated, path, _merge(current, value) if exists else value)
+        elif name == '$unset':
+            for path in [argument] if isinstance(argument, str) else argument:
+                _unset_path(updated, path)
+        elif name == '$project':
+            updated = _project(updated, argument)
+        elif name in ('$replaceRoot', '$replaceWith'):
+            root = _expression(updated, argument['newRoot'] if name == '$replaceRoot' else argument)
+            if not isinstance(root, dict):
+                raise SimulationError(f"{name} needs a document, found {root!r}")
+            updated = dict(root) if '_id' in root else dict(_id=document['_id'], **root)
+        else:
+            raise UnsupportedQuery(f"Update pipeline stage {name}")
+    if '_id' not in updated:
+        updated = dict(_id=document['_id'], **updated)
+    elif value_key(updated['_id']) != value_key(document['_id']):
+        raise SimulationError("The update would change the immutable field '_id'")
+    return updated
+
+def apply_update(document, update, inserting=False):
+    """The updated copy of a document for an operator update ({$set: ...}), a pipeline or a replacement document.
+
+    inserting applies $setOnInsert, for the document an upsert creates.
+    """
+    if isinstance(update, list):
+        return apply_pipeline(document, update)
+    if not isinstance(update, dict):
+        raise UnsupportedQuery("Only update documents can be simulated")
+    if not any(key.startswith('$') for key in update):
+        if '_id' in update and value_key(update['_id']) != value_key(document['_id']):
+            raise SimulationError("The replacement would change the immutable field '_id'")
+        return dict(_id=document['_id'], **{key: value for key, value in update.items() if key != '_id'})
+    updated = _copy(document)
+    for operator, fields in update.items():
+        if operator not in UPDATE_OPERATORS:
+            raise UnsupportedQuery(f"Unsupported update operator {operator}")
+        for path, value in fields.items():
+            if path == '_id' or path.startswith('_id.'):
+                raise SimulationError("The update would change the immutable field '_id'")
+            current, exists = _get_path(updated, path)
+            if operator == '$set':
+                _set_path(updated, path, value)
+            elif operator == '$unset':
+                _unset_path(updated, path)
+            elif operator == '$inc':
+                if exists and (not isinstance(current, (int, float, Decimal)) or isinstance(current, bool)):
+                    raise SimulationError(f"Cannot apply $inc to non-numeric field {path!r}")
+                _set_path(updated, path, (current or 0) + value)
+            elif operator == '$push':
+                if exists and not isinstance(current, list):
+                    raise SimulationError(f"Cannot apply $push to non-array field {path!r}")
+                if isinstance(value, dict) and any(key.startswith('$') for key in value):
+                    if set(value) != {'$each'}:
+                        raise UnsupportedQuery(f"$push modifiers {sorted(value)}")
+                    values = value['$each']
+                else:
+                    values = [value]
+                _set_path(updated, path, (current if exists else []) + list(values))
+            elif operator == '$currentDate':
+                _set_path(updated, path, datetime.now(timezone.utc))
+            elif operator == '$setOnInsert' and inserting:
+                _set_path(updated, path, value)
+    return updated
+
+def upsert_document(query, update):
+    """The document an upsert inserts: the filter's equality fields, then the update applied to them."""
+    base = {}
+    for path, condition in query.items():
+        if path.startswith('$'):
+            continue
+        if isinstance(condition, dict) and any(key.startswith('$') for key in condition):
+            if set(condition) != {'$eq'}:
+                continue
+            condition = condition['$eq']
+        _set_path(base, path, condition)
+    if isinstance(update, dict) and not any(key.startswith('$') for key in update):
+        # A replacement keeps only the filter's _id
+        return dict(update, _id=base['_id']) if '_id' in base and '_id' not in update else dict(update)
+    updated = apply_update(dict(base, _id=base.get('_id')), update, inserting=True)
+    if '_id' not in base:
+        del updated['_id']
+    return updated
+
+class DocumentStore:
+    """Collections loaded from a snapshot directory on first use."""
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self.collections = {}
+        self.initial = {}
+
+    def _snapshot_indexes(self, name):
+        path = os.path.join(self.snapshot, f"{name}.metadata.json")
+        if not os.path.exists(path):
+            return {}
+        with open(path, 'r', encoding='utf-8') as file:
+            metadata = json.load(file, object_hook=extended_json_hook)
+        indexes = {}
+        for index in metadata.get('indexes', []):
+            if index.get('name') != '_id_':
+                options = {key: value for key, value in index.items() if key not in ('v', 'key', 'name', 'ns')}
+                indexes[index['name']] = {'key': [[field, direction] for field, direction in index['key'].items()],
+                                          'options': options}
+        return indexes
+
+    def get(self, name, create=True):
+        """The collection, loaded from the snapshot if needed; None when it does not exist and create is false."""
+        if name not in self.collections and name not in self.initial:
+            documents = iter_sample_documents(self.snapshot, name)
+            exists = documents is not None
+            collection = Collection(name, documents or (), self._snapshot_indexes(name)) if exists else None
+            self.initial[name] = {'documents': len(collection) if exists else None,
+                                  'indexes': set(collection.indexes) if exists else set()}
+            if exists:
+                self.collections[name] = collection
+        if name not in self.collections and create:
+            self.collections[name] = Collection(name)
+        return self.collections.get(name)
+
+def _index_name(operation, key):
+    return extract_index_name(operation.get('options') or '') or (
+        default_index_name(key) if key else ' '.join(operation['index_key'].split()))
+
+def _drop_index(collection, spec):
+    spec = spec.strip()
+    if spec[:1] in ('"', "'"):
+        name = spec.strip('"\'')
+        if name == '*':
+            for index_name in list(collection.indexes):
+                collection.drop_index(index_name)
+            return
+        collection.drop_index(name)
+        return
+    key = parse_index_key(spec)
+    names = [name for name, index in collection.indexes.items() if index['key'] == key]
+    if not names:
+        raise SimulationError(f"No index on {collection.name} with key {spec}")
+    collection.drop_index(names[0])
+
+def _write_options(operation):
+    """Parsed update/delete options; hint and writeConcern do not change the outcome, collation and arrayFilters do."""
+    options = _parse(operation.get('options'), {})
+    for name in ('collation', 'arrayFilters'):
+        if name in options:
+            raise UnsupportedQuery(f"Option {name}")
+    return options
+
+def apply_operation(store, operation):
+    """Apply one operation; returns counts {'matched', 'modified', 'inserted', 'deleted'}."""
+    op_type = operation['type']
+    counts = {'matched': 0, 'modified': 0, 'inserted': 0, 'deleted': 0}
+    if op_type == 'createCollection':
+        if store.get(operation['collection'], create=False) is not None:
+            raise SimulationError(f"Collection {operation['collection']} already exists")
+        store.get(operation['collection']).options = _parse(operation.get('options'), {})
+    elif op_type == 'dropCollection':
+        collection = store.get(operation['collection'], create=False)
+        if collection is not None:
+            counts['deleted'] = len(collection)
+            del store.collections[operation['collection']]
+    elif op_type in ('insertOne', 'insertMany', 'insert'):
+        documents = _parse(operation['documents'])
+        collection = store.get(operation['collection'])
+        for document in documents if isinstance(documents, list) else [documents]:
+            collection.insert(document)
+            counts['inserted'] += 1
+    elif op_type in ('updateOne', 'updateMany', 'replaceOne'):
+        options = _write_options(operation)
+        collection = store.get(operation['collection'])
+        query = _parse(operation['filter'], {})
+        update = _parse(operation['update'])
+        for number in collection.find(query, limit=None if op_type == 'updateMany' else 1):
+            counts['matched'] += 1
+            document = collection.documents[number]
+            updated = apply_update(document, update)
+            if updated != document:
+                collection.replace(number, updated)
+                counts['modified'] += 1
+        if not counts['matched'] and options.get('upsert'):
+            collection.insert(upsert_document(query, update))
+            counts['inserted'] += 1
+    elif op_type in ('deleteOne', 'deleteMany', 'remove'):
+        _write_options(operation)
+        collection = store.get(operation['collection'])
+        for number in collection.find(_parse(operation['filter'], {}), limit=1 if op_type == 'deleteOne' else None):
+            collection.delete(number)
+            counts['deleted'] += 1
+    elif op_type == 'bulkWrite':
+        options = _parse(operation.get('options'), {})
+        failure = None
+        for request in bulk_requests(operation):
+            try:
+                request_counts = apply_operation(store, request)
+            except SimulationError as e:
+                # An unordered bulkWrite carries on past failed writes and reports them at the end
+                if options.get('ordered', True):
+                    raise SimulationError(f"request {request['request']}: {e}")
+                failure = failure or SimulationError(f"request {request['request']}: {e}")
+                continue
+            for name, count in request_counts.items():
+                counts[name] += count
+        if failure:
+            raise failure
+    elif op_type == 'createIndex':
+        key = parse_index_key(operation['index_key'])
+        if not key:
+            raise UnsupportedQuery(f"Index key {operation['index_key']!r}")
+        options = _parse(operation.get('options'), {})
+        options.pop('name', None)
+        store.get(operation['collection']).create_index(_index_name(operation, key), key, options)
+    elif op_type == 'dropIndex':
+        collection = store.get(operation['collection'], create=False)
+        if collection is None:
+            raise SimulationError(f"Collection {operation['collection']} does not exist")
+        _drop_index(collection, operation['index_spec'])
+    else:
+        raise UnsupportedQuery(f"Operation {op_type}")
+    return counts
+
+def simulate(operations, store):
+    """Apply operations in order; returns (changesets, failure, skipped).
+
+    changesets lists {'source', 'changeset_id', 'touched', 'operations': [...]}
+    in apply order, failure is (operation, message) for the operation that
+    stopped the run or None, skipped lists (operation, reason) for operations
+    the simulator cannot evaluate (they are left out, so later counts may drift).
+    """
+    changesets = []
+    skipped = []
+    for operation in operations:
+        changeset_key = (operation.get('source'), operation.get('changeset_id'))
+        if not changesets or (changesets[-1]['source'], changesets[-1]['changeset_id']) != changeset_key:
+            changesets.append({'source': changeset_key[0], 'changeset_id': changeset_key[1], 'touched': 0, 'operations': []})
+        try:
+            counts = apply_operation(store, operation)
+        except SimulationError as e:
+            return changesets, (operation, str(e)), skipped
+        except ValueError as e:
+            # UnsupportedQuery, or arguments the shell literal parser cannot read
+            skipped.append((operation, str(e)))
+            continue
+        changesets[-1]['operations'].append(dict(type=operation['type'], collection=operation['collection'], **counts))
+        changesets[-1]['touched'] += counts['modified'] + counts['inserted'] + counts['deleted']
+    return changesets, None, skipped
+
+def collection_diff(store):
+    """[(collection, before, after, indexes added, indexes dropped)] for every collection the run looked at."""
+    diff = []
+    for name in sorted(set(store.initial) | set(store.collections)):
+        initial = store.initial.get(name, {'documents': None, 'indexes': set()})
+        collection = store.collections.get(name)
+        after = len(collection) if collection is not None else None
+        indexes = set(collection.indexes) if collection is not None else set()
+        diff.append((name, initial['documents'], after, sorted(indexes - initial['indexes']),
+                     sorted(initial['indexes'] - indexes)))
+    return diff
+
+def _count(value):
+    return 'missing' if value is None else f"{value:,}"
+
+def format_simulation(changesets, failure, skipped, diff):
+    lines = ["📊 Documents touched per changeset:"]
+    for changeset in changesets:
+        details = ', '.join(' '.join([f"{op['type']} {op['collection']}"] + [
+            f"{name} {op[name]:,}" for name in ('matched', 'modified', 'inserted', 'deleted') if op[name]])
+            for op in changeset['operations'])
+        lines.append(f"   {changeset['changeset_id']} ({os.path.basename(changeset['source'] or '')}): "
+                     f"{changeset['touched']:,} touched" + (f" [{details}]" if details else ""))
+    lines.append("🗂️ Collections:")
+    for name, before, after, added, dropped in diff:
+        change = f"{_count(before)} → {_count(after)} documents"
+        if added:
+            change += f", indexes added: {', '.join(added)}"
+        if dropped:
+            change += f", indexes dropped: {', '.join(dropped)}"
+        lines.append(f"   {name}: {change}")
+    for operation, reason in skipped:
+        lines.append(f"⚠️ Not simulated: {operation['type']} on {operation['collection']} "
+                     f"(changeSet {operation.get('changeset_id')}): {reason}")
+    if failure:
+        operation, message = failure
+        lines.append(f"💥 changeSet {operation.get('changeset_id')} would fail: {operation['type']} on "
+                     f"{operation['collection']}: {message}")
+    return "\n".join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="liquibase-mongo simulate", description="Apply changelogs to a local snapshot and report what they change.")
+    parser.add_argument("changelogs", nargs="+", help="Changelogs to apply, in order.")
+    parser.add_argument("--snapshot", required=True, metavar="DIR", help="Directory with {collection}.ndjson or {collection}.bson files.")
+    parser.add_argument("--format", choices=["text", "json"], default="text", help="Output format (default: text).")
+    args = parser.parse_args(argv)
+
+    operations, problems = load_history(args.changelogs)
+    for problem in problems:
+        print(f"⚠️ {problem}", file=sys.stderr)
+    store = DocumentStore(args.snapshot)
+    try:
+        changesets, failure, skipped = simulate(operations, store)
+    except ImportError as e:
+        print(f"💥 {e}", file=sys.stderr)
+        return 1
+    diff = collection_diff(store)
+
+    if args.format == "json":
+        print(json.dumps({
+            'changesets': changesets,
+            'collections': [{'collection': name, 'before': before, 'after': after, 'indexes_added': added,
+                             'indexes_dropped': dropped} for name, before, after, added, dropped in diff],
+            'skipped': [{'changeset_id': operation.get('changeset_id'), 'type': operation['type'], 'reason': reason}
+                        for operation, reason in skipped],
+            'failure': {'changeset_id': failure[0].get('changeset_id'), 'type': failure[0]['type'],
+                        'message': failure[1]} if failure else None,
+        }, indent=2))
+    else:
+        print(f"🧪 Simulated {len(operations)} operation(s) against {args.snapshot}")
+        print(format_simulation(changesets, failure, skipped, diff))
+    return 1 if failure else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
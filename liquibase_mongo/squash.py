@@ -0,0 +1,165 @@
+"""Squash the changeset history into one baseline changelog (``liquibase-mongo squash``).
+
+The history is replayed per collection (and context) to find its net effect:
+everything before a ``dropCollection`` is cancelled along with the drop,
+``createIndex``/``dropIndex`` pairs disappear, and runs of consecutive
+inserts become one ``insertMany``. Updates and deletes are kept in order, so
+a fresh environment bootstrapped from the baseline ends up with the same
+collections, indexes and documents as one that replayed every changeset.
+"""
+import os
+import sys
+import argparse
+
+from .generator import iter_liquibase_xml_robust, write_lines_to_file, extract_index_name, extract_version_number
+from .history import HistoryCache, default_history_paths, load_history
+from .parser import DEFAULT_CONTEXT
+from .rules import aggregate_output
+from .shell_literal import split_literal, parse_shell_literal, canonical_json
+
+INSERT_TYPES = ('insertOne', 'insertMany', 'insert')
+# Operations after which the collection exists, explicitly or implicitly
+CREATING_TYPES = ('createCollection', 'createIndex', 'aggregate') + INSERT_TYPES
+
+def _index_key(text):
+    try:
+        return canonical_json(parse_shell_literal(text))
+    except ValueError:
+        return ' '.join(text.split())
+
+def _index_matches(create, spec):
+    if spec.strip()[:1] in ('"', "'"):
+        return extract_index_name(create.get('options') or '') == spec.strip().strip('"\'')
+    return _index_key(create['index_key']) == _index_key(spec)
+
+def _document_texts(operation):
+    """Source text of each inserted document, or None when the documents cannot be split."""
+    documents = operation.get('documents', '').strip()
+    if operation['type'] == 'insertOne' or documents.startswith('{'):
+        return [documents]
+    try:
+        return split_literal(documents)
+    except ValueError:
+        return None
+
+def fold_inserts(operations):
+    """Merge runs of consecutive inserts into single insertMany operations; returns (operations, folded)."""
+    result = []
+    folded = 0
+    run = []
+
+    def flush():
+        nonlocal folded
+        if len(run) == 1:
+            result.append(run[0][0])
+        elif run:
+            texts = [text for _, documents in run for text in documents]
+            merged = dict(run[0][0], type='insertMany', documents="[\n" + ",\n".join(f"    {text}" for text in texts) + "\n]")
+            result.append(merged)
+            folded += len(run) - 1
+        run.clear()
+
+    for operation in operations:
+        documents = _document_texts(operation) if operation['type'] in INSERT_TYPES else None
+        if documents is None:
+            flush()
+            result.append(operation)
+        else:
+            run.append((operation, documents))
+    flush()
+    return result, folded
+
+def squash_operations(operations, default_context=DEFAULT_CONTEXT):
+    """Return (baseline_operations, summary, warnings) for operations in history order."""
+    collections = {}
+    summary = {'operations_read': len(operations), 'cancelled': [], 'index_pairs': 0, 'folded_inserts': 0}
+    warnings = []
+
+    for operation in operations:
+        context = operation.get('context') or default_context
+        op_type = operation['type']
+        where = f"changeSet {operation.get('changeset_id')} in {os.path.basename(operation.get('source', '?'))}"
+        collection = operation['collection']
+        if op_type == 'aggregate':
+            # A $merge/$out pipeline belongs to the collection it writes; its source has to be complete by then
+            collection = aggregate_output(operation['pipeline']) or collection
+            if collection != operation['collection']:
+                warnings.append(f"{where}: aggregate reads {operation['collection']} and writes {collection}; "
+                                f"it is kept with {collection}'s changes, check that {operation['collection']} "
+                                "is fully built before it in the baseline")
+        pending = collections.setdefault((context, collection), [])
+
+        if op_type == 'dropCollection':
+            if pending:
+                summary['cancelled'].append((context, operation['collection'], len(pending)))
+            pending.clear()
+        elif op_type == 'createCollection' and any(op['type'] in CREATING_TYPES for op in pending):
+            warnings.append(f"{where}: {operation['collection']} already exists at this point; createCollection is left out")
+        elif op_type == 'dropIndex':
+            match = next((op for op in pending if op['type'] == 'createIndex' and _index_matches(op, operation['index_spec'])), None)
+            if match is not None:
+                pending.remove(match)
+                summary['index_pairs'] += 1
+            else:
+                warnings.append(f"{where}: dropIndex {operation['index_spec']} on {operation['collection']} "
+                                "has no matching createIndex in the history; left out")
+        else:
+            pending.append(operation)
+
+    baseline = []
+    for (context, collection), pending in collections.items():
+        folded_operations, folded = fold_inserts(pending)
+        summary['folded_inserts'] += folded
+        baseline.extend(dict(operation, context=context) for operation in folded_operations)
+    summary['operations_written'] = len(baseline)
+    return baseline, summary, warnings
+
+def format_summary(summary):
+    lines = [f"🧹 Squashed {summary['operations_read']} operations into {summary['operations_written']}"]
+    for context, collection, count in summary['cancelled']:
+        lines.append(f"   ✂️ {collection} ({context}): {count} operation(s) cancelled by dropCollection")
+    lines.append(f"   🔁 createIndex/dropIndex pairs removed: {summary['index_pairs']}")
+    lines.append(f"   📦 inserts folded into a preceding insert: {summary['folded_inserts']}")
+    return "\n".join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="liquibase-mongo squash", description="Squash the changeset history into one baseline changelog.")
+    parser.add_argument("changelogs", nargs="*", help="Changelogs in apply order (default: changeset/changelog.xml, then json_changesets/*.xml by version).")
+    parser.add_argument("--output", default="changeset/baseline.xml", help="Baseline changelog to write (default: changeset/baseline.xml).")
+    parser.add_argument("--author", required=True, help="Author for the baseline changesets.")
+    parser.add_argument("--version", default="0", help="Version for the baseline changeset IDs (default: 0).")
+    parser.add_argument("--default-context", default=DEFAULT_CONTEXT, help=f"Context for changeSets that declare none (default: {DEFAULT_CONTEXT}).")
+    parser.add_argument("--history-cache", help="JSON file caching the parsed history between runs.")
+    parser.add_argument("--strict", action="store_true", help="Fail if any change in the history cannot be read.")
+    parser.add_argument("--dry-run", action="store_true", help="Print the summary without writing the baseline.")
+    args = parser.parse_args(argv)
+
+    output = os.path.abspath(args.output)
+    paths = [path for path in (args.changelogs or default_history_paths()) if os.path.abspath(path) != output]
+    print(f"📚 Reading {len(paths)} changelog(s)...")
+    cache = HistoryCache(args.history_cache)
+    operations, problems = load_history(paths, cache)
+    cache.save()
+    for problem in problems:
+        print(f"⚠️ {problem}")
+    if problems and args.strict:
+        print("💥 SQUASH FAILED: the history has changes that cannot be read (--strict).")
+        return 1
+
+    baseline, summary, warnings = squash_operations(operations, args.default_context)
+    print(format_summary(summary))
+    for warning in warnings:
+        print(f"⚠️ {warning}")
+    if args.dry_run:
+        return 0
+
+    base = extract_version_number(args.version)
+    changeset_ids = [f"{base}.{i}" for i in range(1, len(baseline) + 1)]
+    print(f"💾 Writing baseline to: {args.output}")
+    write_lines_to_file(iter_liquibase_xml_robust(args.version, baseline, args.author, args.default_context,
+                                                  [], problems + warnings, changeset_ids), args.output)
+    print("✅ Baseline changelog created successfully!")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
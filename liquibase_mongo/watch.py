@@ -0,0 +1,249 @@
+"""Watch db_queries/ and regenerate changesets on save (``liquibase-mongo watch``).
+
+Parsed operations, conversion results and the index catalog stay in memory
+between saves, so a save costs one ``convert`` call on the edited file and
+one write when its XML actually changed. File events come from inotify on
+Linux and from mtime polling everywhere else.
+"""
+import os
+import sys
+import glob
+import time
+import select
+import struct
+import hashlib
+import argparse
+
+from .api import convert
+from .parser import version_sort_key
+from .rules import build_rule_config
+from .generator import write_to_file
+from .indexes import build_catalog
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_EVENT_HEADER = struct.Struct('iIII')
+
+class InotifyWatcher:
+    """Report changed file names in one directory using Linux inotify via ctypes."""
+
+    def __init__(self, directory):
+        import ctypes
+        import ctypes.util
+
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        if not hasattr(libc, 'inotify_init1'):
+            raise OSError("inotify is not available on this platform")
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = IN_CLOSE_WRITE | IN_MOVED_TO | IN_MOVED_FROM | IN_CREATE | IN_DELETE
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), mask) < 0:
+            os.close(self.fd)
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+        self.directory = directory
+
+    def poll(self, timeout):
+        """Block up to timeout seconds and return the set of changed file paths."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+
+        changed = set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+        offset = 0
+        while offset < len(data):
+            _, _, _, name_len = IN_EVENT_HEADER.unpack_from(data, offset)
+            offset += IN_EVENT_HEADER.size
+            name = data[offset:offset + name_len].rstrip(b'\0')
+            offset += name_len
+            if name:
+                changed.add(os.path.join(self.directory, os.fsdecode(name)))
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+class PollingWatcher:
+    """Report changed file names by comparing mtime and size between scans."""
+
+    def __init__(self, directory, interval=0.25):
+        self.directory = directory
+        self.interval = interval
+        self.stamps = self._scan()
+
+    def _scan(self):
+        stamps = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    stat = entry.stat()
+                    stamps[entry.path] = (stat.st_mtime_ns, stat.st_size)
+        return stamps
+
+    def poll(self, timeout):
+        time.sleep(min(timeout, self.interval))
+        stamps = self._scan()
+        changed = {path for path, stamp in stamps.items() if self.stamps.get(path) != stamp}
+        changed |= set(self.stamps) - set(stamps)
+        self.stamps = stamps
+        return changed
+
+    def close(self):
+        pass
+
+def create_watcher(directory, force_poll=False, interval=0.25):
+    """Use inotify when the platform has it, polling otherwise."""
+    if not force_poll and sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(directory)
+        except OSError as e:
+            print(f"⚠️ inotify unavailable ({e}); falling back to polling every {interval}s")
+    return PollingWatcher(directory, interval)
+
+class QueryWatcher:
+    """Keep conversion results warm and regenerate outputs for changed files."""
+
+    def __init__(self, queries_dir, output_dir, author, rule_config):
+        self.queries_dir = queries_dir
+        self.output_dir = output_dir
+        self.author = author
+        self.rule_config = rule_config
+        self.hashes = {}
+        self.results = {}
+        self.written = {}
+        self.catalog = build_catalog([])
+
+    def warm(self):
+        """Convert every query file once without writing anything."""
+        start = time.perf_counter()
+        for path in sorted(glob.glob(os.path.join(self.queries_dir, '*.js')), key=version_sort_key):
+            try:
+                self._convert(path)
+            except (OSError, UnicodeDecodeError) as e:
+                print(f"⚠️ {os.path.basename(path)}: skipped ({e})")
+        self.catalog = self._build_catalog()
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"🔥 Warmed {len(self.results)} files in {elapsed:.1f} ms "
+              f"({self.catalog.index_count()} indexes on {len(self.catalog.collections)} collections)")
+        for finding in self.catalog.findings():
+            print(f"⚠️ {finding}")
+
+    def _build_catalog(self):
+        # Replay every cached file in version order; index operations depend on what came before
+        return build_catalog((path, self.results[path].operations, self.results[path].context)
+                             for path in sorted(self.results, key=version_sort_key))
+
+    def _refresh_catalog(self):
+        previous = set(self.catalog.findings())
+        self.catalog = self._build_catalog()
+        for finding in self.catalog.findings():
+            if finding not in previous:
+                print(f"⚠️ {finding}")
+
+    def _convert(self, path):
+        with open(path, 'rb') as file:
+            raw = file.read()
+        digest = hashlib.sha256(raw).hexdigest()
+        if self.hashes.get(path) == digest:
+            return None
+        version = os.path.splitext(os.path.basename(path))[0]
+        result = convert(raw.decode('utf-8'), version=version, author=self.author, rule_config=self.rule_config)
+        self.hashes[path] = digest
+        self.results[path] = result
+        return result
+
+    def handle(self, path):
+        """Process one changed path; a file that cannot be read, decoded or written is reported and skipped."""
+        try:
+            self._handle(path)
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"⚠️ {os.path.basename(path)}: skipped ({e}); still watching")
+
+    def _handle(self, path):
+        """Process one changed path and print its latency."""
+        if not path.endswith('.js'):
+            return
+        start = time.perf_counter()
+        name = os.path.basename(path)
+
+        if not os.path.exists(path):
+            if self.results.pop(path, None) is not None:
+                self.hashes.pop(path, None)
+                self._refresh_catalog()
+                print(f"🗑️ {name} removed; its changeset in {self.output_dir}/ was left untouched")
+            return
+
+        result = self._convert(path)
+        if result is None:
+            return
+
+        if result.errors:
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"❌ {name}: {len(result.errors)} error(s) in {elapsed:.1f} ms")
+            for error in result.errors:
+                print(f"    {error}")
+            return
+
+        if any(op['type'] in ('createIndex', 'dropIndex', 'dropCollection') for op in result.operations):
+            self._refresh_catalog()
+
+        version = os.path.splitext(name)[0]
+        output_path = os.path.join(self.output_dir, f"{version}.xml")
+        if output_path not in self.written and os.path.exists(output_path):
+            with open(output_path, 'r', encoding='utf-8') as file:
+                self.written[output_path] = file.read()
+        status = "unchanged"
+        if self.written.get(output_path) != result.xml:
+            write_to_file(result.xml, output_path)
+            self.written[output_path] = result.xml
+            status = "written"
+
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"⚡ {name} → {output_path} {status} in {elapsed:.1f} ms "
+              f"({len(result.operations)} ops, {len(result.warnings)} warnings)")
+
+    def run(self, watcher, timeout=1.0):
+        print(f"👀 Watching {self.queries_dir}/ ({type(watcher).__name__}); Ctrl+C to stop")
+        while True:
+            for path in sorted(watcher.poll(timeout)):
+                self.handle(path)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="liquibase-mongo watch", description="Regenerate json_changesets/ as db_queries/ files are saved.")
+    parser.add_argument("--queries", default="db_queries", help="Directory of .js query files (default: db_queries).")
+    parser.add_argument("--output", default="json_changesets", help="Directory for generated XML (default: json_changesets).")
+    parser.add_argument("--author", default=os.environ.get("USER", "unknown"), help="Author for generated changesets.")
+    parser.add_argument("--poll", action="store_true", help="Use mtime polling even where inotify is available.")
+    parser.add_argument("--poll-interval", type=float, default=0.25, help="Polling interval in seconds.")
+    parser.add_argument("--disable-rule", action="append", default=[], metavar="RULE", help="Disable a validation rule (repeatable).")
+    parser.add_argument("--rule-severity", action="append", default=[], metavar="RULE=LEVEL", help="Override a rule's severity with 'error' or 'warning' (repeatable).")
+    args = parser.parse_args(argv)
+
+    try:
+        rule_config = build_rule_config(
+            disabled=args.disable_rule,
+            severities=dict(item.split("=", 1) for item in args.rule_severity if "=" in item),
+        )
+    except ValueError as e:
+        parser.error(str(e))
+
+    query_watcher = QueryWatcher(args.queries, args.output, args.author, rule_config)
+    query_watcher.warm()
+    watcher = create_watcher(args.queries, args.poll, args.poll_interval)
+    try:
+        query_watcher.run(watcher)
+    except KeyboardInterrupt:
+        print("👋 Stopped watching.")
+    finally:
+        watcher.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
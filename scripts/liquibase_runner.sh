@@ -97,6 +97,12 @@ else
     echo "⏰ Using latest changeset: $CHANGESET_FILE"
 fi
 
+# Chunked delete/update jobs written next to the changelog by --chunked-writes
+CHUNKED_JOBS_FILE="${CHANGESET_FILE%.xml}.chunked.json"
+if [ -f "$CHUNKED_JOBS_FILE" ]; then
+    echo "🧱 Chunked jobs found: $CHUNKED_JOBS_FILE"
+fi
+
 # Show file details
 echo ""
 echo "📄 Changeset file details:"
@@ -185,6 +191,26 @@ for db in "${valid_databases[@]}"; do
         exit $exit_code
     fi
 
+    # Large deleteMany/updateMany moved out of the changelog by --chunked-writes run here, batch by batch
+    if [[ -f "$CHUNKED_JOBS_FILE" ]]; then
+        if [[ "$command" == "update" ]]; then
+            echo ""
+            echo "🧱 Running chunked jobs for database '$db': $CHUNKED_JOBS_FILE"
+            python3 -m liquibase_mongo chunked run "$CHUNKED_JOBS_FILE" \
+                --uri "${MONGO_CONNECTION_BASE}/?retryWrites=true&w=majority&tls=true" \
+                --database "$db"
+            exit_code=$?
+            if [[ $exit_code -ne 0 ]]; then
+                echo ""
+                echo "❌ Chunked jobs failed for database '$db' with exit code: $exit_code"
+                echo "Rerun the update to resume them; the changelog itself is already applied."
+                exit $exit_code
+            fi
+        else
+            echo "ℹ️  $CHUNKED_JOBS_FILE holds chunked jobs; 'update' runs them after the changelog."
+        fi
+    fi
+
     echo "------------------------------------------------------------"
 done
 